@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Memory and time-filter throughput: legacy listing dicts vs Listing / ListingBatch.
+
+Run with: PYTHONPATH=src python benchmarks/bench_listing.py [count]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from surfboard_monitor.listing import Listing, ListingBatch, UNKNOWN_TIME
+
+LOCATIONS = ['San Diego, CA', 'Oceanside, CA', 'Encinitas, CA', 'La Jolla, CA']
+
+
+def make_dict(i, now):
+    # Same shape _parse_craigslist_json_item used to build
+    return {
+        'id': f"cl_{i}",
+        'title': f"9'{i % 12} Longboard {i}",
+        'price': f"${(i % 900) + 100}.00",
+        'location': ''.join(LOCATIONS[i % 4]),  # fresh string per listing, as parsed from JSON
+        'url': '',
+        'description': f"Great log number {i}, barely used",
+        'image_url': f"https://images.craigslist.org/{i}_600x450.jpg",
+        'condition': 'Unknown',
+        'seller': 'Unknown',
+        'listing_type': 'Unknown',
+        'date': (now - timedelta(minutes=i)).isoformat(),
+        'platform': 'Craigslist',
+    }
+
+
+def make_listing(i, now):
+    return Listing(
+        id=f"cl_{i}",
+        title=f"9'{i % 12} Longboard {i}",
+        price_cents=((i % 900) + 100) * 100,
+        posted_at=int((now - timedelta(minutes=i)).timestamp()),
+        location=''.join(LOCATIONS[i % 4]),
+        description=f"Great log number {i}, barely used",
+        image_url=f"https://images.craigslist.org/{i}_600x450.jpg",
+        platform='Craigslist',
+    )
+
+
+def legacy_time_filter(listings, cutoff_time):
+    # The per-dict loop _filter_listings_by_time used to run
+    kept = []
+    for listing in listings:
+        date_str = listing.get('date', '')
+        if not date_str:
+            continue
+        listing_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        if listing_date > cutoff_time:
+            kept.append(listing)
+    return kept
+
+
+def batch_time_filter(listings, cutoff_time):
+    batch = ListingBatch.from_listings(listings)
+    cutoff = int(cutoff_time.timestamp())
+    return batch.select((batch.posted_at == UNKNOWN_TIME) | (batch.posted_at > cutoff)).to_listings()
+
+
+def batch_filter_only(batch, cutoff_time):
+    cutoff = int(cutoff_time.timestamp())
+    return batch.select((batch.posted_at == UNKNOWN_TIME) | (batch.posted_at > cutoff))
+
+
+def measure(factory, count, now):
+    tracemalloc.start()
+    rows = [factory(i, now) for i in range(count)]
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, current
+
+
+def timed(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    now = datetime.now()
+    cutoff = now - timedelta(days=14)
+
+    dicts, dict_bytes = measure(make_dict, count, now)
+    listings, listing_bytes = measure(make_listing, count, now)
+
+    kept_dicts, dict_time = timed(legacy_time_filter, dicts, cutoff)
+    kept_listings, batch_time = timed(batch_time_filter, listings, cutoff)
+    batch, build_time = timed(ListingBatch.from_listings, listings)
+    _, filter_time = timed(batch_filter_only, batch, cutoff)
+    assert len(kept_dicts) == len(kept_listings)
+
+    print(f"listings:            {count}")
+    print(f"memory  dict:        {dict_bytes / count:8.0f} B/listing")
+    print(f"memory  Listing:     {listing_bytes / count:8.0f} B/listing")
+    print(f"time filter dict:    {count / dict_time:12.0f} listings/s")
+    print(f"time filter batch:   {count / batch_time:12.0f} listings/s (incl. column build)")
+    print(f"column build only:   {count / build_time:12.0f} listings/s")
+    print(f"mask+select only:    {count / filter_time:12.0f} listings/s")
+
+
+if __name__ == '__main__':
+    main()
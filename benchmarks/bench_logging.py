@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Cycle time spent logging: per-listing records vs per-cycle summary, sync vs queue handlers.
+
+"sync, per-listing" matches the old behaviour (one INFO line per listing written
+inline to file and terminal). The terminal is simulated with a second file.
+
+Run with: PYTHONPATH=src python benchmarks/bench_logging.py [listings] [rounds]
+"""
+
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from surfboard_monitor import GeminiClassifier
+from surfboard_monitor.ai.replay import ReplayClient
+from surfboard_monitor.core.logging_setup import configure_logging
+
+MODES = (
+    ('sync, per-listing', 'sync', 'DEBUG', 1.0),
+    ('queue, per-listing', 'queue', 'DEBUG', 1.0),
+    ('queue, 10% sampled', 'queue', 'DEBUG', 0.1),
+    ('sync, summary', 'sync', 'INFO', 1.0),
+    ('queue, summary', 'queue', 'INFO', 1.0),
+)
+
+
+def make_listings(count):
+    return [{'id': f'cl_{i}', 'title': f"9'{i % 12} Longboard {i}", 'description': 'Single fin log, few dings.'}
+            for i in range(count)]
+
+
+def run_mode(classifier, listings, rounds, directory, mode, level, sample_rate):
+    config = SimpleNamespace(LOG_FILE=os.path.join(directory, f'{mode}-{level}-{sample_rate}.log'), LOG_LEVEL=level,
+                             LOG_MODE=mode, LOG_FORMAT='json', LOG_MAX_BYTES=0, LOG_ROTATE_WHEN='',
+                             LOG_BACKUP_COUNT=0, LOG_LISTING_SAMPLE_RATE=sample_rate)
+    with open(os.path.join(directory, 'terminal.log'), 'a') as terminal:
+        listener = configure_logging(config, stream=terminal)
+        logging.getLogger('surfboard_monitor').setLevel(logging.NOTSET)
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            classifier.classify_listings(listings)
+            times.append(time.perf_counter() - start)
+        if listener is not None:
+            listener.stop()
+        for handler in logging.getLogger().handlers:
+            handler.close()
+    return statistics.median(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    classifier = GeminiClassifier()
+    classifier.config.ENABLE_GEMINI_FILTERING = True
+    classifier.client = ReplayClient()
+    listings = make_listings(count)
+    print(f"{count} listings per cycle, median of {rounds} rounds")
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = None
+        for name, mode, level, sample_rate in MODES:
+            elapsed = run_mode(classifier, listings, rounds, directory, mode, level, sample_rate)
+            baseline = baseline or elapsed
+            print(f"{name:>20}: {elapsed * 1000:8.1f} ms/cycle  ({(baseline - elapsed) * 1000:+.1f} ms saved)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Page archive: store cost, on-disk size with repeated pages, and replay-to-parser throughput.
+
+Run with: PYTHONPATH=src python benchmarks/bench_page_archive.py [cycles] [queries] [codec]
+"""
+
+import sys
+import tempfile
+import time
+
+from bench_parse_pool import BASE_URL, make_page
+from surfboard_monitor.scrapers.craigslist_scraper import parse_search_results
+from surfboard_monitor.storage.page_archive import PageArchive
+
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    codec = sys.argv[3] if len(sys.argv) > 3 else 'gzip'
+    # Most cycles see an unchanged page; every tenth cycle a query's page changes
+    pages = {(query, version): make_page(query * 100 + version, 120)
+             for query in range(queries) for version in range(cycles // 10 + 1)}
+    with tempfile.TemporaryDirectory() as directory:
+        archive = PageArchive(directory, codec=codec, retention_days=0)
+        start = time.perf_counter()
+        for cycle in range(cycles):
+            for query in range(queries):
+                archive.store('sandiego', f"term{query}", pages[query, cycle // 10],
+                              base_url=BASE_URL, fetched_at=cycle * 600.0)
+        store_s = time.perf_counter() - start
+        stats = archive.stats()
+        print(f"{stats['pages']} pages stored in {store_s * 1000:.0f} ms "
+              f"({store_s / stats['pages'] * 1000:.2f} ms/page, codec {archive.codec})")
+        print(f"raw {stats['raw_bytes'] / 1024 / 1024:.1f} MB -> {stats['blobs']} blobs, "
+              f"{stats['stored_bytes'] / 1024:.0f} KB on disk")
+
+        start = time.perf_counter()
+        parsed = 0
+        for _, _, _, base_url, content in archive.replay():
+            parsed += len(parse_search_results(content, base_url, 1000))
+        replay_s = time.perf_counter() - start
+        print(f"replayed {stats['pages']} pages ({parsed} listings) through the parser in {replay_s:.2f} s "
+              f"({stats['pages'] / replay_s:.0f} pages/s)")
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Parse-stage scaling: search pages parsed inline vs on 1..N worker processes.
+
+Run with: PYTHONPATH=src python benchmarks/bench_parse_pool.py [pages] [items_per_page] [max_workers]
+"""
+
+import json
+import os
+import sys
+import time
+
+from surfboard_monitor.scrapers.craigslist_scraper import parse_search_results
+from surfboard_monitor.scrapers.parse_pool import ParsePool
+
+BASE_URL = 'https://sandiego.craigslist.org'
+
+
+def make_page(page, items):
+    # Same shape as Craigslist's JSON-LD search results, plus HTML filler
+    elements = [{'item': {
+        'name': f"9'{i % 12} Longboard {page}-{i}",
+        'description': f"Classic single fin log {i}, barely used. " * 8,
+        'offers': {'price': f"{100 + i}.00",
+                   'availableAtOrFrom': {'address': {'addressLocality': 'Encinitas', 'addressRegion': 'CA'}}},
+        'image': [f"https://images.craigslist.org/{page}_{i}_300x300.jpg"],
+    }} for i in range(items)]
+    filler = ''.join(f'<li class="cl-static-search-result"><a href="/x/{i}">Result {i}</a></li>'
+                     for i in range(items))
+    return (f'<html><head><script id="ld_searchpage_results" type="application/ld+json">'
+            f'{json.dumps({"itemListElement": elements})}</script></head><body><ol>{filler}</ol></body></html>'
+            ).encode('utf-8')
+
+
+def run_inline(pages, max_results):
+    start = time.perf_counter()
+    parsed = sum(len(parse_search_results(page, BASE_URL, max_results)) for page in pages)
+    return time.perf_counter() - start, parsed
+
+
+def run_pool(pages, max_results, workers):
+    pool = ParsePool(parse_search_results, workers)
+    try:
+        pool.parse(pages[0], BASE_URL, 1)  # start workers outside the timing
+        start = time.perf_counter()
+        futures = [pool.submit(page, BASE_URL, max_results) for page in pages]
+        parsed = sum(len(future.result()) for future in futures)
+        return time.perf_counter() - start, parsed
+    finally:
+        pool.close()
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    pages = [make_page(page, items) for page in range(page_count)]
+    size_kb = sum(len(page) for page in pages) / len(pages) / 1024
+    print(f"{page_count} pages x {items} listings ({size_kb:.0f} KB/page), {os.cpu_count()} CPUs")
+
+    baseline, parsed = run_inline(pages, items)
+    print(f"{'inline':>10}: {baseline * 1000:8.0f} ms  {parsed / baseline:8.0f} listings/s")
+    # 1, 2, 4, ... and max_workers itself
+    counts = sorted({2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers} | {max_workers})
+    for workers in counts:
+        elapsed, parsed = run_pool(pages, items, workers)
+        print(f"{workers:>3} worker{'s' if workers > 1 else ' '}: {elapsed * 1000:8.0f} ms  "
+              f"{parsed / elapsed:8.0f} listings/s  x{baseline / elapsed:.2f} vs inline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-alert: batch classification vs streamed verdicts.
+
+The replay client spreads its latency across the answer's lines, so the
+batch call returns after the whole latency while the stream delivers the
+first verdict after latency / batch size.
+
+Run with: PYTHONPATH=src python benchmarks/bench_streaming.py [batch_size] [latency_ms] [rounds]
+"""
+
+import statistics
+import sys
+import time
+
+from surfboard_monitor import GeminiClassifier
+from surfboard_monitor.ai.replay import ReplayClient
+
+
+def make_listings(count):
+    return [{'id': f'cl_{i}', 'title': f"9'{i % 12} Longboard {i}", 'description': 'Single fin log.'}
+            for i in range(count)]
+
+
+def first_alert_batch(classifier, listings):
+    start = time.perf_counter()
+    labelled = classifier.label_listings(listings)
+    first = next(i for i, (_, label) in enumerate(labelled) if label == 'LONGBOARD')
+    return time.perf_counter() - start, first
+
+
+def first_alert_stream(classifier, listings):
+    start = time.perf_counter()
+    stream = classifier.stream_labels(listings)
+    for i, (_, label) in enumerate(stream):
+        if label == 'LONGBOARD':
+            elapsed = time.perf_counter() - start
+            break
+    stream.close()
+    return elapsed, i
+
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    classifier = GeminiClassifier()
+    classifier.config.ENABLE_GEMINI_FILTERING = True
+    classifier.client = ReplayClient(latency_ms=latency_ms)
+    listings = make_listings(batch_size)
+    print(f"{batch_size} listings per batch, {latency_ms:.0f} ms model latency, {rounds} rounds")
+
+    for name, run in (('batch', first_alert_batch), ('streaming', first_alert_stream)):
+        times = [run(classifier, listings)[0] for _ in range(rounds)]
+        print(f"{name:>10}: first alert after {statistics.median(times) * 1000:8.1f} ms (median)")
+
+
+if __name__ == '__main__':
+    main()
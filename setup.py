@@ -41,9 +41,15 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=read_requirements(),
+    extras_require={
+        "images": ["Pillow>=10.0.0"],
+        "archive": ["zstandard>=0.21.0"],
+    },
     entry_points={
         "console_scripts": [
             "surfboard-monitor=surfboard_monitor.core.monitor:main",
+            "surfboard-monitor-loadtest=surfboard_monitor.ai.loadtest:main",
+            "surfboard-monitor-simulate=surfboard_monitor.core.simulation:main",
         ],
     },
     include_package_data=True,
@@ -14,6 +14,7 @@ from .scrapers.craigslist_scraper import CraigslistScraper
 from .ai.gemini_classifier import GeminiClassifier
 from .notifications.notifier import Notifier
 from .config import Config
+from .listing import Listing, ListingBatch
 
 __all__ = [
     "SurfboardMonitor",
@@ -21,4 +22,6 @@ __all__ = [
     "GeminiClassifier",
     "Notifier",
     "Config",
+    "Listing",
+    "ListingBatch",
 ]
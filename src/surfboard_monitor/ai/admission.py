@@ -0,0 +1,285 @@
+"""
+Quota-aware admission control for Gemini calls: per-model requests- and tokens-per-minute budgets.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LIVE = 'live'
+BACKFILL = 'backfill'
+
+WINDOW_SECONDS = 60.0
+YIELD_SECONDS = 1.0  # how long backfill callers wait before rechecking while live callers queue
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def _lower(limit, other):
+    """The tighter of two limits, where 0 means no limit."""
+    return min(limit, other) if limit and other else limit or other
+
+
+def _raised(old, new):
+    """Whether a configured limit went up (0 means no limit)."""
+    return bool(old) and (not new or new > old)
+
+
+def _delay_seconds(value):
+    """Seconds from a protobuf Duration string such as '37s' or '0.5s'."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)s\s*', str(value or ''))
+    return float(match.group(1)) if match else None
+
+
+def parse_quota_error(error):
+    """What a 429 RESOURCE_EXHAUSTED error says about the quota.
+
+    Returns {'retry_delay': seconds or None, 'requests_per_minute': limit or None,
+    'tokens_per_minute': limit or None} from the error's RetryInfo and
+    QuotaFailure details. Daily quotas only contribute the retry delay.
+    """
+    details = getattr(error, 'details', None) or {}
+    if isinstance(details, dict):
+        details = details.get('error', details).get('details', [])
+    info = {'retry_delay': None, 'requests_per_minute': None, 'tokens_per_minute': None}
+    for detail in details if isinstance(details, list) else []:
+        if not isinstance(detail, dict):
+            continue
+        kind = detail.get('@type', '')
+        if kind.endswith('RetryInfo'):
+            info['retry_delay'] = _delay_seconds(detail.get('retryDelay'))
+        elif kind.endswith('QuotaFailure'):
+            for violation in detail.get('violations', []):
+                quota = f"{violation.get('quotaId', '')} {violation.get('quotaMetric', '')}".lower()
+                try:
+                    value = int(violation.get('quotaValue'))
+                except (TypeError, ValueError):
+                    continue
+                if 'perminute' not in quota.replace('_', ''):
+                    continue
+                key = 'tokens_per_minute' if 'token' in quota else 'requests_per_minute'
+                info[key] = value if info[key] is None else min(info[key], value)
+    return info
+
+
+class QuotaBudget:
+    """Sliding-minute request and token budget for one model.
+
+    A limit of 0 means unknown: calls are not held back until a quota error
+    reveals (or approximates) the real limit.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, clock=time.monotonic):
+        self.max_requests = requests_per_minute
+        self.max_tokens = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self.calls = deque()  # [admitted_at, tokens] per call in the last minute
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.adapted_requests = False  # limits lowered by quota errors, not just configured
+        self.adapted_tokens = False
+
+    def _prune(self, now):
+        while self.calls and self.calls[0][0] <= now - WINDOW_SECONDS:
+            self.calls.popleft()
+
+    def wait_time(self, tokens, share, now):
+        """Seconds until a call of tokens fits share of the budget (0 if it fits now)."""
+        self._prune(now)
+        wait = self.blocked_until - now
+        if not self.calls:
+            return max(0.0, wait)
+        until_oldest_expires = self.calls[0][0] + WINDOW_SECONDS - now
+        if self.requests_per_minute and len(self.calls) + 1 > self.requests_per_minute * share:
+            wait = max(wait, until_oldest_expires)
+        if self.tokens_per_minute and sum(call[1] for call in self.calls) + tokens > self.tokens_per_minute * share:
+            wait = max(wait, until_oldest_expires)
+        return max(0.0, wait)
+
+    def admit(self, tokens, now):
+        ticket = [now, tokens]
+        self.calls.append(ticket)
+        return ticket
+
+    def throttled(self, quota, now):
+        """Adopt the limits a quota error states, or halve them; block until its retry delay."""
+        self._prune(now)
+        self.consecutive_throttles += 1
+        if quota['requests_per_minute']:
+            self.requests_per_minute = self.max_requests = quota['requests_per_minute']
+            self.adapted_requests = True
+        elif not quota['tokens_per_minute']:
+            # No stated limit: assume the rate that got throttled was twice too much
+            used = self.requests_per_minute or len(self.calls) or 2
+            self.max_requests = self.max_requests or used
+            self.requests_per_minute = max(1, used // 2)
+            self.adapted_requests = True
+        if quota['tokens_per_minute']:
+            self.tokens_per_minute = self.max_tokens = quota['tokens_per_minute']
+            self.adapted_tokens = True
+        delay = quota['retry_delay']
+        if delay is None:
+            delay = min(MAX_BACKOFF_SECONDS, 2.0 ** self.consecutive_throttles)
+        self.blocked_until = max(self.blocked_until, now + delay)
+        return delay
+
+    def release(self, ticket):
+        """Drop a ticket whose call failed, so it no longer counts against the budget."""
+        try:
+            self.calls.remove(ticket)
+        except ValueError:
+            pass  # already out of the window
+
+    def reconfigure(self, requests_per_minute, tokens_per_minute, raise_requests, raise_tokens):
+        """Apply configured limits; limits learned from quota errors stay unless the configured one went up."""
+        if raise_requests or not self.adapted_requests:
+            self.max_requests = self.requests_per_minute = requests_per_minute
+            self.adapted_requests = False
+        else:
+            self.max_requests = _lower(self.max_requests, requests_per_minute)
+            self.requests_per_minute = _lower(self.requests_per_minute, requests_per_minute)
+        if raise_tokens or not self.adapted_tokens:
+            self.max_tokens = self.tokens_per_minute = tokens_per_minute
+            self.adapted_tokens = False
+        else:
+            self.max_tokens = _lower(self.max_tokens, tokens_per_minute)
+            self.tokens_per_minute = _lower(self.tokens_per_minute, tokens_per_minute)
+
+    def succeeded(self):
+        """Additively recover a halved request limit."""
+        self.consecutive_throttles = 0
+        if self.requests_per_minute < self.max_requests:
+            self.requests_per_minute = min(self.max_requests, self.requests_per_minute + max(1, self.max_requests // 10))
+
+    def state(self, now):
+        self._prune(now)
+        return {
+            'requests_per_minute': self.requests_per_minute or None,
+            'tokens_per_minute': self.tokens_per_minute or None,
+            'requests_last_minute': len(self.calls),
+            'tokens_last_minute': sum(call[1] for call in self.calls),
+            'blocked_for': round(max(0.0, self.blocked_until - now), 2),
+        }
+
+
+class AdmissionController:
+    """Admit Gemini calls within per-model RPM/TPM budgets, live calls first.
+
+    acquire() blocks until a call fits its model's budget. Live calls may
+    use the whole budget; backfill calls only backfill_share of it, and
+    never while a live call is waiting. A caller with a deadline gets None
+    instead of waiting past it, so it can defer the work. Quota errors
+    (429 RESOURCE_EXHAUSTED) tighten the model's budget to the limit they
+    state and block it for their retryDelay.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, backfill_share=0.5,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.backfill_share = backfill_share
+        self.clock = clock
+        self.sleep = sleep
+        self.metrics = metrics
+        self.budgets = {}
+        self._live_waiting = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, clock=time.monotonic, sleep=time.sleep):
+        return cls(config.GEMINI_REQUESTS_PER_MINUTE, config.GEMINI_TOKENS_PER_MINUTE,
+                   config.GEMINI_BACKFILL_SHARE, clock=clock, sleep=sleep)
+
+    def configure(self, requests_per_minute, tokens_per_minute, backfill_share):
+        """Change the configured budgets in place.
+
+        Limits learned from quota errors are kept where they are lower, unless
+        the configured limit itself went up.
+        """
+        with self._lock:
+            raise_requests = _raised(self.requests_per_minute, requests_per_minute)
+            raise_tokens = _raised(self.tokens_per_minute, tokens_per_minute)
+            self.requests_per_minute = requests_per_minute
+            self.tokens_per_minute = tokens_per_minute
+            self.backfill_share = backfill_share
+            for budget in self.budgets.values():
+                budget.reconfigure(requests_per_minute, tokens_per_minute, raise_requests, raise_tokens)
+
+    def _budget(self, model):
+        budget = self.budgets.get(model)
+        if budget is None:
+            budget = self.budgets[model] = QuotaBudget(self.requests_per_minute, self.tokens_per_minute, self.clock)
+        return budget
+
+    def _wait_time(self, model, tokens, priority):
+        if priority != LIVE and self._live_waiting:
+            return YIELD_SECONDS
+        share = 1.0 if priority == LIVE else self.backfill_share
+        return self._budget(model).wait_time(tokens, share, self.clock())
+
+    def acquire(self, model, tokens=0, priority=LIVE, deadline=None):
+        """Wait until a call of about tokens fits model's budget; returns a ticket for settle().
+
+        Returns None, without waiting, when the wait would outlast deadline
+        (anything with remaining()).
+        """
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    wait = self._wait_time(model, tokens, priority)
+                    if wait <= 0:
+                        return self._budget(model).admit(tokens, self.clock())
+                    if priority == LIVE and not queued:
+                        queued = True
+                        self._live_waiting += 1
+                if deadline is not None and wait > deadline.remaining():
+                    self.metrics.increment(f'gemini.admission.rejected.{priority}')
+                    return None
+                logger.debug(f"Gemini admission: {priority} call to {model} waits {wait:.1f}s for quota")
+                self.metrics.increment(f'gemini.admission.waits.{priority}')
+                self.metrics.observe(f'gemini.admission.wait_ms.{priority}', wait * 1000)
+                self.sleep(wait)
+        finally:
+            if queued:
+                with self._lock:
+                    self._live_waiting -= 1
+
+    def settle(self, model, ticket, tokens):
+        """Replace a ticket's estimated tokens with the call's actual usage."""
+        if ticket is not None and tokens:
+            with self._lock:
+                ticket[1] = tokens
+
+    def release(self, model, ticket):
+        """Give back the quota a failed call reserved."""
+        with self._lock:
+            self._budget(model).release(ticket)
+
+    def succeeded(self, model):
+        with self._lock:
+            self._budget(model).succeeded()
+
+    def throttled(self, model, error):
+        """Adapt model's budget to a quota error; returns the seconds it is blocked for."""
+        quota = parse_quota_error(error)
+        with self._lock:
+            delay = self._budget(model).throttled(quota, self.clock())
+            budget = self._budget(model)
+        self.metrics.increment(f'gemini.quota_errors.{model}')
+        logger.warning(f"{model} quota exhausted - {budget.requests_per_minute or '?'} requests/min, "
+                       f"{budget.tokens_per_minute or '?'} tokens/min, blocked for {delay:.0f}s")
+        return delay
+
+    def state(self):
+        """Per-model budgets and recent usage, for the status endpoint."""
+        with self._lock:
+            now = self.clock()
+            return {model: budget.state(now) for model, budget in self.budgets.items()}
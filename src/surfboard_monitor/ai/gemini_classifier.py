@@ -3,23 +3,57 @@ Gemini AI classifier for surfboard type detection.
 """
 
 import logging
+from collections import Counter
 from google import genai
-from google.genai import errors
+from google.genai import errors, types
 from ..config import Config
-from .prompts import CLASSIFICATION_PROMPT_TEMPLATE, LISTING_FORMAT_TEMPLATE
+from ..core.logging_setup import PER_LISTING
+from ..core.metrics import metrics
+from ..filters.keywords import KeywordMatcher
+from .admission import LIVE, AdmissionController
+from .model_router import DeadlineExceeded, ModelRouter
+from .prompt_builder import PromptBuilder, RubricCache, estimate_tokens, record_token_usage
+from .replay import RecordingClient
+from .streaming import VerdictParser
 
 logger = logging.getLogger(__name__)
 
+BOARD_LABELS = ('LONGBOARD', 'MIDLENGTH', 'SHORTBOARD', 'OTHER')
+UNCERTAIN = 'UNCERTAIN'
+
 class GeminiClassifier:
     """AI classifier for filtering surfboard listings using Gemini AI."""
     
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None, admission=None, priority=LIVE):
+        self.config = config or Config()
         self.client = None
+        # Results of the latest label_listings/stream_labels call, for the thread that made it
+        self.last_labels = {}  # listing id -> classification
+        self.deferred = []  # listings left unclassified (deadline or quota ran out)
+        self.safety_matcher = self._build_safety_matcher()
+        self.metrics = metrics
+        self.router = ModelRouter(
+            self.config.GEMINI_MODELS,
+            self.config.GEMINI_LATENCY_SLO_MS,
+            self.config.GEMINI_TIMEOUT_SECONDS,
+            admission=admission or AdmissionController.from_config(self.config),
+            priority=priority
+        )
+        # Only ask for UNCERTAIN answers when there is a stronger model to escalate to
+        self.escalate = self.config.GEMINI_ESCALATE_UNCERTAIN and len(self.router.models) > 1
+        self.prompt_builder = PromptBuilder(
+            self.config.PROMPT_MODE,
+            self.config.PROMPT_DESCRIPTION_CHARS,
+            allow_uncertain=self.escalate
+        )
+        self.rubric_caches = {}  # model -> RubricCache (context caches are per model)
         
         if self.config.GEMINI_API_KEY:
             try:
                 self.client = genai.Client(api_key=self.config.GEMINI_API_KEY)
+                if self.config.GEMINI_RECORD_FILE:
+                    self.client = RecordingClient(self.client, self.config.GEMINI_RECORD_FILE)
+                    logger.info(f"Recording Gemini exchanges to {self.config.GEMINI_RECORD_FILE}")
                 logger.info("Gemini AI classifier initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Gemini AI: {e}")
@@ -27,81 +61,256 @@ class GeminiClassifier:
         else:
             logger.warning("GEMINI_API_KEY not configured - AI filtering disabled")
     
-    def classify_listings(self, listings):
-        """Classify multiple surfboard listings in a single API call and return only longboards."""
+    def apply_config(self, config):
+        """Switch to a new config snapshot, keeping the client, router history and rubric caches."""
+        safety_matcher = self._build_safety_matcher(config)
+        escalate = config.GEMINI_ESCALATE_UNCERTAIN and len(self.router.models) > 1
+        prompt_builder = PromptBuilder(config.PROMPT_MODE, config.PROMPT_DESCRIPTION_CHARS, allow_uncertain=escalate)
+        if prompt_builder.system_instruction != self.prompt_builder.system_instruction:
+            self.rubric_caches = {}  # cached rubrics no longer match the prompt
+        self.router.slo_ms = config.GEMINI_LATENCY_SLO_MS
+        self.router.timeout_seconds = config.GEMINI_TIMEOUT_SECONDS
+        self.safety_matcher, self.escalate, self.prompt_builder = safety_matcher, escalate, prompt_builder
+        self.config = config
+    
+    def _build_safety_matcher(self, config=None):
+        """Compile the title safety-check keyword lists once."""
+        config = config or self.config
+        return KeywordMatcher({
+            'blacklist': config.CLASSIFIER_BLACKLIST_KEYWORDS,
+            'shortboard': config.SHORTBOARD_DIMENSIONS,
+            'noserider': ['noserider'],
+        })
+    
+    def classify_listings(self, listings, board_classes=('LONGBOARD',), deadline=None):
+        """Classify multiple surfboard listings in a single API call and return only longboards.
+        
+        board_classes widens the kept set (e.g. ('LONGBOARD', 'MIDLENGTH')).
+        """
+        if not listings:
+            return listings
+        
+        filtered_listings = []
+        for listing, classification in self.label_listings(listings, deadline=deadline):
+            title = listing.get('title', 'Unknown')
+            if classification in board_classes:
+                logger.debug("Keeping %s: %s", classification, title, extra=PER_LISTING)
+                filtered_listings.append(listing)
+            else:
+                logger.debug("Filtering out %s: %s", classification, title, extra=PER_LISTING)
+        
+        logger.info(f"Batch classification: {len(listings)} -> {len(filtered_listings)} listings")
+        return filtered_listings
+    
+    def label_listings(self, listings, deadline=None):
+        """Classify listings in a single API call and return (listing, classification) pairs.
+        
+        Classifications have already been through the title safety checks. Returns an
+        empty list when filtering is disabled or the API call fails (no notifications).
+        When deadline (see CycleDeadline) runs out first, or every model's quota is
+        exhausted (429), the listings are left in self.deferred for the caller to
+        retry instead of being dropped. self.last_labels maps each labelled id.
+        """
+        labelled, self.deferred = self.label_batch(listings, deadline)
+        self.last_labels = {listing.get('id'): classification for listing, classification in labelled}
+        return labelled
+    
+    def label_batch(self, listings, deadline=None):
+        """label_listings for callers sharing the classifier: return (labelled pairs, deferred listings).
+        
+        Unlike label_listings this leaves self.deferred and self.last_labels alone,
+        so a background caller (the micro-batcher) can't overwrite another
+        caller's results.
+        """
         if not self.client or not self.config.ENABLE_GEMINI_FILTERING:
             logger.info("Gemini filtering disabled - returning empty list (no notifications)")
-            return []
+            return [], []
         
         if not listings:
-            return listings
+            return [], []
         
         try:
-            # Build a comprehensive prompt with all listings
-            listings_text = ""
-            for i, listing in enumerate(listings, 1):
-                listings_text += LISTING_FORMAT_TEMPLATE.format(
-                    i=i,
-                    title=listing.get('title', ''),
-                    description=listing.get('description', ''),
-                    price=listing.get('price', '')
-                )
-            
-            # Format the classification prompt with listings
-            prompt = CLASSIFICATION_PROMPT_TEMPLATE.format(
-                listings_text=listings_text
-            )
+            # Build one prompt with all listings
+            prompt = self.prompt_builder.build(listings)
+            estimated = estimate_tokens(prompt) + estimate_tokens(self.prompt_builder.system_instruction or '')
             
-            logger.info(f"Classifying {len(listings)} listings in batch with Gemini AI")
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt
-            )
+            logger.info(f"Classifying {len(listings)} listings in batch with Gemini AI (~{estimated} prompt tokens)")
+            model, response = self.router.generate(self.client, prompt, self._generate_config, deadline=deadline,
+                                                   tokens=estimated)
+            record_token_usage(estimated, response)
             
             # Parse the response
-            classifications = response.text.strip().split('\n')
-            filtered_listings = []
+            classifications = self._parse_classifications(response.text, len(listings))
+            uncertain = [i for i, classification in enumerate(classifications) if classification not in BOARD_LABELS]
+            if uncertain and self.escalate:
+                self._escalate(listings, classifications, uncertain, model, deadline)
             
-            for i, (listing, classification_line) in enumerate(zip(listings, classifications)):
-                # Extract classification from the line (handle formats like "1. LONGBOARD" or just "LONGBOARD")
-                classification = classification_line.split('.')[-1].strip().upper()
-                
-                title = listing.get('title', 'Unknown')
-                logger.info(f"Gemini classification for '{title}': {classification}")
-                
-                # Additional safety checks for obvious non-surfboard items
-                title_lower = title.lower()
-                if any(keyword in title_lower for keyword in ['router', 'modem', 'wifi', 'wetsuit', 'shirt', 'clothing', 'rack', 'bag', 'paddleboard', 'sup']):
-                    logger.info(f"❌ Filtering out (safety check): {title}")
-                    continue
-                
-                # Safety check: filter out obvious shortboards by dimensions
-                if any(dim in title_lower for dim in ["5'7", "5'8", "5'9", "5'10", "5'11", "6'0", "6'1", "6'2", "5'7\"", "5'8\"", "5'9\"", "5'10\"", "5'11\"", "6'0\"", "6'1\"", "6'2\""]):
-                    logger.info(f"❌ Filtering out (safety check - shortboard dimensions): {title}")
-                    continue
-                
-                # Special case: noserider boards should be kept (they are longboards)
-                if 'noserider' in title_lower and classification == 'OTHER':
-                    logger.info(f"✅ Override: Noserider board should be LONGBOARD: {title}")
-                    classification = 'LONGBOARD'
-                
-                # Keep only longboard
-                if classification in ['LONGBOARD']:
-                    logger.info(f"✅ Keeping {classification}: {title}")
-                    filtered_listings.append(listing)
-                else:
-                    logger.info(f"❌ Filtering out {classification}: {title}")
-            
-            logger.info(f"Batch classification: {len(listings)} -> {len(filtered_listings)} listings")
-            return filtered_listings
+            labelled = [(listing, self._apply_safety_checks(listing, classification))
+                        for listing, classification in zip(listings, classifications)]
+            overrides = sum(checked != raw for (_, checked), raw in zip(labelled, classifications))
+            self._log_summary([classification for _, classification in labelled], overrides)
+            return labelled, []
             
+        except DeadlineExceeded:
+            return [], self._defer(listings)
         except errors.APIError as e:
+            if e.code == 429:
+                return [], self._defer(listings, quota=True)
             logger.error(f"Gemini API error: {e.code} - {e.message}")
             # If API error, return empty list to be safe (no notifications)
             logger.warning("Returning empty list due to API error - no notifications will be sent")
-            return []
+            return [], []
         except Exception as e:
             logger.error(f"Error in batch classification with Gemini: {e}")
             # If classification fails, return empty list to be safe (no notifications)
             logger.warning("Returning empty list due to classification error - no notifications will be sent")
-            return []
+            return [], []
+    
+    def stream_labels(self, listings, deadline=None):
+        """Yield (listing, classification) pairs as Gemini's streamed answer arrives.
+        
+        Each verdict is safety-checked and yielded as soon as its line is complete;
+        UNCERTAIN or missing verdicts are escalated together once the stream ends.
+        Yields nothing when filtering is disabled, and stops early on an API error.
+        deadline bounds the wait for the first chunk, and quota errors defer the
+        batch, as in label_listings.
+        """
+        self.deferred = []
+        if not self.client or not self.config.ENABLE_GEMINI_FILTERING:
+            logger.info("Gemini filtering disabled - returning empty list (no notifications)")
+            return
+        
+        if not listings:
+            return
+        
+        labels = self.last_labels = {}
+        try:
+            prompt = self.prompt_builder.build(listings)
+            estimated = estimate_tokens(prompt) + estimate_tokens(self.prompt_builder.system_instruction or '')
+            
+            logger.info(f"Streaming classification of {len(listings)} listings with Gemini AI (~{estimated} prompt tokens)")
+            model, chunks = self.router.stream(self.client, prompt, self._generate_config, deadline=deadline,
+                                               tokens=estimated)
+            parser = VerdictParser(len(listings))
+            classifications = [UNCERTAIN] * len(listings)
+            settled = set()
+            last_chunk = None
+            for chunk in chunks:
+                last_chunk = chunk
+                for index, classification in parser.feed(chunk.text or ''):
+                    classifications[index] = classification
+                    if classification in BOARD_LABELS or not self.escalate:
+                        settled.add(index)
+                        yield self._settle(listings[index], classification, labels)
+            for index, classification in parser.close():
+                classifications[index] = classification
+                if classification in BOARD_LABELS or not self.escalate:
+                    settled.add(index)
+                    yield self._settle(listings[index], classification, labels)
+            record_token_usage(estimated, last_chunk)
+            
+            # Held-back UNCERTAIN answers and lines that never came
+            pending = [i for i in range(len(listings)) if i not in settled]
+            if pending and self.escalate:
+                self._escalate(listings, classifications, pending, model, deadline)
+            for i in pending:
+                yield self._settle(listings[i], classifications[i], labels)
+            overrides = sum(labels[listing.get('id')] != raw for listing, raw in zip(listings, classifications))
+            self._log_summary(labels.values(), overrides)
+        
+        except DeadlineExceeded:
+            self.deferred = self._defer(listings)
+        except errors.APIError as e:
+            if e.code == 429:
+                unlabelled = [listing for listing in listings if listing.get('id') not in labels]
+                self.deferred = self._defer(unlabelled, quota=True)
+                return
+            logger.error(f"Gemini API error: {e.code} - {e.message}")
+            logger.warning("Stopping streamed classification due to API error - no further notifications")
+        except Exception as e:
+            logger.error(f"Error in streamed classification with Gemini: {e}")
+            logger.warning("Stopping streamed classification due to error - no further notifications")
+    
+    def _defer(self, listings, quota=False):
+        if quota:
+            logger.warning(f"Gemini quota exhausted on every model - deferring {len(listings)} listings")
+            self.metrics.increment('gemini.quota_deferrals', len(listings))
+        else:
+            logger.warning(f"Deadline reached before Gemini answered - deferring {len(listings)} listings")
+            self.metrics.increment('gemini.deadline_deferrals', len(listings))
+        return list(listings)
+    
+    def _log_summary(self, classifications, overrides):
+        """One INFO line per batch instead of one per listing."""
+        counts = Counter(classifications)
+        summary = ', '.join(f"{label} {count}" for label, count in counts.most_common())
+        logger.info(f"Gemini labelled {sum(counts.values())} listings: {summary or 'none'} "
+                    f"({overrides} safety overrides)")
+    
+    def _settle(self, listing, classification, labels):
+        classification = self._apply_safety_checks(listing, classification)
+        labels[listing.get('id')] = classification
+        return listing, classification
+    
+    def _parse_classifications(self, text, count):
+        """One label per listing, in order; missing lines are UNCERTAIN."""
+        # Handle formats like "1. LONGBOARD" or just "LONGBOARD"
+        classifications = [line.split('.')[-1].strip().upper() for line in text.strip().split('\n')][:count]
+        return classifications + [UNCERTAIN] * (count - len(classifications))
+    
+    def _escalate(self, listings, classifications, uncertain, model, deadline=None):
+        """Re-ask a stronger model about the listings the first pass could not decide."""
+        stronger = self.router.stronger_than(model)
+        if stronger is None:
+            return
+        logger.info(f"Escalating {len(uncertain)} uncertain listings from {model} to {stronger}")
+        self.metrics.increment('gemini.escalations', len(uncertain))
+        prompt = self.prompt_builder.build([listings[i] for i in uncertain])
+        try:
+            _, response = self.router.generate(self.client, prompt, self._generate_config,
+                                               models=self.router.models[self.router.models.index(stronger):],
+                                               deadline=deadline, tokens=estimate_tokens(prompt))
+        except Exception as e:
+            logger.warning(f"Escalation failed, keeping first-pass labels: {e}")
+            return
+        record_token_usage(estimate_tokens(prompt), response)
+        for i, classification in zip(uncertain, self._parse_classifications(response.text, len(uncertain))):
+            classifications[i] = classification
+    
+    def _generate_config(self, model):
+        """GenerateContentConfig carrying the rubric for model in compact mode."""
+        instruction = self.prompt_builder.system_instruction
+        if not instruction:
+            return None
+        if self.config.GEMINI_CACHE_RUBRIC:
+            cache = self.rubric_caches.get(model)
+            if cache is None or cache.client is not self.client:
+                cache = self.rubric_caches[model] = RubricCache(self.client, model, instruction)
+            return cache.generate_config()
+        return types.GenerateContentConfig(system_instruction=instruction)
+    
+    def _apply_safety_checks(self, listing, classification):
+        """Override Gemini's classification where the title makes the answer obvious."""
+        title = listing.get('title', 'Unknown')
+        logger.debug("Gemini classification for '%s': %s", title, classification, extra=PER_LISTING)
+        
+        # One pass over the title reports every safety category it hits
+        hits = self.safety_matcher.match(title)
+        
+        # Additional safety checks for obvious non-surfboard items
+        if 'blacklist' in hits:
+            override = 'OTHER'
+            reason = 'safety check'
+        # Safety check: filter out obvious shortboards by dimensions
+        elif 'shortboard' in hits:
+            override = 'SHORTBOARD'
+            reason = 'safety check - shortboard dimensions'
+        # Special case: noserider boards should be kept (they are longboards)
+        elif 'noserider' in hits and classification == 'OTHER':
+            override = 'LONGBOARD'
+            reason = 'noserider board'
+        else:
+            return classification
+        
+        logger.debug("Override to %s (%s): %s", override, reason, title, extra=PER_LISTING)
+        return override
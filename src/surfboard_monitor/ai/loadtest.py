@@ -0,0 +1,105 @@
+"""
+Load test for GeminiClassifier.classify_listings against a replayed Gemini.
+
+Example:
+    surfboard-monitor-loadtest --recording gemini.jsonl --concurrency 8 --requests 200
+"""
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core.metrics import Metrics
+from ..listing import Listing
+from .gemini_classifier import GeminiClassifier
+from .replay import ReplayClient
+
+SAMPLE_TITLES = [
+    "9'6 Classic Log", "10'0 Noserider", "5'10 Shortboard", "7'6 Midlength egg",
+    "8'0 Funboard", "Wetsuit 4/3 size M", "9'2 Single fin longboard", "6'2 Fish",
+]
+
+
+def make_listings(batch_size, offset=0):
+    """Generate a batch of plausible listings."""
+    return [
+        Listing(
+            id=f"load_{offset + i}",
+            title=SAMPLE_TITLES[(offset + i) % len(SAMPLE_TITLES)],
+            price_cents=((offset + i) % 900 + 100) * 100,
+            description='Moving sale, barely used, no dings',
+            location='San Diego, CA',
+            platform='Craigslist',
+        )
+        for i in range(batch_size)
+    ]
+
+
+def run_load_test(classifier, requests, concurrency, batch_size):
+    """Drive classify_listings from concurrency threads and summarise latency."""
+    results = Metrics(max_samples=max(requests, 1))
+
+    def one_call(n):
+        listings = make_listings(batch_size, offset=n * batch_size)
+        start = time.perf_counter()
+        kept = classifier.classify_listings(listings)
+        results.observe('latency_ms', (time.perf_counter() - start) * 1000)
+        results.increment('listings', len(listings))
+        results.increment('kept', len(kept))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latency = results.snapshot()['samples'].get('latency_ms', {})
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(requests / elapsed, 2) if elapsed else None,
+        'listings_per_s': round(results.counter('listings') / elapsed, 2) if elapsed else None,
+        'p50_ms': latency.get('p50'),
+        'p95_ms': latency.get('p95'),
+        'p99_ms': latency.get('p99'),
+        'max_ms': latency.get('max'),
+    }
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Load test the Gemini classifier against a replayed API")
+    parser.add_argument('--recording', help="JSONL file written by RecordingClient (default: synthetic answers)")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=100.0)
+    parser.add_argument('--recorded-latency', action='store_true', help="Replay the latency captured in the recording")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    # Per-listing classifier logs would dominate the measurement
+    logging.getLogger('surfboard_monitor').setLevel(logging.WARNING)
+
+    options = dict(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                   use_recorded_latency=args.recorded_latency, seed=args.seed)
+    client = ReplayClient.from_file(args.recording, **options) if args.recording else ReplayClient(**options)
+
+    classifier = GeminiClassifier()
+    classifier.client = client
+    classifier.config.ENABLE_GEMINI_FILTERING = True
+
+    report = run_load_test(classifier, args.requests, args.concurrency, args.batch_size)
+    report['api_calls'] = client.calls
+    report['api_errors'] = client.errors
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == '__main__':
+    main()
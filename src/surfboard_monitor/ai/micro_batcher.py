@@ -0,0 +1,125 @@
+"""
+Micro-batching of classification requests from many producers into shared Gemini calls.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from ..core.deadline import CycleDeadline
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFERRED = 'DEFERRED'  # future result for listings the classifier deferred (deadline or quota)
+
+
+class MicroBatcher:
+    """Coalesce listings submitted by any number of producers into one classifier call.
+
+    A batch goes out as soon as it holds max_batch_size listings, or
+    max_wait_ms after its oldest listing arrived, whichever comes first.
+    submit() returns one Future per listing that resolves to the listing's
+    classification, or to None when the call produced no label (filtering
+    disabled or the API failed, as with label_listings), or DEFERRED when the
+    classifier deferred it for lack of quota. Calls run one at a
+    time on a background thread, so listings arriving during a call simply
+    form the next batch. Each call gets at most timeout_seconds, including
+    any wait for Gemini quota, so a drained quota defers a batch instead of
+    holding up every batch queued behind it.
+    """
+
+    def __init__(self, classifier, max_batch_size=40, max_wait_ms=250, timeout_seconds=30, clock=time.monotonic):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.timeout_seconds = timeout_seconds
+        self.clock = clock
+        self.metrics = metrics
+        self._pending = []  # (listing, future, arrived_at)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def submit(self, listings):
+        """Queue listings for classification; returns a Future per listing, in order."""
+        futures = [Future() for _ in listings]
+        if not listings:
+            return futures
+        now = self.clock()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.extend((listing, future, now) for listing, future in zip(listings, futures))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='microbatcher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return futures
+
+    def label_listings(self, listings):
+        """Blocking convenience: (listing, classification) pairs for the labelled listings."""
+        futures = self.submit(listings)
+        return [(listing, future.result()) for listing, future in zip(listings, futures)
+                if future.result() is not None]
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            while self._pending and len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = self._pending[0][2] + self.max_wait_ms / 1000 - self.clock()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        listings = [listing for listing, _, _ in batch]
+        self.metrics.increment('gemini.microbatch.calls')
+        self.metrics.observe('gemini.microbatch.size', len(batch))
+        self.metrics.observe('gemini.microbatch.wait_ms', (self.clock() - batch[0][2]) * 1000)
+        try:
+            labelled, deferred = self.classifier.label_batch(listings, CycleDeadline(self.timeout_seconds, {}, self.clock))
+            labels = {id(listing): classification for listing, classification in labelled}
+            labels.update((id(listing), DEFERRED) for listing in deferred)
+        except Exception as e:
+            logger.error(f"Micro-batch classification failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for listing, future, _ in batch:
+            future.set_result(labels.get(id(listing)))
+
+    def close(self, timeout=None):
+        """Send what is queued, then stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def state(self):
+        """Queue depth, knobs and the recent batch-size distribution, for the status endpoint."""
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'batch_size': {
+                'p50': self.metrics.percentile('gemini.microbatch.size', 50),
+                'p95': self.metrics.percentile('gemini.microbatch.size', 95),
+                'max': max(self.metrics.samples('gemini.microbatch.size'), default=None),
+            },
+        }
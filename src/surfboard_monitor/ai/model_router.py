@@ -0,0 +1,252 @@
+"""
+Latency-aware routing of classification calls across an ordered list of Gemini models.
+"""
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from google.genai import errors, types
+
+from ..core.metrics import _percentile, metrics
+from .admission import LIVE
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying on another model; anything else is a bad request
+FALLBACK_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class ModelTimeout(Exception):
+    """A model did not answer within the router's timeout."""
+
+
+class DeadlineExceeded(ModelTimeout):
+    """The caller's deadline ran out before a model answered."""
+
+
+class QuotaWait(DeadlineExceeded):
+    """A model's quota has no room for the call before the caller's deadline."""
+
+
+class ModelRouter:
+    """Pick a model per call and fall back when it is slow or failing.
+
+    models is ordered cheapest/fastest first. Each call goes to the first model
+    whose recent p95 latency meets slo_ms (models with fewer than min_samples
+    observations are given the benefit of the doubt); on a timeout or a
+    retryable API error the next model is tried. With an admission controller
+    each attempt first waits for room in that model's quota, at the router's
+    priority, and quota errors adapt the model's budget.
+    """
+
+    def __init__(self, models, slo_ms, timeout_seconds, window=50, min_samples=5, max_workers=8,
+                 clock=time.perf_counter, admission=None, priority=LIVE):
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.models = list(models)
+        self.slo_ms = slo_ms
+        self.timeout_seconds = timeout_seconds
+        self.min_samples = min_samples
+        self.clock = clock
+        self.admission = admission
+        self.priority = priority
+        self.metrics = metrics
+        self._latencies = {model: deque(maxlen=window) for model in self.models}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gemini')
+
+    def p95(self, model):
+        """Recent p95 latency of model in ms, or None without data."""
+        return _percentile(sorted(self._latencies[model]), 95)
+
+    def choose(self):
+        """Cheapest model meeting the SLO; the fastest one when none does."""
+        for model in self.models:
+            if len(self._latencies[model]) < self.min_samples or self.p95(model) <= self.slo_ms:
+                return model
+        return min(self.models, key=self.p95)
+
+    def stronger_than(self, model):
+        """Next model up the list, or None for the strongest."""
+        index = self.models.index(model)
+        return self.models[index + 1] if index + 1 < len(self.models) else None
+
+    def candidates(self):
+        """Models to try in order: the chosen one, then the rest of the list."""
+        first = self.choose()
+        return [first] + [model for model in self.models if model != first]
+
+    def _timeout(self, deadline):
+        """Per-call timeout, shortened to what is left of deadline (anything with remaining())."""
+        if deadline is None:
+            return self.timeout_seconds
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        return min(self.timeout_seconds, remaining)
+
+    def _admit(self, model, tokens, deadline):
+        """Wait for room in model's quota; QuotaWait if that would outlast deadline."""
+        if self.admission is None:
+            return None
+        ticket = self.admission.acquire(model, tokens, self.priority, deadline)
+        if ticket is None:
+            raise QuotaWait(model)
+        return ticket
+
+    def _settle(self, model, ticket, response):
+        """Charge the admitted call with its actual token usage (response may be the last stream chunk)."""
+        if self.admission is not None:
+            usage = getattr(response, 'usage_metadata', None)
+            self.admission.settle(model, ticket, getattr(usage, 'total_token_count', None))
+            self.admission.succeeded(model)
+
+    def _release(self, model, ticket):
+        """Give back the quota reserved for a call that failed before the server counted it."""
+        if self.admission is not None and ticket is not None:
+            self.admission.release(model, ticket)
+
+    def _settled(self, model, ticket, chunks):
+        last_chunk = None
+        try:
+            for chunk in chunks:
+                last_chunk = chunk
+                yield chunk
+        finally:
+            self._settle(model, ticket, last_chunk)
+
+    def _failed(self, model, error):
+        if error.code == 429 and self.admission is not None:
+            self.admission.throttled(model, error)
+        self.metrics.increment(f'gemini.errors.{model}')
+        logger.warning(f"{model} failed with {error.code} - falling back")
+
+    def generate(self, client, contents, config_for=None, models=None, deadline=None, tokens=0):
+        """Call generate_content, falling back across models; return (model, response).
+
+        models overrides the routing order (e.g. only stronger models when
+        escalating); config_for(model) supplies a per-model GenerateContentConfig;
+        tokens estimates the call's size for the admission controller.
+        Quota reserved for a failed attempt is released before falling back,
+        except after a 429: the server counted that call, so it stays charged.
+        Raises the last error when every model fails, or DeadlineExceeded once
+        deadline has no time left for another attempt.
+        """
+        last_error = None
+        for model in models or self.candidates():
+            ticket = None
+            try:
+                ticket = self._admit(model, tokens, deadline)
+                response = self._call(client, model, contents, config_for(model) if config_for else None,
+                                      self._timeout(deadline))
+                self._settle(model, ticket, response)
+                ticket = None
+                return model, response
+            except QuotaWait as e:
+                last_error = e
+                logger.info(f"{model} has no quota left before the deadline - trying the next model")
+            except DeadlineExceeded:
+                raise
+            except ModelTimeout as e:
+                last_error = e
+                logger.warning(f"{model} timed out after {self.timeout_seconds}s - falling back")
+            except errors.APIError as e:
+                if e.code not in FALLBACK_STATUS_CODES:
+                    raise
+                last_error = e
+                self._failed(model, e)
+                if e.code == 429:
+                    ticket = None  # the server counted the call against the quota; keep it charged
+            finally:
+                self._release(model, ticket)
+        raise last_error
+
+    def stream(self, client, contents, config_for=None, models=None, deadline=None, tokens=0):
+        """Start generate_content_stream with fallback; return (model, chunk iterator).
+
+        Falling back is only possible until the first chunk arrives, so the
+        timeout (and deadline) applies to time-to-first-chunk. Latency, and
+        the token usage of the final chunk, are recorded when the stream is
+        exhausted.
+        """
+        last_error = None
+        for model in models or self.candidates():
+            ticket = None
+            try:
+                ticket = self._admit(model, tokens, deadline)
+                chunks = self._stream(client, model, contents, config_for(model) if config_for else None,
+                                      self._timeout(deadline))
+                chunks, ticket = self._settled(model, ticket, chunks), None
+                return model, chunks
+            except QuotaWait as e:
+                last_error = e
+                logger.info(f"{model} has no quota left before the deadline - trying the next model")
+            except DeadlineExceeded:
+                raise
+            except ModelTimeout as e:
+                last_error = e
+                logger.warning(f"{model} sent nothing for {self.timeout_seconds}s - falling back")
+            except errors.APIError as e:
+                if e.code not in FALLBACK_STATUS_CODES:
+                    raise
+                last_error = e
+                self._failed(model, e)
+                if e.code == 429:
+                    ticket = None  # the server counted the call against the quota; keep it charged
+            finally:
+                self._release(model, ticket)
+        raise last_error
+
+    def _stream(self, client, model, contents, config, timeout):
+        start = self.clock()
+
+        def first_chunk():
+            chunks = iter(client.models.generate_content_stream(
+                model=model, contents=contents, config=self._with_timeout(config, timeout)
+            ))
+            return chunks, next(chunks, None)
+
+        try:
+            chunks, first = self._executor.submit(first_chunk).result(timeout=timeout)
+        except FutureTimeout:
+            self._record(model, timeout * 1000)
+            self.metrics.increment(f'gemini.timeouts.{model}')
+            raise ModelTimeout(model)
+        self.metrics.observe(f'gemini.first_chunk_ms.{model}', (self.clock() - start) * 1000)
+
+        def rest():
+            if first is not None:
+                yield first
+            yield from chunks
+            self._record(model, (self.clock() - start) * 1000)
+
+        return rest()
+
+    def _with_timeout(self, config, timeout):
+        # Ask the SDK to give up at the same deadline so abandoned calls free their thread
+        http_options = types.HttpOptions(timeout=int(timeout * 1000))
+        return (config or types.GenerateContentConfig()).model_copy(update={'http_options': http_options})
+
+    def _call(self, client, model, contents, config, timeout):
+        config = self._with_timeout(config, timeout)
+        start = self.clock()
+        future = self._executor.submit(client.models.generate_content, model=model, contents=contents, config=config)
+        try:
+            response = future.result(timeout=timeout)
+        except FutureTimeout:
+            self._record(model, timeout * 1000)
+            self.metrics.increment(f'gemini.timeouts.{model}')
+            raise ModelTimeout(model)
+        self._record(model, (self.clock() - start) * 1000)
+        return response
+
+    def _record(self, model, latency_ms):
+        self._latencies[model].append(latency_ms)
+        self.metrics.observe(f'gemini.latency_ms.{model}', latency_ms)
+        self.metrics.increment(f'gemini.calls.{model}')
+
+    def state(self):
+        """Per-model recent p95 and sample count."""
+        return {model: {'p95_ms': self.p95(model), 'samples': len(self._latencies[model])}
+                for model in self.models}
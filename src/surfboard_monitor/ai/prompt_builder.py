@@ -0,0 +1,160 @@
+"""
+Compact classification prompts and per-call token accounting.
+"""
+
+import logging
+import re
+import time
+
+from google.genai import types
+
+from ..core.metrics import metrics
+from ..filters.batch_filter import parse_board_length
+from ..filters.keywords import KeywordMatcher
+from .prompts import (
+    CLASSIFICATION_PROMPT_TEMPLATE, CLASSIFICATION_RUBRIC, COMPACT_LISTING_TEMPLATE, COMPACT_PROMPT_TEMPLATE,
+    LISTING_FORMAT_TEMPLATE, UNCERTAIN_RULE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Words that tell the model what kind of board (or non-board) a listing is
+BOARD_KEYWORDS = [
+    'longboard', 'long board', 'noserider', 'nose rider', 'midlength', 'mid length', 'mid-length',
+    'funboard', 'fun board', 'shortboard', 'short board', 'fish', 'single fin', '2+1', 'thruster',
+    'twin', 'volume', 'liters', 'soft top', 'softtop', 'foamie', 'epoxy', 'wetsuit', 'leash',
+    'paddle', 'skateboard',
+]
+# Short words that are also parts of unrelated ones ("blog", "super", "track"): whole words only
+BOARD_WORDS = ['log', 'egg', 'quad', 'sup', 'rack', 'bag']
+_BOARD_WORD_RE = re.compile(rf"\b(?:{'|'.join(BOARD_WORDS)})s?\b", re.IGNORECASE)
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+_SPACE_RE = re.compile(r'\s+')
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def normalize(text):
+    return _SPACE_RE.sub(' ', text or '').strip()
+
+
+def truncate(text, max_chars):
+    """Cut text at a word boundary so it fits max_chars."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1].rsplit(' ', 1)[0]
+    return cut + '…'
+
+
+class PromptBuilder:
+    """Build classification prompts.
+
+    ``full`` reproduces the original prompt. ``compact`` moves the rubric into a
+    system instruction, drops the price (already enforced by the pre-filter),
+    and keeps only the description sentences that mention board keywords or,
+    when the title has no length, a board length. allow_uncertain lets the
+    model answer UNCERTAIN so the listing can be escalated.
+    """
+
+    def __init__(self, mode='compact', description_chars=240, allow_uncertain=False):
+        self.mode = mode
+        self.description_chars = description_chars
+        self.allow_uncertain = allow_uncertain
+        self.keywords = KeywordMatcher({'board': BOARD_KEYWORDS})
+
+    @property
+    def system_instruction(self):
+        if self.mode != 'compact':
+            return None
+        return f"{CLASSIFICATION_RUBRIC}\n{UNCERTAIN_RULE}" if self.allow_uncertain else CLASSIFICATION_RUBRIC
+
+    def mentions_board(self, text):
+        return self.keywords.matches(text, 'board') or _BOARD_WORD_RE.search(text) is not None
+
+    def relevant_description(self, title, description):
+        """Most informative spans of description, normalised and truncated."""
+        description = normalize(description)
+        if not description or description == normalize(title):
+            return ''
+        title_has_length = parse_board_length(title) is not None
+        sentences = [s for s in _SENTENCE_RE.split(description) if s]
+        relevant = [s for s in sentences
+                    if self.mentions_board(s) or (not title_has_length and parse_board_length(s) is not None)]
+        return truncate(' '.join(relevant or sentences[:1]), self.description_chars)
+
+    def listing_text(self, i, listing):
+        title = listing.get('title', '')
+        if self.mode != 'compact':
+            return LISTING_FORMAT_TEMPLATE.format(
+                i=i, title=title, description=listing.get('description', ''), price=listing.get('price', '')
+            )
+        description = self.relevant_description(title, listing.get('description', ''))
+        details = f" | {description}" if description else ''
+        return COMPACT_LISTING_TEMPLATE.format(i=i, title=normalize(title), details=details)
+
+    def build(self, listings):
+        """Return the prompt contents for a batch of listings."""
+        listings_text = ''.join(self.listing_text(i, listing) for i, listing in enumerate(listings, 1))
+        if self.mode == 'compact':
+            return COMPACT_PROMPT_TEMPLATE.format(listings_text=listings_text)
+        prompt = CLASSIFICATION_PROMPT_TEMPLATE.format(listings_text=listings_text)
+        return f"{prompt}\n{UNCERTAIN_RULE}\n" if self.allow_uncertain else prompt
+
+
+class RubricCache:
+    """Hold the rubric in a Gemini context cache and hand out configs that reference it.
+
+    Falls back to sending the rubric as a system instruction when the client
+    has no caches API or the cache cannot be created (e.g. below the model's
+    minimum cacheable size).
+    """
+
+    def __init__(self, client, model, rubric, ttl_seconds=3600):
+        self.client = client
+        self.model = model
+        self.rubric = rubric
+        self.ttl_seconds = ttl_seconds
+        self.name = None
+        self.expires_at = 0.0
+        self.disabled = not hasattr(client, 'caches')
+
+    def generate_config(self):
+        """GenerateContentConfig using the cache when available, else the inline rubric."""
+        if not self.disabled and time.time() >= self.expires_at:
+            self._create()
+        if self.name:
+            return types.GenerateContentConfig(cached_content=self.name)
+        return types.GenerateContentConfig(system_instruction=self.rubric)
+
+    def _create(self):
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(system_instruction=self.rubric, ttl=f"{self.ttl_seconds}s"),
+            )
+            self.name = cache.name
+            # Renew a minute early so calls never reference an expired cache
+            self.expires_at = time.time() + self.ttl_seconds - 60
+            logger.info(f"Created Gemini context cache {self.name} for the classification rubric")
+        except Exception as e:
+            logger.warning(f"Context caching unavailable, sending rubric inline: {e}")
+            self.name = None
+            self.disabled = True
+
+
+def record_token_usage(estimated, response):
+    """Record estimated vs reported token counts for one call."""
+    metrics.increment('gemini.calls')
+    metrics.observe('gemini.tokens.estimated', estimated)
+    usage = getattr(response, 'usage_metadata', None)
+    for field, name in (('prompt_token_count', 'prompt'), ('cached_content_token_count', 'cached'),
+                        ('candidates_token_count', 'output')):
+        value = getattr(usage, field, None) if usage is not None else None
+        if isinstance(value, int):
+            metrics.observe(f'gemini.tokens.{name}', value)
+            metrics.increment(f'gemini.tokens.{name}_total', value)
@@ -34,3 +34,19 @@ LISTING_FORMAT_TEMPLATE = """
    Description: {description}
    Price: {price}
 """
+
+# Compact mode: the rubric is sent once as a system instruction (or context cache)
+CLASSIFICATION_RUBRIC = """Classify surfboard listings as LONGBOARD, MIDLENGTH, SHORTBOARD or OTHER.
+- LONGBOARD: 8ft+ (typically 9-10ft), or a noserider/log/traditional longboard
+- MIDLENGTH: 7-8ft hybrids
+- SHORTBOARD: under 7ft, incl. 5'7"-6'2"; 6ft and under is never LONGBOARD
+- OTHER: wetsuits, accessories, routers, modems, clothing, non-surfboards or unclear
+Be strict about length. Answer with one line per listing, in order: "1. LONGBOARD"."""
+
+# Added to either rubric when a stronger model can take a second look
+UNCERTAIN_RULE = "- UNCERTAIN: the listing does not say enough to decide (a stronger model will re-check it)"
+
+COMPACT_PROMPT_TEMPLATE = """Classify:
+{listings_text}"""
+
+COMPACT_LISTING_TEMPLATE = "{i}. Title: {title}{details}\n"
@@ -0,0 +1,199 @@
+"""
+Record real Gemini exchanges to disk and replay them without the network.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from google.genai import errors
+
+logger = logging.getLogger(__name__)
+
+_LISTING_LINE_RE = re.compile(r'^\s*(\d+)\. Title:', re.MULTILINE)
+
+
+def prompt_key(model, contents):
+    """Stable key for a (model, prompt) pair."""
+    return hashlib.sha256(f"{model}\n{contents}".encode('utf-8')).hexdigest()
+
+
+def _usage_dict(response):
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return None
+    fields = ('prompt_token_count', 'candidates_token_count', 'total_token_count')
+    values = {field: getattr(usage, field, None) for field in fields}
+    return values if any(isinstance(v, int) for v in values.values()) else None
+
+
+class ReplayResponse:
+    """Minimal stand-in for GenerateContentResponse."""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        if isinstance(usage_metadata, dict):
+            usage_metadata = SimpleNamespace(**usage_metadata)
+        self.usage_metadata = usage_metadata
+
+
+class RecordingClient:
+    """Wrap a genai client and append each generate_content exchange to a JSONL file."""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self.models = _RecordingModels(self)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _write(self, record):
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+
+
+class _RecordingModels:
+    def __init__(self, recorder):
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._recorder.client.models, name)
+
+    def generate_content(self, model, contents, **kwargs):
+        record = {'model': model, 'key': prompt_key(model, contents), 'prompt': contents}
+        start = time.perf_counter()
+        try:
+            response = self._recorder.client.models.generate_content(model=model, contents=contents, **kwargs)
+        except errors.APIError as e:
+            record.update(latency_ms=(time.perf_counter() - start) * 1000,
+                          error={'code': e.code, 'message': e.message, 'status': e.status})
+            self._recorder._write(record)
+            raise
+        record.update(latency_ms=(time.perf_counter() - start) * 1000,
+                      response_text=response.text, usage=_usage_dict(response))
+        self._recorder._write(record)
+        return response
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        """Pass chunks through as they arrive; record the joined text once the stream ends."""
+        record = {'model': model, 'key': prompt_key(model, contents), 'prompt': contents}
+        start = time.perf_counter()
+        texts, last = [], None
+        for chunk in self._recorder.client.models.generate_content_stream(model=model, contents=contents, **kwargs):
+            texts.append(chunk.text or '')
+            last = chunk
+            yield chunk
+        record.update(latency_ms=(time.perf_counter() - start) * 1000,
+                      response_text=''.join(texts), usage=_usage_dict(last))
+        self._recorder._write(record)
+
+
+def load_recording(path):
+    """Read a JSONL recording into a list of records."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def synthetic_response(contents, label='LONGBOARD'):
+    """Answer a classification prompt with one label per listing in it."""
+    count = len(_LISTING_LINE_RE.findall(contents))
+    return '\n'.join(f"{i}. {label}" for i in range(1, count + 1))
+
+
+class ReplayClient:
+    """Serve recorded (or synthetic) responses with configurable latency and errors.
+
+    Prompts are looked up by hash; unknown prompts get a synthetic answer with
+    one LONGBOARD line per listing so load tests can use generated listings.
+    """
+
+    def __init__(self, records=(), latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_code=503,
+                 use_recorded_latency=False, seed=None, sleep=time.sleep):
+        self.records = {}
+        for record in records:
+            self.records.setdefault(record['key'], record)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.use_recorded_latency = use_recorded_latency
+        self.sleep = sleep
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = _ReplayModels(self)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(load_recording(path), **kwargs)
+
+    def _delay(self, record):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self.error_rate and self._random.random() < self.error_rate
+        delay = self.latency_ms
+        if self.use_recorded_latency and record and record.get('latency_ms') is not None:
+            delay = record['latency_ms']
+        return max(0.0, delay + jitter) / 1000.0, fail
+
+
+class _ReplayModels:
+    def __init__(self, replay):
+        self._replay = replay
+
+    def generate_content(self, model, contents, **kwargs):
+        replay = self._replay
+        record = replay.records.get(prompt_key(model, contents))
+        delay, fail = replay._delay(record)
+        with replay._lock:
+            replay.calls += 1
+        if delay:
+            replay.sleep(delay)
+        if fail or (record and record.get('error')):
+            error = (record or {}).get('error') or {
+                'code': replay.error_code, 'message': 'Injected replay error', 'status': 'UNAVAILABLE'
+            }
+            with replay._lock:
+                replay.errors += 1
+            raise errors.APIError(error['code'], {'error': error})
+        if record:
+            return ReplayResponse(record['response_text'], record.get('usage'))
+        return ReplayResponse(synthetic_response(contents))
+
+    def generate_content_stream(self, model, contents, **kwargs):
+        """Stream the same answer one line per chunk, spreading the latency across the lines."""
+        replay = self._replay
+        record = replay.records.get(prompt_key(model, contents))
+        delay, fail = replay._delay(record)
+        with replay._lock:
+            replay.calls += 1
+        if fail or (record and record.get('error')):
+            if delay:
+                replay.sleep(delay)
+            error = (record or {}).get('error') or {
+                'code': replay.error_code, 'message': 'Injected replay error', 'status': 'UNAVAILABLE'
+            }
+            with replay._lock:
+                replay.errors += 1
+            raise errors.APIError(error['code'], {'error': error})
+        text = record['response_text'] if record else synthetic_response(contents)
+        lines = text.splitlines(keepends=True) or ['']
+        for i, line in enumerate(lines):
+            if delay:
+                replay.sleep(delay / len(lines))
+            # Usage arrives with the final chunk, as with the real API
+            usage = record.get('usage') if record and i == len(lines) - 1 else None
+            yield ReplayResponse(line, usage)
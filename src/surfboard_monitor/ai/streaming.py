@@ -0,0 +1,49 @@
+"""
+Incremental parsing of streamed classification answers.
+"""
+
+import re
+
+_VERDICT_RE = re.compile(r'^\W*(?:(\d+)\s*[.):]\s*)?\W*([A-Za-z]+)')
+
+
+class VerdictParser:
+    """Turn streamed text into (listing index, label) pairs as each line completes.
+
+    Numbered lines ("3. LONGBOARD") are placed by their number; bare labels
+    take the next position. Lines that repeat or fall outside the batch are
+    ignored.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self._buffer = ''
+        self._next_index = 0
+        self._seen = set()
+
+    def feed(self, text):
+        """Add a chunk of streamed text; return verdicts for every line it completed."""
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        return [verdict for verdict in map(self._parse, lines) if verdict is not None]
+
+    def close(self):
+        """Parse whatever is left once the stream ends."""
+        line, self._buffer = self._buffer, ''
+        verdict = self._parse(line)
+        return [verdict] if verdict is not None else []
+
+    def missing(self):
+        """Indices that never received a verdict."""
+        return [i for i in range(self.count) if i not in self._seen]
+
+    def _parse(self, line):
+        match = _VERDICT_RE.match(line)
+        if not match:
+            return None
+        index = int(match.group(1)) - 1 if match.group(1) else self._next_index
+        if not 0 <= index < self.count or index in self._seen:
+            return None
+        self._seen.add(index)
+        self._next_index = index + 1
+        return index, match.group(2).upper()
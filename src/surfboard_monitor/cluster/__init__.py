@@ -0,0 +1 @@
+# Sharding queries across workers that share dedup and classification state
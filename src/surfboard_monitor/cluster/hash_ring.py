@@ -0,0 +1,66 @@
+"""
+Consistent hashing of (region, search term) queries onto workers.
+"""
+
+import bisect
+import hashlib
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def query_key(query):
+    """Stable ring key for a (region, search term) query."""
+    region, term = query
+    return f"{region}/{term}"
+
+
+class HashRing:
+    """Place each node at replicas points on a 64-bit ring; a key belongs to the next point clockwise.
+
+    Adding or removing a node only moves the keys between it and its
+    neighbours, so the other workers keep their queries (and warm state).
+    """
+
+    def __init__(self, nodes=(), replicas=64):
+        self.replicas = replicas
+        self._points = []
+        self._owners = []
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key):
+        """Owner of key, or None on an empty ring."""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def assign(self, queries):
+        """{node: [queries]} for every node on the ring."""
+        assignment = {node: [] for node in self.nodes}
+        for query in queries:
+            owner = self.node_for(query_key(query))
+            if owner is not None:
+                assignment[owner].append(query)
+        return assignment
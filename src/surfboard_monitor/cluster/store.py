@@ -0,0 +1,140 @@
+"""
+SQLite coordination store shared by the workers of one cluster on one box.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    heartbeat_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    listing_id TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    claimed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    listing_id TEXT NOT NULL,
+    worker_id TEXT NOT NULL,
+    classification TEXT,
+    simhash INTEGER,
+    image_hash INTEGER,
+    price_cents INTEGER,
+    labelled_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_labels_listing ON labels (listing_id, seq);
+CREATE INDEX IF NOT EXISTS idx_claims_claimed ON claims (claimed_at);
+"""
+
+PRUNE_INTERVAL = 3600  # seconds between automatic claim sweeps
+
+
+class ClusterStore:
+    """Worker membership, listing claims and published labels.
+
+    Same connection-per-thread WAL setup as HistoryStore, so several worker
+    processes can share one file. A networked deployment would put the same
+    three tables behind a database server. Claims older than retention_days
+    (0 = keep forever) are swept at most once per PRUNE_INTERVAL.
+    """
+
+    def __init__(self, path, clock=time.time, retention_days=30):
+        self.path = path
+        self.clock = clock
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._next_prune = 0
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def heartbeat(self, worker_id):
+        now = self.clock()
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT INTO workers VALUES (?, ?, ?) ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at',
+                (worker_id, now, now)
+            )
+
+    def live_workers(self, timeout):
+        """Workers that sent a heartbeat within timeout seconds, sorted."""
+        rows = self._connection().execute(
+            'SELECT worker_id FROM workers WHERE heartbeat_at >= ? ORDER BY worker_id', (self.clock() - timeout,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove_worker(self, worker_id):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM workers WHERE worker_id = ?', (worker_id,))
+
+    def claim(self, listing_ids, worker_id):
+        """Claim listings for worker_id; return the IDs it owns (newly or from before)."""
+        listing_ids = [listing_id for listing_id in listing_ids if listing_id]
+        if not listing_ids:
+            return set()
+        now = self.clock()
+        conn = self._connection()
+        with conn:
+            conn.executemany('INSERT OR IGNORE INTO claims VALUES (?, ?, ?)',
+                             [(listing_id, worker_id, now) for listing_id in listing_ids])
+            placeholders = ', '.join('?' * len(listing_ids))
+            rows = conn.execute(
+                f'SELECT listing_id FROM claims WHERE worker_id = ? AND listing_id IN ({placeholders})',
+                [worker_id, *listing_ids]
+            ).fetchall()
+        if now >= self._next_prune:
+            self._next_prune = now + PRUNE_INTERVAL
+            self.prune(now=now)
+        return {row[0] for row in rows}
+
+    def prune(self, now=None):
+        """Drop claims past the retention window; returns claims removed."""
+        if not self.retention_days:
+            return 0
+        cutoff = (self.clock() if now is None else now) - self.retention_days * 86400
+        with self._connection() as conn:
+            removed = conn.execute('DELETE FROM claims WHERE claimed_at < ?', (cutoff,)).rowcount
+        if removed:
+            logger.info(f"Cluster store: pruned {removed} claims older than {self.retention_days} days")
+        return removed
+
+    def publish(self, worker_id, rows):
+        """Append (listing_id, classification, simhash, image_hash, price_cents) rows."""
+        if not rows:
+            return
+        now = self.clock()
+        with self._connection() as conn:
+            conn.executemany(
+                'INSERT INTO labels (listing_id, worker_id, classification, simhash, image_hash, price_cents, labelled_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(listing_id, worker_id, *values, now) for listing_id, *values in rows]
+            )
+
+    def labels_after(self, seq, exclude_worker=None):
+        """(seq, listing_id, classification, simhash, image_hash, price_cents) published after seq."""
+        return self._connection().execute(
+            'SELECT seq, listing_id, classification, simhash, image_hash, price_cents FROM labels '
+            'WHERE seq > ? AND worker_id != ? ORDER BY seq',
+            (seq, exclude_worker or '')
+        ).fetchall()
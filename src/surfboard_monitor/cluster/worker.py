@@ -0,0 +1,82 @@
+"""
+One monitor process's membership in a sharded cluster.
+"""
+
+import logging
+import os
+import socket
+
+from ..core.metrics import metrics
+from .hash_ring import HashRing, query_key
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ShardWorker:
+    """Own a consistent-hash share of the queries and share labels with the other workers.
+
+    Every worker rebuilds the same ring from the live membership in the
+    store, so there is no separate coordinator process: a worker joins by
+    sending heartbeats and leaves by stopping them (or calling leave()).
+    """
+
+    def __init__(self, store, worker_id=None, heartbeat_timeout=900, replicas=64):
+        self.store = store
+        self.worker_id = worker_id or default_worker_id()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.replicas = replicas
+        self.metrics = metrics
+        self.ring = HashRing([self.worker_id], replicas)
+        self.workers = [self.worker_id]
+        self.claimed = []  # listings this worker claimed since the monitor last published
+        self._last_seq = 0
+
+    def heartbeat(self):
+        """Refresh membership and rebuild the ring when workers joined or left."""
+        self.store.heartbeat(self.worker_id)
+        workers = self.store.live_workers(self.heartbeat_timeout)
+        if self.worker_id not in workers:
+            workers = sorted(workers + [self.worker_id])
+        if workers != self.workers:
+            joined = sorted(set(workers) - set(self.workers))
+            left = sorted(set(self.workers) - set(workers))
+            logger.info(f"Cluster membership changed (joined: {joined or '-'}, left: {left or '-'}); "
+                        f"rebalancing across {len(workers)} workers")
+            self.metrics.increment('cluster.rebalances')
+            self.ring = HashRing(workers, self.replicas)
+            self.workers = workers
+        self.metrics.set_gauge('cluster.workers', len(workers))
+
+    def owned(self, queries):
+        """The queries this worker is responsible for."""
+        return [query for query in queries if self.ring.node_for(query_key(query)) == self.worker_id]
+
+    def claim(self, listings):
+        """Drop listings another worker already took (e.g. found under a different search term)."""
+        owned = self.store.claim([listing.get('id') for listing in listings], self.worker_id)
+        claimed = [listing for listing in listings if listing.get('id') in owned]
+        self.claimed.extend(claimed)
+        skipped = len(listings) - len(claimed)
+        if skipped:
+            logger.info(f"Skipping {skipped} listings already claimed by other workers")
+            self.metrics.increment('cluster.claims_lost', skipped)
+        return claimed
+
+    def publish(self, rows):
+        """Share (listing_id, classification, simhash, image_hash, price_cents) rows."""
+        self.store.publish(self.worker_id, rows)
+
+    def updates(self):
+        """Rows other workers published since the last call."""
+        rows = self.store.labels_after(self._last_seq, exclude_worker=self.worker_id)
+        if rows:
+            self._last_seq = rows[-1][0]
+        return [row[1:] for row in rows]
+
+    def leave(self):
+        self.store.remove_worker(self.worker_id)
+        logger.info(f"Worker {self.worker_id} left the cluster")
@@ -8,23 +8,105 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+
+def _env_list(name, default=""):
+    """Read a comma-separated environment variable into a list of stripped strings."""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
 class Config:
     """Configuration class for surfboard monitor settings."""
     
     # Search parameters
     SEARCH_TERMS = ["surfboard", "surf board", "surfing board"]
     DESCRIPTION_KEYWORD = "mov"  # Must contain this word in description
-    LOCATION = os.getenv("LOCATION", "San Diego, CA")  # Default location
-    RADIUS = int(os.getenv("RADIUS", "25"))  # Search radius in miles
+    LOCATION = os.getenv("LOCATION", "San Diego, CA")  # City, Craigslist site code or "lat,lon"
+    RADIUS = int(os.getenv("RADIUS", "25"))  # Search radius in miles (0 = nearest site, no distance filter)
     
     # Price range
     MIN_PRICE = int(os.getenv("MIN_PRICE", "0"))
     MAX_PRICE = int(os.getenv("MAX_PRICE", "2000"))
     
+    # Local pre-filter applied to every scraped batch before classification
+    REQUIRE_DESCRIPTION_KEYWORD = os.getenv("REQUIRE_DESCRIPTION_KEYWORD", "false").lower() == "true"
+    REQUIRED_KEYWORDS = _env_list("REQUIRED_KEYWORDS")
+    FORBIDDEN_KEYWORDS = _env_list("FORBIDDEN_KEYWORDS")
+    MAX_LISTING_AGE_HOURS = int(os.getenv("MAX_LISTING_AGE_HOURS", "0"))  # 0 = no limit
+    MIN_BOARD_LENGTH_INCHES = int(os.getenv("MIN_BOARD_LENGTH_INCHES", "0"))  # 0 = no limit
+    MAX_BOARD_LENGTH_INCHES = int(os.getenv("MAX_BOARD_LENGTH_INCHES", "0"))  # 0 = no limit
+    
+    # Hot-reloadable overrides (JSON object of setting name -> value), polled for changes
+    CONFIG_FILE = os.getenv("CONFIG_FILE", "")
+    CONFIG_POLL_SECONDS = int(os.getenv("CONFIG_POLL_SECONDS", "5"))
+    
+    # Embedded status endpoint (/status, /healthz); 0 disables it
+    STATUS_HOST = os.getenv("STATUS_HOST", "127.0.0.1")
+    STATUS_PORT = int(os.getenv("STATUS_PORT", "0"))
+    
     # Monitoring settings
     CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", "300"))  # 5 minutes in seconds
     MAX_RESULTS = int(os.getenv("MAX_RESULTS", "50"))
     
+    # Cycle deadline (0 = 80% of CHECK_INTERVAL), shared out as stage:fraction budgets;
+    # work past a stage's budget is cut short and carried into the next cycle
+    CYCLE_DEADLINE_SECONDS = float(os.getenv("CYCLE_DEADLINE_SECONDS", "0"))
+    CYCLE_STAGE_BUDGETS = _env_list("CYCLE_STAGE_BUDGETS", "scrape:0.5,classify:0.4,notify:0.1")
+    
+    # Craigslist politeness: per-host token bucket plus per-region circuit breaker
+    CRAIGSLIST_REQUESTS_PER_MINUTE = float(os.getenv("CRAIGSLIST_REQUESTS_PER_MINUTE", "30"))
+    CRAIGSLIST_BURST = int(os.getenv("CRAIGSLIST_BURST", "3"))
+    CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "3"))
+    CIRCUIT_BREAKER_COOLDOWN = int(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "900"))  # seconds
+    
+    # Parse search pages in worker processes (0 = parse in the monitor process)
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+    PARSE_POOL_KIND = os.getenv("PARSE_POOL_KIND", "process")  # process or interpreter (Python 3.14+)
+    
+    # Raw search page archive for replaying parser and performance work (empty = off)
+    PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "")
+    PAGE_ARCHIVE_CODEC = os.getenv("PAGE_ARCHIVE_CODEC", "gzip")  # gzip or zstd (needs the "archive" extra)
+    PAGE_ARCHIVE_RETENTION_DAYS = int(os.getenv("PAGE_ARCHIVE_RETENTION_DAYS", "30"))  # 0 = keep forever
+    
+    # Background backfill of older pages on its own rate budget, alongside live polling
+    ENABLE_BACKFILL = os.getenv("ENABLE_BACKFILL", "false").lower() == "true"
+    BACKFILL_DAYS = int(os.getenv("BACKFILL_DAYS", "14"))
+    BACKFILL_REQUESTS_PER_MINUTE = float(os.getenv("BACKFILL_REQUESTS_PER_MINUTE", "4"))
+    BACKFILL_MAX_PAGES = int(os.getenv("BACKFILL_MAX_PAGES", "10"))  # per query, 120 results each
+    BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "100"))  # listings per classification call
+    BACKFILL_CHECKPOINT = os.getenv("BACKFILL_CHECKPOINT", "backfill_checkpoint.json")
+    BACKFILL_MODEL = os.getenv("BACKFILL_MODEL", "")  # default: the first of GEMINI_MODELS
+    
+    # Watch profiles (JSON file); when set, every profile is served from one shared scrape
+    WATCH_PROFILES_FILE = os.getenv("WATCH_PROFILES_FILE", "")
+    
+    # Cluster mode: workers sharing this SQLite file split the queries by consistent hashing
+    CLUSTER_DB = os.getenv("CLUSTER_DB", "")
+    CLUSTER_WORKER_ID = os.getenv("CLUSTER_WORKER_ID", "")  # default: hostname-pid
+    CLUSTER_HEARTBEAT_TIMEOUT = int(os.getenv("CLUSTER_HEARTBEAT_TIMEOUT", "900"))  # seconds before a silent worker's queries move
+    CLUSTER_CLAIM_RETENTION_DAYS = int(os.getenv("CLUSTER_CLAIM_RETENTION_DAYS", "30"))  # 0 = keep forever
+    
+    # Listing history (SQLite file); empty disables history recording
+    HISTORY_DB = os.getenv("HISTORY_DB", "")
+    
+    # Near-duplicate detection: reposts reuse the earlier classification and only alert on price drops
+    ENABLE_NEAR_DUPLICATE_DETECTION = os.getenv("ENABLE_NEAR_DUPLICATE_DETECTION", "true").lower() == "true"
+    NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "3"))  # SimHash bits
+    NEAR_DUPLICATE_HISTORY_DAYS = int(os.getenv("NEAR_DUPLICATE_HISTORY_DAYS", "90"))  # 0 = all history
+    
+    # Thumbnail perceptual hashing (needs the "images" extra): catches reposts with rewritten text
+    ENABLE_IMAGE_HASHING = os.getenv("ENABLE_IMAGE_HASHING", "false").lower() == "true"
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", ".thumbnail_cache")
+    IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", "4"))
+    IMAGE_HASH_ALGORITHM = os.getenv("IMAGE_HASH_ALGORITHM", "phash")  # phash or dhash
+    IMAGE_HASH_MAX_DISTANCE = int(os.getenv("IMAGE_HASH_MAX_DISTANCE", "6"))  # hash bits
+    
+    # Per-stage cProfile/tracemalloc profiles of selected cycles (also on SIGUSR1)
+    ENABLE_PROFILING = os.getenv("ENABLE_PROFILING", "false").lower() == "true"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_EVERY_N_CYCLES = int(os.getenv("PROFILE_EVERY_N_CYCLES", "0"))  # 0 = only when signalled
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "10"))  # cycles whose profiles are kept
+    PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "true").lower() == "true"  # tracemalloc alongside cProfile
+    
     # Notification settings
     ENABLE_DESKTOP_NOTIFICATIONS = os.getenv("ENABLE_DESKTOP_NOTIFICATIONS", "true").lower() == "true"
     ENABLE_EMAIL_NOTIFICATIONS = os.getenv("ENABLE_EMAIL_NOTIFICATIONS", "false").lower() == "true"
@@ -39,6 +121,12 @@ class Config:
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = os.getenv("LOG_FILE", "surfboard_monitor.log")
+    LOG_MODE = os.getenv("LOG_MODE", "sync")  # sync, or queue: file/terminal I/O on a listener thread
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text or json (JSON lines) for the log file
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", "10485760"))  # rotate at this size (0 = never)
+    LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")  # e.g. midnight: rotate by time instead of size
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    LOG_LISTING_SAMPLE_RATE = float(os.getenv("LOG_LISTING_SAMPLE_RATE", "1.0"))  # share of per-listing DEBUG records kept
     
     # User agent for web scraping
     USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -46,3 +134,31 @@ class Config:
     # Gemini API settings
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
     ENABLE_GEMINI_FILTERING = os.getenv("ENABLE_GEMINI_FILTERING", "true").lower() == "true"
+    # Ordered cheapest/fastest first; calls go to the first model meeting the latency SLO
+    GEMINI_MODELS = _env_list("GEMINI_MODELS", "gemini-2.5-flash,gemini-2.5-pro")
+    GEMINI_LATENCY_SLO_MS = float(os.getenv("GEMINI_LATENCY_SLO_MS", "10000"))  # recent p95 target
+    GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))  # then fall back to the next model
+    GEMINI_ESCALATE_UNCERTAIN = os.getenv("GEMINI_ESCALATE_UNCERTAIN", "true").lower() == "true"
+    GEMINI_STREAMING = os.getenv("GEMINI_STREAMING", "false").lower() == "true"  # notify per verdict as it streams in
+    # Classify each search's listings while later searches are fetched, coalesced into shared calls
+    GEMINI_MICROBATCH = os.getenv("GEMINI_MICROBATCH", "false").lower() == "true"
+    GEMINI_MICROBATCH_MAX_SIZE = int(os.getenv("GEMINI_MICROBATCH_MAX_SIZE", "40"))  # listings per call
+    GEMINI_MICROBATCH_MAX_WAIT_MS = float(os.getenv("GEMINI_MICROBATCH_MAX_WAIT_MS", "2000"))  # after the oldest listing
+    # Quota budgets per model (0 = unknown: learned from 429 quota errors); backfill gets a share of each
+    GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "0"))
+    GEMINI_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "0"))
+    GEMINI_BACKFILL_SHARE = float(os.getenv("GEMINI_BACKFILL_SHARE", "0.5"))
+    GEMINI_RECORD_FILE = os.getenv("GEMINI_RECORD_FILE", "")  # Append prompts/responses here for replay
+    PROMPT_MODE = os.getenv("PROMPT_MODE", "compact")  # compact or full (original verbose prompt)
+    PROMPT_DESCRIPTION_CHARS = int(os.getenv("PROMPT_DESCRIPTION_CHARS", "240"))  # per listing, compact mode
+    GEMINI_CACHE_RUBRIC = os.getenv("GEMINI_CACHE_RUBRIC", "false").lower() == "true"  # context-cache the rubric
+    
+    # Classifier safety checks applied to titles after Gemini answers
+    CLASSIFIER_BLACKLIST_KEYWORDS = _env_list(
+        "CLASSIFIER_BLACKLIST_KEYWORDS",
+        "router,modem,wifi,wetsuit,shirt,clothing,rack,bag,paddleboard,sup"
+    )
+    SHORTBOARD_DIMENSIONS = _env_list(
+        "SHORTBOARD_DIMENSIONS",
+        "5'7,5'8,5'9,5'10,5'11,6'0,6'1,6'2"
+    )
@@ -0,0 +1,222 @@
+"""
+Background backfill of older search pages, separate from live polling.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+
+from ..ai.admission import BACKFILL
+from ..ai.gemini_classifier import GeminiClassifier
+from ..config import Config
+from ..scrapers.craigslist_scraper import parse_search_results
+from ..scrapers.rate_limiter import HostRateLimiter
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 120  # results per Craigslist search page; the 's' parameter steps by this
+RETRY_SECONDS = 60  # wait after a page could not be fetched
+MAX_FAILURES = 5  # consecutive failed pages before a query is given up
+
+
+def backfill_config(config):
+    """Copy of config for the backfill classifier: one cheap model, no escalation or streaming."""
+    cheap = copy.copy(config)
+    cheap.GEMINI_MODELS = [config.BACKFILL_MODEL or config.GEMINI_MODELS[0]]
+    cheap.GEMINI_ESCALATE_UNCERTAIN = False
+    cheap.GEMINI_STREAMING = False
+    cheap.PROMPT_MODE = 'compact'
+    # Nobody waits on these answers; big batches just take longer
+    cheap.GEMINI_LATENCY_SLO_MS = max(config.GEMINI_LATENCY_SLO_MS, 120000)
+    cheap.GEMINI_TIMEOUT_SECONDS = max(config.GEMINI_TIMEOUT_SECONDS, 120)
+    return cheap
+
+
+def _query_key(region, term):
+    return f"{region}/{term}"
+
+
+class BackfillJob:
+    """Page through the last BACKFILL_DAYS of each default query on a background thread.
+
+    The job has its own rate limiter (BACKFILL_REQUESTS_PER_MINUTE) and its
+    own classifier, which uses a single cheap model on batches of
+    BACKFILL_BATCH_SIZE listings. It waits while a live cycle runs (see
+    pause()/resume()) and, given the live classifier's admission
+    controller, gets only the backfill share of the Gemini quota. Progress
+    is checkpointed to BACKFILL_CHECKPOINT only once a batch has been
+    classified and notified, so a crash repeats at most one batch of page
+    fetches and never skips listings.
+    """
+
+    def __init__(self, scraper, notify, config=None, classifier=None, admission=None):
+        config = config or Config()
+        self.scraper = scraper
+        self.notify = notify
+        self.config = config
+        self.path = config.BACKFILL_CHECKPOINT
+        self.batch_size = config.BACKFILL_BATCH_SIZE
+        self.max_pages = config.BACKFILL_MAX_PAGES
+        self.metrics = metrics
+        self.classifier = classifier or GeminiClassifier(backfill_config(config), admission=admission,
+                                                         priority=BACKFILL)
+        self._stop = threading.Event()
+        self._live_idle = threading.Event()
+        self._live_idle.set()
+        self._lock = threading.Lock()
+        self.rate_limiter = HostRateLimiter(config.BACKFILL_REQUESTS_PER_MINUTE, 1,
+                                            clock=scraper.clock.monotonic, sleep=self._stop.wait)
+        self.pending = []  # fetched listings awaiting the next classification batch
+        self.notified = 0
+        self._thread = None
+        self._failures = {}
+        checkpoint = self._load_checkpoint()
+        self.resumed = checkpoint is not None
+        if checkpoint is None:
+            checkpoint = {'cutoff': scraper.clock.time() - config.BACKFILL_DAYS * 86400, 'queries': {}}
+        self.cutoff = checkpoint['cutoff']
+        self.progress = {}
+        for region, term in scraper.default_queries():
+            saved = checkpoint['queries'].get(_query_key(region, term), {})
+            self.progress[region, term] = {'offset': saved.get('offset', 0), 'done': saved.get('done', False)}
+        self._committed = copy.deepcopy(self.progress)
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            logger.info(f"Resuming backfill from {self.path}")
+            return checkpoint
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable backfill checkpoint {self.path}: {e}")
+            return None
+
+    def _save_checkpoint(self):
+        checkpoint = {
+            'cutoff': self.cutoff,
+            'queries': {_query_key(region, term): state for (region, term), state in self._committed.items()},
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save backfill checkpoint {self.path}: {e}")
+
+    def remaining(self):
+        """Queries not yet paged back to the cutoff."""
+        return [query for query, state in self.progress.items() if not state['done']]
+
+    def submit(self, listings):
+        """Take listings for classification in the next batch (e.g. a deferred first live scrape)."""
+        with self._lock:
+            self.pending.extend(listings)
+
+    def pause(self):
+        """Called when a live cycle starts; the job waits before its next page or batch."""
+        self._live_idle.clear()
+
+    def resume(self):
+        self._live_idle.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='backfill', daemon=True)
+        self._thread.start()
+        logger.info(f"Backfill started: {len(self.remaining())} queries back to the last "
+                    f"{self.config.BACKFILL_DAYS} days at {self.config.BACKFILL_REQUESTS_PER_MINUTE} requests/minute")
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._live_idle.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _wait_for_live(self):
+        while not self._live_idle.wait(1):
+            if self._stop.is_set():
+                return
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                remaining = self.remaining()
+                if not remaining:
+                    break
+                # Round-robin: the query furthest behind goes next
+                region, term = min(remaining, key=lambda query: self.progress[query]['offset'])
+                self._wait_for_live()
+                if self._stop.is_set():
+                    break
+                self._fetch_page(region, term)
+                if len(self.pending) >= self.batch_size:
+                    self._classify_pending()
+            # Listings the classifier deferred go back to pending; the admission controller paces the retries
+            while not self._stop.is_set():
+                self._classify_pending()
+                if not self.pending:
+                    logger.info(f"Backfill complete: {self.notified} listings notified")
+                    break
+        except Exception as e:
+            logger.error(f"Backfill stopped: {e}")
+
+    def _fetch_page(self, region, term):
+        state = self.progress[region, term]
+        page = self.scraper.fetch_search_page(term, region, offset=state['offset'], rate_limiter=self.rate_limiter,
+                                              breaker_key=f"backfill:{region}")
+        if page is None:
+            failures = self._failures[region, term] = self._failures.get((region, term), 0) + 1
+            if failures >= MAX_FAILURES:
+                logger.warning(f"Backfill giving up on '{term}' in {region} after {failures} failed pages")
+                state['done'] = True
+            else:
+                self._stop.wait(RETRY_SECONDS)
+            return
+        self._failures.pop((region, term), None)
+        self.metrics.increment('backfill.pages')
+        listings = self.scraper._tag_listings(parse_search_results(page[0], page[1], PAGE_SIZE), region)
+        state['offset'] += PAGE_SIZE
+        dated = [listing.get('posted_at') for listing in listings if listing.get('posted_at')]
+        if (not listings or state['offset'] >= self.max_pages * PAGE_SIZE
+                or (dated and max(dated) < self.cutoff)):
+            state['done'] = True
+        self.submit(self.scraper._unseen(self.scraper.listing_filter.apply(listings, posted_after=self.cutoff)))
+
+    def _classify_pending(self):
+        """Classify and notify the pending batch, then checkpoint the pages it came from."""
+        with self._lock:
+            batch, self.pending = self.pending, []
+        committed = copy.deepcopy(self.progress)
+        if batch:
+            self._wait_for_live()
+            kept = self.classifier.classify_listings(batch)
+            deferred = self.classifier.deferred
+            self.metrics.increment('backfill.classified', len(batch) - len(deferred))
+            for listing in kept:
+                self.notify(listing)
+            self.notified += len(kept)
+            self.metrics.increment('backfill.notified', len(kept))
+            if deferred:
+                # Out of quota: retry them with the next batch, and keep the old checkpoint until then
+                logger.info(f"Backfill re-queued {len(deferred)} listings the classifier deferred")
+                with self._lock:
+                    self.pending[:0] = deferred
+                return
+        self._committed = committed
+        self._save_checkpoint()
+
+    def state(self):
+        """Progress summary for the status endpoint."""
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'queries_remaining': len(self.remaining()),
+            'queries': len(self.progress),
+            'pending': len(self.pending),
+            'notified': self.notified,
+            'cutoff': self.cutoff,
+        }
@@ -0,0 +1,53 @@
+"""
+Clocks for the monitor: wall time in production, virtual time for simulations.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    """Wall-clock time; the default everywhere a clock can be injected."""
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def now(self):
+        return datetime.now()
+
+
+class VirtualClock:
+    """Time that only moves when advanced or slept on.
+
+    sleep() returns at once after moving the clock forward, so rate-limiter
+    waits and API latency cost no real time. time() and monotonic() share
+    one timeline; it starts at start (default: the current wall time).
+    """
+
+    def __init__(self, start=None):
+        self._now = time.time() if start is None else float(start)
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self._now
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += max(0.0, seconds)
+        return self._now
+
+    def now(self):
+        return datetime.fromtimestamp(self._now)
@@ -0,0 +1,195 @@
+"""
+Hot-reloadable configuration: a JSON file of Config overrides, polled for changes.
+"""
+
+import json
+import logging
+import os
+
+from ..config import Config
+from .deadline import parse_stage_budgets
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Baked into long-lived resources (files, pools, indexes, clients); picked up on restart only
+RESTART_REQUIRED = frozenset({
+    'HISTORY_DB', 'WATCH_PROFILES_FILE', 'CLUSTER_DB', 'CLUSTER_WORKER_ID', 'PARSE_WORKERS', 'PARSE_POOL_KIND',
+    'PAGE_ARCHIVE_DIR', 'PAGE_ARCHIVE_CODEC', 'ENABLE_BACKFILL', 'BACKFILL_DAYS', 'BACKFILL_REQUESTS_PER_MINUTE',
+    'BACKFILL_MAX_PAGES', 'BACKFILL_BATCH_SIZE', 'BACKFILL_CHECKPOINT', 'BACKFILL_MODEL', 'GEMINI_MICROBATCH',
+    'ENABLE_NEAR_DUPLICATE_DETECTION', 'NEAR_DUPLICATE_MAX_DISTANCE', 'NEAR_DUPLICATE_HISTORY_DAYS',
+    'ENABLE_IMAGE_HASHING', 'IMAGE_CACHE_DIR', 'IMAGE_FETCH_CONCURRENCY', 'IMAGE_HASH_ALGORITHM',
+    'IMAGE_HASH_MAX_DISTANCE', 'GEMINI_API_KEY', 'GEMINI_MODELS', 'GEMINI_RECORD_FILE',
+    'LOG_FILE', 'LOG_MODE', 'LOG_FORMAT', 'LOG_MAX_BYTES', 'LOG_ROTATE_WHEN', 'LOG_BACKUP_COUNT',
+    'LOG_LISTING_SAMPLE_RATE', 'USER_AGENT', 'CONFIG_FILE', 'STATUS_HOST', 'STATUS_PORT',
+    'ENABLE_PROFILING', 'PROFILE_DIR', 'PROFILE_MEMORY',
+})
+
+
+def _budget_problem(items):
+    try:
+        parse_stage_budgets(items)
+    except ValueError as e:
+        return f"CYCLE_STAGE_BUDGETS: {e}"
+    return None
+
+
+# Cross-field and range checks; each returns an error message or None
+_CHECKS = (
+    lambda c: "CHECK_INTERVAL must be positive" if c.CHECK_INTERVAL <= 0 else None,
+    lambda c: "MAX_RESULTS must be positive" if c.MAX_RESULTS <= 0 else None,
+    lambda c: "prices must not be negative" if min(c.MIN_PRICE, c.MAX_PRICE) < 0 else None,
+    lambda c: "MAX_PRICE must be 0 or at least MIN_PRICE"
+    if c.MAX_PRICE and c.MAX_PRICE < c.MIN_PRICE else None,
+    lambda c: "CRAIGSLIST_REQUESTS_PER_MINUTE and CRAIGSLIST_BURST must be positive"
+    if c.CRAIGSLIST_REQUESTS_PER_MINUTE <= 0 or c.CRAIGSLIST_BURST <= 0 else None,
+    lambda c: "SEARCH_TERMS must not be empty" if not c.SEARCH_TERMS else None,
+    lambda c: "RADIUS must not be negative" if c.RADIUS < 0 else None,
+    lambda c: "BACKFILL_REQUESTS_PER_MINUTE and BACKFILL_BATCH_SIZE must be positive"
+    if c.ENABLE_BACKFILL and (c.BACKFILL_REQUESTS_PER_MINUTE <= 0 or c.BACKFILL_BATCH_SIZE <= 0) else None,
+    lambda c: "CLUSTER_CLAIM_RETENTION_DAYS must not be negative" if c.CLUSTER_CLAIM_RETENTION_DAYS < 0 else None,
+    lambda c: "CYCLE_DEADLINE_SECONDS must not be negative" if c.CYCLE_DEADLINE_SECONDS < 0 else None,
+    lambda c: _budget_problem(c.CYCLE_STAGE_BUDGETS),
+    lambda c: "GEMINI_MICROBATCH_MAX_SIZE must be positive and GEMINI_MICROBATCH_MAX_WAIT_MS not negative"
+    if c.GEMINI_MICROBATCH_MAX_SIZE <= 0 or c.GEMINI_MICROBATCH_MAX_WAIT_MS < 0 else None,
+    lambda c: "GEMINI_REQUESTS_PER_MINUTE and GEMINI_TOKENS_PER_MINUTE must not be negative"
+    if min(c.GEMINI_REQUESTS_PER_MINUTE, c.GEMINI_TOKENS_PER_MINUTE) < 0 else None,
+    lambda c: "GEMINI_BACKFILL_SHARE must be between 0 and 1"
+    if not 0 < c.GEMINI_BACKFILL_SHARE <= 1 else None,
+    lambda c: "PROMPT_MODE must be compact or full" if c.PROMPT_MODE not in ('compact', 'full') else None,
+    lambda c: f"LOG_LEVEL {c.LOG_LEVEL!r} is not a logging level"
+    if not isinstance(logging.getLevelName(c.LOG_LEVEL), int) else None,
+)
+
+
+def config_settings():
+    """Names of every Config setting."""
+    return {name for name in dir(Config) if name.isupper()}
+
+
+def _coerce(name, value, default):
+    """Check one JSON value against the type of the Config default."""
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+    elif isinstance(default, int):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif isinstance(default, float):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    elif isinstance(default, list):
+        if isinstance(value, str):
+            value = value.split(',')
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return [item.strip() for item in value if item.strip()]
+    elif isinstance(value, str):
+        return value
+    raise ValueError(f"{name} expects {type(default).__name__}, got {json.dumps(value)}")
+
+
+def build_snapshot(overrides, version=0):
+    """Config instance with overrides applied on top of the environment settings.
+
+    Raises ValueError listing every problem; nothing is partially applied.
+    """
+    if not isinstance(overrides, dict):
+        raise ValueError("config file must contain a JSON object")
+    known = config_settings()
+    problems = [f"unknown setting {name}" for name in overrides if name not in known]
+    snapshot = Config()
+    for name, value in overrides.items():
+        if name not in known:
+            continue
+        try:
+            setattr(snapshot, name, _coerce(name, value, getattr(Config, name)))
+        except ValueError as e:
+            problems.append(str(e))
+    if not problems:
+        problems = [problem for problem in (check(snapshot) for check in _CHECKS) if problem]
+    if problems:
+        raise ValueError('; '.join(problems))
+    snapshot.version = version
+    snapshot.overrides = dict(overrides)
+    return snapshot
+
+
+class ConfigManager:
+    """Own the current config snapshot and replace it when the file changes.
+
+    The file is polled by mtime and size (no extra dependency for inotify).
+    Invalid files are logged and ignored, keeping the previous snapshot.
+    Settings in RESTART_REQUIRED take effect at startup only; later changes
+    to them are reported and left out of the new snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.metrics = metrics
+        self._stamp = None
+        self._listeners = []
+        self.current = self._initial_snapshot()
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _initial_snapshot(self):
+        self._stamp = self._file_stamp()
+        if self._stamp is None:
+            logger.warning(f"Config file {self.path} not found - using environment settings")
+            return build_snapshot({}, version=1)
+        snapshot = build_snapshot(self._read(), version=1)
+        logger.info(f"Loaded config version 1 from {self.path} ({len(snapshot.overrides)} overrides)")
+        return snapshot
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) after every successful reload."""
+        self._listeners.append(callback)
+
+    def check(self):
+        """Reload if the file changed; return the new snapshot or None."""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        # Remember the stamp even when the file is bad, so it is reported once
+        self._stamp = stamp
+        try:
+            overrides = self._read()
+            if not isinstance(overrides, dict):
+                raise ValueError("config file must contain a JSON object")
+            overrides = self._drop_restart_only(overrides)
+            snapshot = build_snapshot(overrides, version=self.current.version + 1)
+        except (OSError, ValueError) as e:
+            logger.error(f"Rejected config change in {self.path}, keeping version {self.current.version}: {e}")
+            self.metrics.increment('config.rejected')
+            return None
+        changed = sorted(name for name in config_settings()
+                         if getattr(snapshot, name) != getattr(self.current, name))
+        self.current = snapshot
+        self.metrics.increment('config.reloads')
+        logger.info(f"Config version {snapshot.version} loaded from {self.path}; changed: {', '.join(changed) or 'nothing'}")
+        for callback in self._listeners:
+            callback(snapshot)
+        return snapshot
+
+    def _drop_restart_only(self, overrides):
+        kept = {}
+        for name, value in overrides.items():
+            if name in RESTART_REQUIRED and self.current.overrides.get(name) != value:
+                logger.warning(f"{name} changed in {self.path} but only takes effect after a restart")
+                if name in self.current.overrides:
+                    kept[name] = self.current.overrides[name]
+                continue
+            kept[name] = value
+        for name in RESTART_REQUIRED & (set(self.current.overrides) - set(overrides)):
+            logger.warning(f"{name} removed from {self.path} but only takes effect after a restart")
+            kept[name] = self.current.overrides[name]
+        return kept
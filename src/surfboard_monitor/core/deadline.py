@@ -0,0 +1,97 @@
+"""
+Per-cycle deadline split into per-stage time budgets.
+"""
+
+import logging
+import time
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def parse_stage_budgets(items):
+    """{stage: share of the cycle} from 'stage:share' items such as ['scrape:0.5', 'classify:0.4']."""
+    budgets = {}
+    for item in items:
+        stage, _, share = item.partition(':')
+        try:
+            budgets[stage.strip()] = float(share)
+        except ValueError:
+            raise ValueError(f"Stage budget {item!r} is not 'stage:share'")
+        if budgets[stage.strip()] < 0:
+            raise ValueError(f"Stage budget {item!r} is negative")
+    if sum(budgets.values()) > 1.0 + 1e-9:
+        raise ValueError("Stage budgets add up to more than the whole cycle")
+    return budgets
+
+
+class CycleDeadline:
+    """A cycle's time budget, handed out to stages as they start.
+
+    A budgeted stage gets its share of total_seconds plus whatever earlier
+    stages left unused, capped by the end of the cycle; other stages only
+    run under the cycle deadline. Stages that run past their allotment, and
+    cycles that run past total_seconds, are counted in the metrics
+    (cycle.overruns.<stage>, cycle.overrun_ms.<stage>).
+    """
+
+    def __init__(self, total_seconds, budgets, clock=time.monotonic):
+        self.total_seconds = total_seconds
+        self.budgets = budgets
+        self.clock = clock
+        self.metrics = metrics
+        self.started = clock()
+        self.ends_at = self.started + total_seconds
+        self.overruns_ms = {}
+        self._carry = 0.0
+        self._stage = None
+
+    def start_stage(self, name):
+        """Open name's budget window; unbudgeted stages keep the current window."""
+        if name not in self.budgets:
+            return
+        now = self.clock()
+        allotted = self.budgets[name] * self.total_seconds + self._carry
+        self._stage = (name, now, allotted, min(now + allotted, self.ends_at))
+
+    def end_stage(self, name):
+        """Close name's window: carry unused time forward or record the overrun."""
+        if self._stage is None or self._stage[0] != name:
+            return
+        _, started, allotted, _ = self._stage
+        self._stage = None
+        used = self.clock() - started
+        self._carry = max(0.0, allotted - used)
+        if used > allotted:
+            self._record_overrun(name, used - allotted)
+
+    def remaining(self):
+        """Seconds left in the current stage's window (or the cycle, outside budgeted stages)."""
+        ends_at = self._stage[3] if self._stage is not None else self.ends_at
+        return ends_at - self.clock()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def finish(self):
+        """Record a cycle overrun; returns the seconds past the deadline (0 if on time)."""
+        over = max(0.0, self.clock() - self.ends_at)
+        if over:
+            self._record_overrun('cycle', over)
+            logger.warning(f"Cycle overran its {self.total_seconds:.0f}s deadline by {over:.1f}s")
+        return over
+
+    def _record_overrun(self, name, seconds):
+        self.overruns_ms[name] = seconds * 1000
+        suffix = '' if name == 'cycle' else f'.{name}'
+        self.metrics.increment(f'cycle.overruns{suffix}')
+        self.metrics.observe(f'cycle.overrun_ms{suffix}', seconds * 1000)
+
+    def state(self):
+        """Budget and overruns of the cycle, for the status endpoint."""
+        return {
+            'budget_s': self.total_seconds,
+            'stage_budgets_s': {name: share * self.total_seconds for name, share in self.budgets.items()},
+            'overruns_ms': dict(self.overruns_ms),
+        }
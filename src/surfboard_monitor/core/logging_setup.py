@@ -0,0 +1,104 @@
+"""
+Logging setup: synchronous handlers or a queue-backed pipeline with JSON-lines output.
+"""
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Pass as extra= on records emitted once per listing so they can be sampled
+PER_LISTING = {'per_listing': True}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'per_listing', False):
+            entry['per_listing'] = True
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ListingSampler(logging.Filter):
+    """Keep roughly rate of the per-listing records; everything else passes.
+
+    Warnings and errors are never sampled away.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        if not getattr(record, 'per_listing', False) or record.levelno >= logging.WARNING:
+            return True
+        # Decide once per record so every handler sharing the filter agrees
+        keep = getattr(record, 'sampled', None)
+        if keep is None:
+            keep = record.sampled = bool(self.every) and next(self._counter) % self.every == 0
+        return keep
+
+
+def file_handler(config):
+    """Log file rotated by time when LOG_ROTATE_WHEN is set, else by size."""
+    if config.LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(
+            config.LOG_FILE, when=config.LOG_ROTATE_WHEN, backupCount=config.LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+    return logging.handlers.RotatingFileHandler(
+        config.LOG_FILE, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+
+
+def configure_logging(config, stream=None):
+    """Install the configured handlers on the root logger.
+
+    In queue mode the caller's thread only enqueues records; a QueueListener
+    thread formats them and does the file and terminal I/O. Returns the
+    listener (None in sync mode); it is stopped at exit so nothing is lost.
+    """
+    handlers = [file_handler(config), logging.StreamHandler(stream)]
+    handlers[0].setFormatter(JsonFormatter() if config.LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT))
+    handlers[1].setFormatter(logging.Formatter(TEXT_FORMAT))
+    sampler = ListingSampler(config.LOG_LISTING_SAMPLE_RATE)
+
+    if config.LOG_MODE != 'queue':
+        for handler in handlers:
+            handler.addFilter(sampler)
+        logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), handlers=handlers, force=True)
+        return None
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    queue_handler = logging.handlers.QueueHandler(records)
+    # prepare() merges args into the message; the listener's handlers do the real formatting
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    # Sample before enqueueing so dropped records cost nothing downstream
+    queue_handler.addFilter(sampler)
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), handlers=[queue_handler], force=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener):
+    # QueueListener.stop() is not idempotent before Python 3.12
+    if listener._thread is not None:
+        listener.stop()
@@ -0,0 +1,92 @@
+"""
+In-process metrics registry for the surfboard monitor.
+"""
+
+import math
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and sampled observations."""
+
+    def __init__(self, max_samples=1024):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._gauges = {}
+        self._samples = {}
+
+    def increment(self, name, value=1):
+        """Add value to a monotonically increasing counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name, value):
+        """Record the latest value of a gauge (any JSON-serialisable value)."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name, value):
+        """Record one observation (latency, size, ...) in a bounded window."""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(value)
+
+    def counter(self, name):
+        """Return the current value of a counter."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name, default=None):
+        """Return the current value of a gauge."""
+        with self._lock:
+            return self._gauges.get(name, default)
+
+    def samples(self, name):
+        """Return a copy of the observation window for name."""
+        with self._lock:
+            return list(self._samples.get(name, ()))
+
+    def percentile(self, name, pct):
+        """Return the pct-th percentile of the observation window, or None."""
+        return _percentile(sorted(self.samples(name)), pct)
+
+    def snapshot(self):
+        """Return a point-in-time copy of every metric."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            windows = {name: sorted(values) for name, values in self._samples.items()}
+
+        summaries = {}
+        for name, values in windows.items():
+            summaries[name] = {
+                'count': len(values),
+                'p50': _percentile(values, 50),
+                'p95': _percentile(values, 95),
+                'p99': _percentile(values, 99),
+                'max': values[-1] if values else None,
+            }
+        return {'counters': counters, 'gauges': gauges, 'samples': summaries}
+
+    def reset(self):
+        """Drop every recorded metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._samples.clear()
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+# Shared registry used by every component unless a test swaps it out
+metrics = Metrics()
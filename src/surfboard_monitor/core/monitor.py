@@ -4,65 +4,627 @@ Main surfboard monitoring functionality.
 
 import logging
 import time
+import requests
 import schedule
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import wait
 from datetime import datetime
 from ..config import Config
 from ..scrapers.craigslist_scraper import CraigslistScraper
 from ..notifications.notifier import Notifier
+from ..ai.admission import AdmissionController
 from ..ai.gemini_classifier import GeminiClassifier
+from ..ai.micro_batcher import DEFERRED, MicroBatcher
+from .backfill import BackfillJob
+from .clock import SystemClock
+from .config_manager import ConfigManager
+from .deadline import CycleDeadline, parse_stage_budgets
+from .logging_setup import PER_LISTING, configure_logging
+from .metrics import metrics
+from .profiles import ProfileIndex, load_profiles
+from .profiling import CycleProfiler
+from .status import StatusServer
+from ..cluster.store import ClusterStore
+from ..cluster.worker import ShardWorker
+from ..filters.near_duplicates import NearDuplicateDetector, from_signed, to_signed
+from ..images.dedup import ImageDuplicateDetector
+from ..images.fetcher import ThumbnailFetcher
+from ..images.phash import decoding_available
+from ..storage.history import HistoryStore, HistoryWriter, observation_row
 
 logger = logging.getLogger(__name__)
 
 class SurfboardMonitor:
     """Main class for monitoring surfboard listings."""
     
-    def __init__(self):
-        self.config = Config()
-        self.scraper = CraigslistScraper()
-        self.notifier = Notifier()
-        self.classifier = GeminiClassifier()
+    def __init__(self, config=None, clock=None):
+        self.config = config or Config()
+        self.clock = clock or SystemClock()
+        self.config_manager = None
+        if self.config.CONFIG_FILE:
+            self.config_manager = ConfigManager(self.config.CONFIG_FILE)
+            self.config = self.config_manager.current
+            self.config_manager.subscribe(self.apply_config)
+        self.check_job = None
+        self.scraper = CraigslistScraper(self.config, clock=self.clock)
+        self.notifier = Notifier(self.config)
+        self.admission = AdmissionController.from_config(self.config, clock=self.clock.monotonic,
+                                                         sleep=self.clock.sleep)
+        self.classifier = GeminiClassifier(self.config, admission=self.admission)
+        self.batcher = None
+        if self.config.GEMINI_MICROBATCH:
+            self.batcher = MicroBatcher(self.classifier, self.config.GEMINI_MICROBATCH_MAX_SIZE,
+                                        self.config.GEMINI_MICROBATCH_MAX_WAIT_MS,
+                                        timeout_seconds=self.config.GEMINI_TIMEOUT_SECONDS)
+        self._batched = {}  # id(listing) -> classification future, for listings submitted during the scrape
+        self._batched_reposts = []
+        self.profile_index = None
+        if self.config.WATCH_PROFILES_FILE:
+            self.profile_index = ProfileIndex(load_profiles(self.config.WATCH_PROFILES_FILE, self.config))
+        self.duplicates = None
+        if self.config.ENABLE_NEAR_DUPLICATE_DETECTION:
+            self.duplicates = NearDuplicateDetector(self.config.NEAR_DUPLICATE_MAX_DISTANCE)
+        self.image_duplicates = None
+        if self.config.ENABLE_IMAGE_HASHING:
+            if decoding_available():
+                self.image_duplicates = ImageDuplicateDetector(self._thumbnail_fetcher(),
+                                                               self.config.IMAGE_HASH_MAX_DISTANCE)
+            else:
+                logger.warning("ENABLE_IMAGE_HASHING is set but Pillow is not installed - image dedup disabled")
+        self.history = None
+        self.cycle = 0
+        if self.config.HISTORY_DB:
+            store = HistoryStore(self.config.HISTORY_DB)
+            # Continue cycle numbering across restarts
+            self.cycle = store.last_cycle_id()
+            days = self.config.NEAR_DUPLICATE_HISTORY_DAYS
+            since = self.clock.time() - days * 86400 if days else None
+            if self.duplicates is not None:
+                self.duplicates.index.load_history(store, since=since)
+            if self.image_duplicates is not None:
+                self.image_duplicates.index.load_history(store, since=since, column='image_hash')
+            self.history = HistoryWriter(store)
+        self.shard = None
+        if self.config.CLUSTER_DB:
+            store = ClusterStore(self.config.CLUSTER_DB, clock=self.clock.time,
+                                 retention_days=self.config.CLUSTER_CLAIM_RETENTION_DAYS)
+            self.shard = ShardWorker(store, self.config.CLUSTER_WORKER_ID, self.config.CLUSTER_HEARTBEAT_TIMEOUT)
+            # Each worker tracks its own last-check time
+            self.scraper.last_check_file = f"last_check_timestamp.{self.shard.worker_id}.json"
+        self.backfill = None
+        self._defer_to_backfill = False
+        if self.config.ENABLE_BACKFILL:
+            if self.profile_index is not None or self.shard is not None:
+                logger.warning("ENABLE_BACKFILL is ignored with watch profiles and in cluster mode")
+            else:
+                self.backfill = BackfillJob(self.scraper, self._notify_new_listing, self.config,
+                                            admission=self.admission)
+                # The first cycle's two weeks of results go to the backfill instead of holding up live polling
+                self._defer_to_backfill = self.scraper.is_first_run() and bool(self.backfill.remaining())
+        self.cycle_timings = {}
+        self.cycle_counts = {}
+        self.cycle_labels = {}  # listing id -> classification settled this cycle (classifier, reposts, unlabelled keeps)
+        self.deadline = None
+        self.carry_over = []  # fresh listings the last cycle ran out of time to classify
+        self.pending_notifications = []  # longboards the last cycle ran out of time to notify
+        self.metrics = metrics
+        self.profiler = None
+        if self.config.ENABLE_PROFILING:
+            self.profiler = CycleProfiler(self.config.PROFILE_DIR, keep=self.config.PROFILE_KEEP,
+                                          every_n_cycles=self.config.PROFILE_EVERY_N_CYCLES,
+                                          memory=self.config.PROFILE_MEMORY)
+        self.status_server = None
+        if self.config.STATUS_PORT:
+            # Unhealthy once a few cycles have been missed
+            self.status_server = StatusServer(self.config.STATUS_HOST, self.config.STATUS_PORT,
+                                              stale_after=3 * self.config.CHECK_INTERVAL, clock=self.clock.time)
+    
+    def _thumbnail_fetcher(self):
+        session = requests.Session()
+        session.headers.update({'User-Agent': self.config.USER_AGENT})
+        return ThumbnailFetcher(
+            self.config.IMAGE_CACHE_DIR,
+            max_workers=self.config.IMAGE_FETCH_CONCURRENCY,
+            algorithm=self.config.IMAGE_HASH_ALGORITHM,
+            session=session,
+            # Thumbnails share the scraper's per-host politeness budget
+            rate_limiter=self.scraper.rate_limiter,
+        )
+    
+    def apply_config(self, config):
+        """Swap a reloaded config snapshot into every component between cycles."""
+        previous = self.config
+        self.scraper.apply_config(config)
+        self.classifier.apply_config(config)
+        self.notifier.apply_config(config)
+        self.admission.configure(config.GEMINI_REQUESTS_PER_MINUTE, config.GEMINI_TOKENS_PER_MINUTE,
+                                 config.GEMINI_BACKFILL_SHARE)
+        if self.batcher is not None:
+            self.batcher.max_batch_size = config.GEMINI_MICROBATCH_MAX_SIZE
+            self.batcher.max_wait_ms = config.GEMINI_MICROBATCH_MAX_WAIT_MS
+            self.batcher.timeout_seconds = config.GEMINI_TIMEOUT_SECONDS
+        self.config = config
+        if config.LOG_LEVEL != previous.LOG_LEVEL:
+            logging.getLogger().setLevel(getattr(logging, config.LOG_LEVEL))
+        if config.CHECK_INTERVAL != previous.CHECK_INTERVAL and self.check_job is not None:
+            schedule.cancel_job(self.check_job)
+            self.check_job = schedule.every(config.CHECK_INTERVAL).seconds.do(self.check_for_new_listings)
+            logger.info(f"Check interval is now {config.CHECK_INTERVAL} seconds")
+        if self.shard is not None:
+            self.shard.store.retention_days = config.CLUSTER_CLAIM_RETENTION_DAYS
+        if self.status_server is not None:
+            self.status_server.stale_after = 3 * config.CHECK_INTERVAL
+        if self.profiler is not None:
+            self.profiler.every_n_cycles = config.PROFILE_EVERY_N_CYCLES
+            self.profiler.keep = config.PROFILE_KEEP
+        logger.info(f"Running with config version {config.version}")
     
     def setup_logging(self):
         """Setup logging configuration."""
-        logging.basicConfig(
-            level=getattr(logging, self.config.LOG_LEVEL),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.config.LOG_FILE),
-                logging.StreamHandler()
-            ]
-        )
+        self.log_listener = configure_logging(self.config)
+    
+    @contextmanager
+    def _stage(self, name):
+        """Time one stage of the current cycle into cycle_timings."""
+        profiling = self.profiler is not None and self.profiler.active
+        if profiling:
+            self.profiler.start_stage(name)
+        if self.deadline is not None:
+            self.deadline.start_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.cycle_timings[f'{name}_ms'] = self.cycle_timings.get(f'{name}_ms', 0) + (time.perf_counter() - start) * 1000
+            if self.deadline is not None:
+                self.deadline.end_stage(name)
+            if profiling:
+                self.profiler.stop_stage()
+    
+    def _new_deadline(self):
+        """This cycle's deadline: CYCLE_DEADLINE_SECONDS, or 80% of CHECK_INTERVAL to leave some slack."""
+        total = self.config.CYCLE_DEADLINE_SECONDS or 0.8 * self.config.CHECK_INTERVAL
+        return CycleDeadline(total, parse_stage_budgets(self.config.CYCLE_STAGE_BUDGETS), clock=self.clock.monotonic)
     
     def check_for_new_listings(self):
         """Check for new surfboard listings and send notifications."""
+        self.cycle += 1
+        self.cycle_timings = {}
+        self.cycle_counts = {}
+        self.cycle_labels = {}
+        self.deadline = self._new_deadline()
+        started_at = self.clock.time()
+        if self.profiler is not None:
+            self.profiler.begin_cycle(self.cycle)
+        if self.shard is not None:
+            self._sync_cluster()
+        if self.backfill is not None:
+            # Live cycles get Craigslist and the notifier to themselves
+            self.backfill.pause()
+        
+        try:
+            if self.profile_index is not None:
+                self.check_watch_profiles()
+            else:
+                self._check_single_search()
+        finally:
+            if self.profiler is not None:
+                self.profiler.end_cycle()
+            if self.backfill is not None:
+                self.backfill.resume()
+        
+        overrun = self.deadline.finish()
+        if overrun:
+            self.cycle_timings['overrun_ms'] = overrun * 1000
+        self._record_history(started_at)
+        if self.shard is not None:
+            self._publish_to_cluster()
+        if self.status_server is not None:
+            self.status_server.publish(self.status_snapshot(started_at))
+    
+    def _check_single_search(self):
+        """One cycle for the single-user settings in Config."""
         logger.info("Starting surfboard listing check...")
         
+        streaming = self.config.GEMINI_STREAMING
+        # Micro-batched: each search's listings are queued for Gemini as soon as that search is done
+        batched = self.batcher is not None and not streaming and not self._defer_to_backfill
+        # Carried-over listings keep their futures while still queued or in flight, so they aren't sent twice
+        carried = {id(listing) for listing in self.carry_over}
+        self._batched = {key: future for key, future in self._batched.items() if key in carried}
+        self._batched_reposts = []
         try:
             # Get new listings
-            raw_listings = self.scraper.get_new_listings()
+            with self._stage('scrape'):
+                raw_listings = self._scrape(on_new=self._submit_to_batcher if batched else None)
             
-            if raw_listings:
+            if self._defer_to_backfill:
+                self._defer_to_backfill = False
+                self.backfill.submit(raw_listings)
+                self.cycle_counts['deferred_to_backfill'] = len(raw_listings)
+                logger.info(f"Handed {len(raw_listings)} first-run listings to the backfill job")
+                return
+            
+            if raw_listings or self.carry_over or self.pending_notifications:
                 logger.info(f"Found {len(raw_listings)} raw surfboard listings")
+                if batched:
+                    # Already split and queued search by search
+                    reposts = self._batched_reposts
+                    fresh_listings = [listing for listing in raw_listings if id(listing) in self._batched]
+                else:
+                    fresh_listings, reposts = self._split_reposts(raw_listings)
+                fresh_listings = self._take_carry_over(fresh_listings)
                 
                 # Filter with Gemini AI for midlength/longboard
-                new_listings = self.classifier.classify_listings(raw_listings)
+                new_listings = []
+                deferred = None
+                if fresh_listings:
+                    with self._stage('classify'):
+                        if streaming:
+                            new_listings = self._stream_new_listings(fresh_listings)
+                        elif batched:
+                            new_listings, deferred = self._await_batched(fresh_listings)
+                        else:
+                            new_listings = self.classifier.classify_listings(fresh_listings, deadline=self.deadline)
+                            self.cycle_labels.update(self.classifier.last_labels)
+                    fresh_listings = self._defer_unclassified(fresh_listings, deferred)
+                    self.cycle_counts['classified'] = len(fresh_listings)
+                    self._remember_classified(fresh_listings, new_listings)
+                
+                for listing, match in reposts:
+                    if match.classification == 'LONGBOARD' and match.is_price_drop(listing.get('price_cents')):
+                        logger.info(f"Price drop: {listing.get('title', 'Unknown')} - {listing.get('price', 'N/A')}")
+                        self.notifier.notify_price_drop(listing, match.price_cents)
                 
                 if new_listings:
                     logger.info(f"After Gemini filtering: {len(new_listings)} longboard surfboards")
                     
-                    for listing in new_listings:
-                        logger.info(f"New listing: {listing.get('title', 'Unknown')} - {listing.get('price', 'N/A')}")
-                        self.notifier.notify_new_listing(listing)
-                else:
+                    # Streaming already notified each listing as its verdict arrived
+                    if streaming:
+                        self.cycle_counts['notified'] = len(new_listings)
+                elif fresh_listings:
                     logger.info("No longboard surfboards found after AI filtering")
                     if self.config.ENABLE_GEMINI_FILTERING:
                         logger.info("This is expected behavior - AI is working correctly to filter out non-longboard items")
+                
+                # Notifications the last cycle had no time for go out first
+                to_notify, self.pending_notifications = self.pending_notifications, []
+                if not streaming:
+                    to_notify += new_listings
+                if to_notify:
+                    with self._stage('notify'):
+                        self.cycle_counts['notified'] = self._notify_until_deadline(to_notify)
             else:
                 logger.info("No new surfboard listings found")
         
         except Exception as e:
             logger.error(f"Error during listing check: {e}")
     
+    def check_watch_profiles(self):
+        """Scrape and classify each unique query once, then fan matches out to every profile."""
+        index = self.profile_index
+        logger.info(f"Starting surfboard listing check for {len(index)} watch profiles...")
+        
+        try:
+            with self._stage('scrape'):
+                raw_listings = self._scrape(index.queries(), index.price_range())
+            if not raw_listings and not self.carry_over:
+                logger.info("No new surfboard listings found")
+                return
+            
+            logger.info(f"Found {len(raw_listings)} raw surfboard listings across {len(index.queries())} queries")
+            fresh_listings, reposts = self._split_reposts(raw_listings)
+            fresh_listings = self._take_carry_over(fresh_listings)
+            labelled = []
+            notifications = 0
+            streaming = self.config.GEMINI_STREAMING
+            if fresh_listings:
+                with self._stage('classify'):
+                    if streaming:
+                        # Fan each verdict out as soon as it arrives
+                        start = time.perf_counter()
+                        for listing, classification in self.classifier.stream_labels(fresh_listings,
+                                                                                      deadline=self.deadline):
+                            labelled.append((listing, classification))
+                            sent = self._notify_profiles(listing, classification)
+                            if sent and notifications == 0:
+                                self._record_first_alert(start)
+                            notifications += sent
+                    else:
+                        labelled = self.classifier.label_listings(fresh_listings, deadline=self.deadline)
+                self.cycle_counts['classified'] = len(self._defer_unclassified(fresh_listings))
+                for listing, classification in labelled:
+                    self.cycle_labels[listing.get('id')] = classification
+                    self._remember(listing, classification)
+            
+            with self._stage('notify'):
+                if not streaming:
+                    for listing, classification in labelled:
+                        notifications += self._notify_profiles(listing, classification)
+                # Reposts only alert, per interested profile, when the price went down
+                for listing, match in reposts:
+                    if not match.is_price_drop(listing.get('price_cents')):
+                        continue
+                    for profile in index.match(listing, match.classification):
+                        logger.info(f"Price drop for {profile.name}: {listing.get('title', 'Unknown')}")
+                        self.notifier.notify_price_drop(listing, match.price_cents, profile=profile)
+                        notifications += 1
+            self.cycle_counts['notified'] = notifications
+            logger.info(f"Sent {notifications} profile notifications")
+        
+        except Exception as e:
+            logger.error(f"Error during profile listing check: {e}")
+    
+    def _scrape(self, queries=None, price_range=None, on_new=None):
+        """Scrape new listings; in cluster mode only this worker's queries, minus listings others claimed.
+        
+        on_new is passed each query's new (and, in cluster mode, claimed) listings as soon as they are found.
+        """
+        if self.shard is None:
+            if queries is None:
+                listings = self.scraper.get_new_listings(deadline=self.deadline, on_new=on_new)
+            else:
+                listings = self.scraper.get_new_listings(queries=queries, price_range=price_range, deadline=self.deadline,
+                                                         on_new=on_new)
+        else:
+            single_user = queries is None
+            queries = self.shard.owned(queries or self.scraper.default_queries())
+            self.cycle_counts['owned_queries'] = len(queries)
+            if not queries:
+                logger.info(f"No queries assigned to worker {self.shard.worker_id} this cycle")
+                return []
+            if on_new is None:
+                listings = self.shard.claim(self.scraper.get_new_listings(
+                    queries=queries, price_range=price_range, within_radius=single_user, deadline=self.deadline))
+            else:
+                claimed = []
+                
+                def claim_then(listings):
+                    listings = self.shard.claim(listings)
+                    claimed.extend(listings)
+                    if listings:
+                        on_new(listings)
+                
+                self.scraper.get_new_listings(queries=queries, price_range=price_range, within_radius=single_user,
+                                              deadline=self.deadline, on_new=claim_then)
+                listings = claimed
+        if self.scraper.deferred_queries:
+            self.cycle_counts['deferred_queries'] = len(self.scraper.deferred_queries)
+        return listings
+    
+    def _sync_cluster(self):
+        """Heartbeat, then index the labels and fingerprints other workers published."""
+        try:
+            self.shard.heartbeat()
+            for listing_id, classification, simhash, image_hash, price_cents in self.shard.updates():
+                if classification is None:
+                    continue
+                for detector, fingerprint in ((self.duplicates, simhash), (self.image_duplicates, image_hash)):
+                    if detector is not None and fingerprint is not None:
+                        detector.index.add(listing_id, from_signed(fingerprint), classification, price_cents)
+        except Exception as e:
+            logger.error(f"Error syncing with cluster: {e}")
+    
+    def _publish_to_cluster(self):
+        """Share this cycle's labels and fingerprints with the other workers."""
+        try:
+            claimed, self.shard.claimed = self.shard.claimed, []
+            labels = self.cycle_labels
+            rows = [(listing.get('id'), labels.get(listing.get('id')),
+                     self._signed_fingerprint(self.duplicates, listing),
+                     self._signed_fingerprint(self.image_duplicates, listing),
+                     listing.get('price_cents'))
+                    for listing in claimed if labels.get(listing.get('id')) is not None]
+            self.shard.publish(rows)
+        except Exception as e:
+            logger.error(f"Error publishing to cluster: {e}")
+    
+    def _stream_new_listings(self, listings):
+        """Classify by streaming and notify each longboard as soon as its verdict arrives."""
+        start = time.perf_counter()
+        kept = []
+        for listing, classification in self.classifier.stream_labels(listings, deadline=self.deadline):
+            self.cycle_labels[listing.get('id')] = classification
+            if classification != 'LONGBOARD':
+                logger.debug("Filtering out %s: %s", classification, listing.get('title', 'Unknown'), extra=PER_LISTING)
+                continue
+            self._notify_new_listing(listing)
+            if not kept:
+                self._record_first_alert(start)
+            kept.append(listing)
+        logger.info(f"Streamed classification: {len(listings)} -> {len(kept)} listings")
+        return kept
+    
+    def _submit_to_batcher(self, listings):
+        """Split one search's new listings into reposts and fresh ones, and queue the fresh ones for Gemini."""
+        fresh, reposts = self._split_reposts(listings, timed=False)
+        self._batched_reposts.extend(reposts)
+        self._batched.update(zip(map(id, fresh), self.batcher.submit(fresh)))
+    
+    def _await_batched(self, listings):
+        """Wait, within the classify budget, for the micro-batcher's labels; return (longboards, still pending)."""
+        missing = [listing for listing in listings if id(listing) not in self._batched]
+        self._batched.update(zip(map(id, missing), self.batcher.submit(missing)))
+        futures = {id(listing): self._batched[id(listing)] for listing in listings}
+        wait(futures.values(), timeout=max(0.0, self.deadline.remaining()))
+        kept, pending = [], []
+        for listing in listings:
+            future = futures[id(listing)]
+            if not future.done():
+                pending.append(listing)
+                continue
+            classification = None if future.exception() else future.result()
+            if classification == DEFERRED:
+                # Resubmitted next cycle
+                del self._batched[id(listing)]
+                pending.append(listing)
+                continue
+            if classification is not None:
+                self.cycle_labels[listing.get('id')] = classification
+            if classification == 'LONGBOARD':
+                kept.append(listing)
+        logger.info(f"Micro-batched classification: {len(listings) - len(pending)} -> {len(kept)} listings")
+        return kept, pending
+    
+    def _take_carry_over(self, fresh_listings):
+        """Listings deferred by the last cycle, ahead of this cycle's fresh ones."""
+        carried, self.carry_over = self.carry_over, []
+        if carried:
+            logger.info(f"Classifying {len(carried)} listings carried over from the last cycle")
+        return carried + fresh_listings
+    
+    def _defer_unclassified(self, listings, deferred=None):
+        """Carry what the classify budget cut off into the next cycle; return the listings that were classified."""
+        if deferred is None:
+            deferred = self.classifier.deferred
+        if not deferred:
+            return listings
+        self.carry_over = list(deferred)
+        self.cycle_counts['deferred'] = len(deferred)
+        deferred_ids = {id(listing) for listing in deferred}
+        return [listing for listing in listings if id(listing) not in deferred_ids]
+    
+    def _notify_until_deadline(self, listings):
+        """Notify listings in order until the notify budget runs out; the rest wait for the next cycle.
+        
+        Returns how many were sent.
+        """
+        for position, listing in enumerate(listings):
+            if self.deadline.expired():
+                self.pending_notifications = listings[position:]
+                self.cycle_counts['notify_deferred'] = len(self.pending_notifications)
+                logger.warning(f"Notify budget exhausted - deferring {len(self.pending_notifications)} "
+                               f"notifications to the next cycle")
+                self.metrics.increment('cycle.deferred_notifications', len(self.pending_notifications))
+                return position
+            self._notify_new_listing(listing)
+        return len(listings)
+    
+    def _notify_new_listing(self, listing):
+        logger.info(f"New listing: {listing.get('title', 'Unknown')} - {listing.get('price', 'N/A')}")
+        self.notifier.notify_new_listing(listing)
+    
+    def _notify_profiles(self, listing, classification):
+        """Notify every profile matching a classified listing; return how many were sent."""
+        sent = 0
+        for profile in self.profile_index.match(listing, classification):
+            logger.info(f"Match for {profile.name}: {listing.get('title', 'Unknown')} ({classification})")
+            self.notifier.notify_new_listing(listing, profile=profile)
+            sent += 1
+        return sent
+    
+    def _record_first_alert(self, start):
+        """Time from the start of classification to the first notification of the cycle."""
+        self.cycle_timings['first_alert_ms'] = (time.perf_counter() - start) * 1000
+    
+    def _detectors(self):
+        """Active repost detectors, cheapest first: text, then thumbnails."""
+        return [detector for detector in (self.duplicates, self.image_duplicates) if detector is not None]
+    
+    def _split_reposts(self, listings, timed=True):
+        """Separate reposts of already-classified boards from listings that need the classifier.
+        
+        timed=False skips the 'dedupe' stage, for calls made inside another stage.
+        """
+        detectors = self._detectors()
+        if not detectors:
+            return listings, []
+        fresh, reposts = listings, []
+        with self._stage('dedupe') if timed else nullcontext():
+            # Each detector only sees what the previous one let through, so
+            # thumbnails are fetched for text-fresh listings only
+            for detector in detectors:
+                fresh, found = detector.partition(fresh)
+                for listing, match in found:
+                    self.cycle_labels[listing.get('id')] = match.classification
+                    detector.remember_repost(listing, match)
+                reposts.extend(found)
+        self.cycle_counts['reposts'] = self.cycle_counts.get('reposts', 0) + len(reposts)
+        if reposts:
+            logger.info(f"Skipping classification for {len(reposts)} reposts of known listings")
+        return fresh, reposts
+    
+    def _remember(self, listing, classification):
+        for detector in self._detectors():
+            detector.remember(listing, classification)
+    
+    def _remember_classified(self, listings, kept):
+        """Index classified listings; kept listings without a recorded label are longboards."""
+        kept_ids = {listing.get('id') for listing in kept}
+        for listing in listings:
+            classification = self.cycle_labels.get(listing.get('id'))
+            if classification is None and listing.get('id') in kept_ids:
+                classification = 'LONGBOARD'
+                self.cycle_labels[listing.get('id')] = classification
+            self._remember(listing, classification)
+    
+    def _record_history(self, started_at):
+        """Hand this cycle's observations to the background history writer."""
+        if self.history is None:
+            return
+        try:
+            labels = self.cycle_labels
+            scraped = self.scraper.last_scraped
+            observed_at = int(self.clock.time())
+            rows = [observation_row(listing, observed_at, self.cycle, labels.get(listing.get('id')),
+                                    self._signed_fingerprint(self.duplicates, listing),
+                                    self._signed_fingerprint(self.image_duplicates, listing))
+                    for listing in scraped]
+            self.cycle_counts['scraped'] = len(scraped)
+            self.history.submit(self.cycle, started_at, dict(self.cycle_timings), dict(self.cycle_counts), rows)
+        except Exception as e:
+            logger.error(f"Error recording listing history: {e}")
+    
+    def status_snapshot(self, started_at):
+        """Pipeline state at the end of a cycle, as served by the status endpoint."""
+        counters = self.metrics.snapshot()['counters']
+        # schedule counts the interval from the end of the run that is finishing now
+        next_poll = datetime.fromtimestamp(self.clock.time() + self.config.CHECK_INTERVAL).isoformat(timespec='seconds')
+        queries = self.profile_index.queries() if self.profile_index is not None else self.scraper.default_queries()
+        return {
+            'cycle': self.cycle,
+            'config_version': getattr(self.config, 'version', None),
+            'last_cycle': {
+                'started_at': started_at,
+                'duration_ms': (self.clock.time() - started_at) * 1000,
+                'stages_ms': dict(self.cycle_timings),
+                'counts': dict(self.cycle_counts),
+            },
+            'queues': {
+                'history_writer': self.history.pending() if self.history is not None else None,
+            },
+            'dedup': {
+                'seen_listings': len(self.scraper.seen_listings),
+                'text_index': len(self.duplicates.index) if self.duplicates is not None else None,
+                'image_index': len(self.image_duplicates.index) if self.image_duplicates is not None else None,
+            },
+            'cache_hit_ratio': {
+                'thumbnails': _ratio(counters.get('images.cache_hits', 0),
+                                     counters.get('images.cache_hits', 0) + counters.get('images.downloads', 0)),
+                'gemini_prompt_tokens': _ratio(counters.get('gemini.tokens.cached_total', 0),
+                                               counters.get('gemini.tokens.prompt_total', 0)),
+            },
+            'rate_limiter': self.scraper.rate_limiter.state(),
+            'circuit_breaker': self.scraper.circuit_breaker.state(),
+            'models': self.classifier.router.state(),
+            'gemini_quota': self.admission.state(),
+            'next_poll': {f"{region}/{term}": next_poll for region, term in queries},
+            'cluster': None if self.shard is None else {
+                'worker_id': self.shard.worker_id,
+                'workers': list(self.shard.workers),
+                'owned_queries': [f"{region}/{term}" for region, term in self.shard.owned(queries)],
+            },
+            'backfill': self.backfill.state() if self.backfill is not None else None,
+            'deadline': self.deadline.state() if self.deadline is not None else None,
+            'micro_batcher': self.batcher.state() if self.batcher is not None else None,
+        }
+    
+    def _signed_fingerprint(self, detector, listing):
+        if detector is None:
+            return None
+        fingerprint = detector.fingerprint(listing)
+        return None if fingerprint is None else to_signed(fingerprint)
+    
     def run(self):
         """Run the surfboard monitor."""
         self.setup_logging()
@@ -77,11 +639,22 @@ class SurfboardMonitor:
         logger.info(f"Gemini AI filtering: {self.config.ENABLE_GEMINI_FILTERING}")
         logger.info(f"Gemini API key configured: {'Yes' if self.config.GEMINI_API_KEY else 'No'}")
         
+        if self.status_server is not None:
+            self.status_server.start()
+        if self.profiler is not None:
+            self.profiler.install_signal()
+        if self.backfill is not None and self.backfill.remaining():
+            self.backfill.start()
+        
         # Run initial check
         self.check_for_new_listings()
         
         # Schedule regular checks
-        schedule.every(self.config.CHECK_INTERVAL).seconds.do(self.check_for_new_listings)
+        self.check_job = schedule.every(self.config.CHECK_INTERVAL).seconds.do(self.check_for_new_listings)
+        if self.config_manager is not None:
+            # Runs on the scheduler thread, so a reload never lands mid-cycle
+            schedule.every(self.config.CONFIG_POLL_SECONDS).seconds.do(self.config_manager.check)
+            logger.info(f"Watching {self.config.CONFIG_FILE} for config changes")
         
         logger.info("Surfboard monitor is running. Press Ctrl+C to stop.")
         
@@ -93,3 +666,20 @@ class SurfboardMonitor:
             logger.info("Surfboard monitor stopped by user")
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
+        finally:
+            if self.batcher is not None:
+                self.batcher.close(timeout=self.config.GEMINI_TIMEOUT_SECONDS)
+            if self.backfill is not None:
+                self.backfill.stop()
+            if self.history is not None:
+                # Drains the queue, so the last cycle's rows are written before exit
+                self.history.close()
+            if self.status_server is not None:
+                self.status_server.close()
+            if self.shard is not None:
+                # Hand this worker's queries to the others right away
+                self.shard.leave()
+
+
+def _ratio(hits, total):
+    return round(hits / total, 3) if total else None
@@ -0,0 +1,140 @@
+"""
+Watch profiles: several users' search criteria served by one shared scrape.
+"""
+
+import json
+import logging
+from collections import defaultdict
+
+from ..filters.keywords import KeywordMatcher
+from ..scrapers.craigslist_scraper import craigslist_site
+
+logger = logging.getLogger(__name__)
+
+# Prices at or above the last bucket share it, so open-ended ranges stay bounded
+PRICE_BUCKET_DOLLARS = 100
+MAX_PRICE_BUCKETS = 100
+UNKNOWN_PRICE_BUCKET = -1
+
+
+class WatchProfile:
+    """One user's regions, price range, board classes, keywords and channels."""
+
+    def __init__(self, name, regions, search_terms, min_price=0, max_price=0,
+                 board_classes=('LONGBOARD',), keywords=(), email_to='', desktop=False):
+        self.name = name
+        self.regions = [craigslist_site(region) for region in regions]
+        self.search_terms = list(search_terms)
+        self.min_price = min_price
+        self.max_price = max_price
+        self.board_classes = [board_class.upper() for board_class in board_classes]
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.email_to = email_to
+        self.desktop = desktop
+
+    @classmethod
+    def from_dict(cls, data, defaults):
+        """Build a profile from its JSON form; missing fields fall back to Config."""
+        return cls(
+            name=data['name'],
+            regions=data.get('regions') or [defaults.LOCATION],
+            search_terms=data.get('search_terms') or defaults.SEARCH_TERMS,
+            min_price=data.get('min_price', defaults.MIN_PRICE),
+            max_price=data.get('max_price', defaults.MAX_PRICE),
+            board_classes=data.get('board_classes', ['LONGBOARD']),
+            keywords=data.get('keywords', []),
+            email_to=data.get('email_to', ''),
+            desktop=data.get('desktop', False),
+        )
+
+    def price_ok(self, price_cents):
+        """Exact price check; unknown prices always pass."""
+        if price_cents is None:
+            return True
+        if self.min_price and price_cents < self.min_price * 100:
+            return False
+        if self.max_price and price_cents > self.max_price * 100:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"WatchProfile(name={self.name!r})"
+
+
+def load_profiles(path, defaults):
+    """Load watch profiles from a JSON file of the form {"profiles": [...]}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    profiles = [WatchProfile.from_dict(entry, defaults) for entry in data.get('profiles', [])]
+    names = [profile.name for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate watch profile names in {path}")
+    logger.info(f"Loaded {len(profiles)} watch profiles from {path}")
+    return profiles
+
+
+def _price_bucket(price_cents):
+    if price_cents is None:
+        return UNKNOWN_PRICE_BUCKET
+    return min(MAX_PRICE_BUCKETS - 1, price_cents // (PRICE_BUCKET_DOLLARS * 100))
+
+
+class ProfileIndex:
+    """Index profiles by (region, board class, price bucket).
+
+    Matching a listing is one dict lookup plus exact checks on the few
+    candidates in its bucket, so cost grows with the number of interested
+    profiles rather than the total number of profiles.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = list(profiles)
+        self._index = defaultdict(list)
+        for profile in self.profiles:
+            first = _price_bucket(profile.min_price * 100)
+            last = _price_bucket(profile.max_price * 100) if profile.max_price else MAX_PRICE_BUCKETS - 1
+            for region in profile.regions:
+                for board_class in profile.board_classes:
+                    self._index[(region, board_class, UNKNOWN_PRICE_BUCKET)].append(profile)
+                    for bucket in range(first, last + 1):
+                        self._index[(region, board_class, bucket)].append(profile)
+        # Profile keywords compiled into one automaton: one scan per listing
+        self.keywords = KeywordMatcher({profile.name: profile.keywords for profile in self.profiles})
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def queries(self):
+        """Unique (region, search term) pairs across all profiles."""
+        return sorted({(region, term) for profile in self.profiles
+                       for region in profile.regions for term in profile.search_terms})
+
+    def price_range(self):
+        """(min, max) dollars covering every profile; 0 means unbounded."""
+        if not self.profiles:
+            return (0, 0)
+        low = min(profile.min_price for profile in self.profiles)
+        high = 0 if any(not profile.max_price for profile in self.profiles) else \
+            max(profile.max_price for profile in self.profiles)
+        return (low, high)
+
+    def candidates(self, region, board_class, price_cents):
+        return self._index.get((region, board_class, _price_bucket(price_cents)), [])
+
+    def match(self, listing, board_class):
+        """Return the profiles that want listing, given its classification."""
+        candidates = self.candidates(listing.get('region', ''), board_class, listing.get('price_cents'))
+        if not candidates:
+            return []
+        keyword_hits = None
+        matched = []
+        for profile in candidates:
+            if not profile.price_ok(listing.get('price_cents')):
+                continue
+            if profile.keywords:
+                if keyword_hits is None:
+                    keyword_hits = self.keywords.match(f"{listing.get('title', '')} {listing.get('description', '')}")
+                if profile.name not in keyword_hits:
+                    continue
+            matched.append(profile)
+        return matched
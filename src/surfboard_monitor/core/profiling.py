@@ -0,0 +1,173 @@
+"""
+On-demand CPU (cProfile) and allocation (tracemalloc) profiles of monitoring cycles.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import re
+import signal
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_FILE_RE = re.compile(r'^cycle(\d+)-')
+
+
+def _frame_name(func):
+    filename, line, name = func
+    if filename == '~':  # built-ins
+        return name.strip('<>').replace(' ', '_')
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+
+def collapsed_stacks(stats, min_us=1):
+    """Turn pstats data into collapsed-stack lines ("a;b;c <microseconds>").
+
+    cProfile only records caller/callee edges, so each function's own time is
+    split across the paths that reach it in proportion to the time each
+    caller spent in it. Recursive edges are cut.
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    totals = {}
+
+    def walk(func, path, share):
+        _, _, own, cumulative, _ = entries[func]
+        path = path + (func,)
+        own_us = own * share * 1e6
+        if own_us >= min_us:
+            key = ';'.join(_frame_name(frame) for frame in path)
+            totals[key] = totals.get(key, 0) + own_us
+        for callee, edge_cumulative in callees.get(func, ()):
+            callee_cumulative = entries[callee][3]
+            if callee in path or not callee_cumulative:
+                continue
+            callee_share = share * edge_cumulative / callee_cumulative
+            if callee_share * callee_cumulative * 1e6 >= min_us:
+                walk(callee, path, callee_share)
+
+    for root in roots:
+        walk(root, (), 1.0)
+    return [f"{stack} {round(us)}" for stack, us in sorted(totals.items()) if round(us) > 0]
+
+
+class CycleProfiler:
+    """Profile selected cycles stage by stage and keep the last few on disk.
+
+    A cycle is profiled when every_n_cycles divides its number or after
+    arm() (also bound to SIGUSR1 by install_signal). Each stage writes
+    cycleNNNNNN-<stage>.pstats, .collapsed and, with memory on, .alloc.txt.
+    Only the thread running the cycle is profiled. When no cycle is being
+    profiled the monitor pays one attribute check per stage.
+    """
+
+    def __init__(self, directory, keep=10, every_n_cycles=0, memory=True, top=25):
+        self.directory = directory
+        self.keep = keep
+        self.every_n_cycles = every_n_cycles
+        self.memory = memory
+        self.top = top
+        self.active = False
+        self.cycle = None
+        self._armed = 0
+        self._profile = None
+        self._stage = None
+        self._snapshot = None
+        self._started_tracemalloc = False
+
+    def arm(self, cycles=1):
+        """Profile the next cycles (safe to call from a signal handler)."""
+        self._armed = max(self._armed, cycles)
+
+    def install_signal(self, signum=None, cycles=1):
+        """Arm on signum (SIGUSR1 by default); returns False where unsupported."""
+        signum = signum or getattr(signal, 'SIGUSR1', None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda *_: self.arm(cycles))
+        logger.info(f"Send signal {signum} (kill -USR1 {os.getpid()}) to profile the next cycle")
+        return True
+
+    def begin_cycle(self, cycle):
+        """Decide whether cycle is profiled and start allocation tracing if so."""
+        due = bool(self.every_n_cycles) and cycle % self.every_n_cycles == 0
+        if self._armed:
+            self._armed -= 1
+            due = True
+        self.active = due
+        if not due:
+            return
+        self.cycle = cycle
+        os.makedirs(self.directory, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        logger.info(f"Profiling cycle {cycle} into {self.directory}")
+
+    def end_cycle(self):
+        if not self.active:
+            return
+        self.active = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._prune()
+
+    def start_stage(self, name):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # another profiler already owns this thread
+            logger.warning(f"Cannot profile stage {name}: {e}")
+            return
+        self._profile, self._stage = profile, name
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def stop_stage(self):
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return
+        profile.disable()
+        base = os.path.join(self.directory, f"cycle{self.cycle:06d}-{self._stage}")
+        try:
+            profile.dump_stats(base + '.pstats')
+            stats = pstats.Stats(profile)
+            with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+                f.write('\n'.join(collapsed_stacks(stats)) + '\n')
+            if self._snapshot is not None:
+                self._write_allocations(base + '.alloc.txt')
+        except OSError as e:
+            logger.warning(f"Could not write profile {base}: {e}")
+        finally:
+            self._snapshot = None
+
+    def _write_allocations(self, path):
+        _, peak = tracemalloc.get_traced_memory()
+        diff = tracemalloc.take_snapshot().compare_to(self._snapshot, 'lineno')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"peak traced memory: {peak / 1024:.1f} KiB\n")
+            for stat in diff[:self.top]:
+                f.write(f"{stat}\n")
+
+    def _prune(self):
+        """Delete profile files of all but the last keep cycles."""
+        files = {}
+        for name in os.listdir(self.directory):
+            match = _PROFILE_FILE_RE.match(name)
+            if match:
+                files.setdefault(int(match.group(1)), []).append(name)
+        for cycle in sorted(files)[:-max(1, self.keep)]:
+            for name in files[cycle]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
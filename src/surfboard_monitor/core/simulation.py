@@ -0,0 +1,270 @@
+"""
+Accelerated simulation: run the full monitor pipeline over days of virtual time.
+
+Example:
+    surfboard-monitor-simulate --days 7 --per-day 60
+    surfboard-monitor-simulate --archive archive/ --recording gemini.jsonl
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from ..ai.loadtest import SAMPLE_TITLES
+from ..ai.replay import ReplayClient
+from ..config import Config
+from ..listing import make_listing_id
+from ..scrapers.craigslist_scraper import parse_search_results
+from .clock import VirtualClock
+from .metrics import Metrics
+from .monitor import SurfboardMonitor
+
+logger = logging.getLogger(__name__)
+
+SHAPERS = ['Bing', 'Takayama', 'Robert August', 'Harbour', 'Stewart', 'Hobie', 'Becker', 'Donald Takayama']
+FINS = ['single fin', '2+1', 'thruster', 'twin fin', 'quad']
+CONDITIONS = ['no dings', 'a few pressure dents', 'one repaired ding', 'new wax', 'yellowed but watertight']
+
+
+def _query_of(url):
+    """(region, term) of a Craigslist search URL."""
+    parsed = urlparse(url)
+    return parsed.hostname.split('.', 1)[0], parse_qs(parsed.query).get('query', [''])[0]
+
+
+def _page(items):
+    document = json.dumps({'itemListElement': [{'item': item} for item in items]})
+    return (f'<html><head><script id="ld_searchpage_results" type="application/ld+json">{document}'
+            f'</script></head><body></body></html>').encode('utf-8')
+
+
+def _response(content):
+    return SimpleNamespace(status_code=200, headers={}, content=content, raise_for_status=lambda: None)
+
+
+def synthetic_timeline(queries, start, days, per_day, seed=None):
+    """[(posted_at, region, term, JSON-LD item)] posted at random over days, oldest first."""
+    rng = random.Random(seed)
+    timeline = []
+    for n in range(int(days * per_day)):
+        region, term = rng.choice(queries)
+        title = f"{rng.choice(SAMPLE_TITLES)} {rng.choice(SHAPERS)} {rng.choice(FINS)} #{n}"
+        item = {
+            'name': title,
+            'description': f"Moving sale. {rng.choice(CONDITIONS)}, serial {rng.getrandbits(48):x}, "
+                           f"{rng.choice(FINS)} setup, pickup in {region}",
+            'offers': {'price': f"{rng.randrange(150, 1900)}.00",
+                       'availableAtOrFrom': {'address': {'addressLocality': region, 'addressRegion': 'CA'}}},
+            'image': [f"https://images.craigslist.org/sim_{n}_300x300.jpg"],
+        }
+        timeline.append((start + rng.uniform(0, days * 86400), region, term, item))
+    timeline.sort(key=lambda entry: entry[0])
+    return timeline
+
+
+class SyntheticCraigslist:
+    """Stand-in for the scraper's HTTP session serving pages built from a timeline.
+
+    A search returns the query's newest page_size listings posted by the
+    clock's current time. published maps listing ID -> virtual post time.
+    """
+
+    def __init__(self, timeline, clock, page_size=120):
+        self.clock = clock
+        self.page_size = page_size
+        self.requests = 0
+        self.published = {}
+        self._posts = {}
+        for posted_at, region, term, item in timeline:
+            times, items = self._posts.setdefault((region, term), ([], []))
+            times.append(posted_at)
+            items.append(item)
+            self.published[make_listing_id(item['name'], item['offers']['price'])] = posted_at
+
+    def get(self, url, timeout=None):
+        self.requests += 1
+        times, items = self._posts.get(_query_of(url), ([], []))
+        visible = bisect.bisect_right(times, self.clock.time())
+        newest = items[max(0, visible - self.page_size):visible][::-1]
+        return _response(_page(newest))
+
+
+class ArchivedCraigslist:
+    """Stand-in for the scraper's HTTP session serving pages from a PageArchive.
+
+    A search returns the latest page archived for the query at or before
+    the clock's current time. published maps listing ID -> time of the
+    first archived page it appeared on.
+    """
+
+    def __init__(self, archive, clock, max_results=1000):
+        self.archive = archive
+        self.clock = clock
+        self.max_results = max_results
+        self.requests = 0
+        self.published = {}
+        self._pages = {}
+        self._parsed = set()
+        for _, region, term, fetched_at, _, base_url, digest in archive.pages():
+            times, pages = self._pages.setdefault((region, term), ([], []))
+            times.append(fetched_at)
+            pages.append((fetched_at, digest, base_url))
+
+    def get(self, url, timeout=None):
+        self.requests += 1
+        times, pages = self._pages.get(_query_of(url), ([], []))
+        index = bisect.bisect_right(times, self.clock.time()) - 1
+        if index < 0:
+            return _response(_page([]))
+        fetched_at, digest, base_url = pages[index]
+        content = self.archive.read(digest)
+        if digest not in self._parsed:
+            self._parsed.add(digest)
+            for listing in parse_search_results(content, base_url, self.max_results):
+                self.published.setdefault(listing.get('id'), fetched_at)
+        return _response(content)
+
+
+def simulation_config(config=None):
+    """Config for a simulated run: no side effects outside the process."""
+    config = config or Config()
+    for name, value in (('HISTORY_DB', ''), ('CLUSTER_DB', ''), ('CONFIG_FILE', ''), ('STATUS_PORT', 0),
+                        ('PAGE_ARCHIVE_DIR', ''), ('ENABLE_IMAGE_HASHING', False), ('PARSE_WORKERS', 0),
+                        ('ENABLE_DESKTOP_NOTIFICATIONS', False), ('ENABLE_EMAIL_NOTIFICATIONS', False),
+                        ('GEMINI_RECORD_FILE', ''), ('ENABLE_GEMINI_FILTERING', True)):
+        setattr(config, name, value)
+    return config
+
+
+def run_simulation(monitor, clock, site, duration, interval=None, track_memory=True, sample_every=86400):
+    """Run check_for_new_listings every interval virtual seconds for duration; return a report.
+
+    Notifications are captured instead of sent. Detection latency is the
+    virtual time from a listing's publication on site to its alert.
+    """
+    interval = interval or monitor.config.CHECK_INTERVAL
+    alerts = {}
+
+    def capture(listing, profile=None):
+        alerts.setdefault(listing.get('id'), clock.time())
+
+    monitor.notifier.notify_new_listing = capture
+    monitor.notifier.notify_price_drop = lambda *args, **kwargs: None
+    gemini = monitor.classifier.client
+    gemini_calls = getattr(gemini, 'calls', 0)
+
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0] if track_memory else 0
+    memory = []
+    start = clock.time()
+    end = start + duration
+    next_sample = start
+    cycles = 0
+    wall_start = time.perf_counter()
+    try:
+        while clock.time() < end:
+            cycle_start = clock.time()
+            monitor.check_for_new_listings()
+            cycles += 1
+            if track_memory and clock.time() >= next_sample:
+                memory.append(tracemalloc.get_traced_memory()[0] - baseline)
+                next_sample += sample_every
+            clock.advance(cycle_start + interval - clock.time())
+        wall = time.perf_counter() - wall_start
+        if track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            memory.append(current - baseline)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    latencies = Metrics(max_samples=max(len(alerts), 1))
+    for listing_id, alerted_at in alerts.items():
+        if listing_id in site.published:
+            latencies.observe('detection_s', alerted_at - site.published[listing_id])
+    published = sum(1 for posted_at in site.published.values() if posted_at < end)
+    report = {
+        'simulated_days': round(duration / 86400, 2),
+        'cycles': cycles,
+        'wall_s': round(wall, 3),
+        'speedup': round(duration / wall) if wall else None,
+        'listings_published': published,
+        'alerts': len(alerts),
+        'detection_latency_s': {
+            'p50': latencies.percentile('detection_s', 50),
+            'p95': latencies.percentile('detection_s', 95),
+            'max': max(latencies.samples('detection_s'), default=None),
+        },
+        'api_calls': {
+            'craigslist': site.requests,
+            'gemini': getattr(gemini, 'calls', 0) - gemini_calls,
+            'gemini_errors': getattr(gemini, 'errors', 0),
+        },
+    }
+    if track_memory:
+        report['memory_kib'] = {
+            'growth': round(memory[-1] / 1024, 1),
+            'peak': round((peak - baseline) / 1024, 1),
+            'per_day': [round(sample / 1024, 1) for sample in memory[:-1]],
+        }
+    return report
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Simulate the monitor over days of virtual time")
+    parser.add_argument('--days', type=float, default=None, help="Simulated period (default: 7, or the archive's span)")
+    parser.add_argument('--per-day', type=float, default=60.0, help="Synthetic listings posted per day")
+    parser.add_argument('--interval', type=int, default=None, help="Seconds between cycles (default: CHECK_INTERVAL)")
+    parser.add_argument('--archive', help="Replay a page archive directory instead of synthetic pages")
+    parser.add_argument('--recording', help="JSONL file written by RecordingClient (default: synthetic answers)")
+    parser.add_argument('--latency-ms', type=float, default=800.0, help="Virtual Gemini latency per call")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (runs faster)")
+    args = parser.parse_args(argv)
+
+    # Per-cycle logs would dominate the run time
+    logging.getLogger('surfboard_monitor').setLevel(logging.WARNING)
+
+    if args.archive:
+        from ..storage.page_archive import PageArchive
+        archive = PageArchive(args.archive, retention_days=0)
+        pages = archive.pages()
+        if not pages:
+            parser.error(f"no pages archived in {args.archive}")
+        first, last = pages[0][3], pages[-1][3]
+        clock = VirtualClock(first)
+        site = ArchivedCraigslist(archive, clock)
+        duration = args.days * 86400 if args.days else max(last - first, 1)
+        monitor = SurfboardMonitor(simulation_config(), clock=clock)
+    else:
+        clock = VirtualClock()
+        duration = (args.days or 7.0) * 86400
+        monitor = SurfboardMonitor(simulation_config(), clock=clock)
+        timeline = synthetic_timeline(monitor.scraper.default_queries(), clock.time(), duration / 86400,
+                                      args.per_day, seed=args.seed)
+        site = SyntheticCraigslist(timeline, clock)
+    options = dict(latency_ms=args.latency_ms, error_rate=args.error_rate, seed=args.seed, sleep=clock.sleep)
+    monitor.classifier.client = (ReplayClient.from_file(args.recording, **options) if args.recording
+                                 else ReplayClient(**options))
+    monitor.scraper.session = site
+    with tempfile.TemporaryDirectory() as directory:
+        monitor.scraper.last_check_file = os.path.join(directory, 'last_check_timestamp.json')
+        report = run_simulation(monitor, clock, site, duration, args.interval, track_memory=not args.no_memory)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Embedded HTTP status endpoint serving the snapshot published after each cycle.
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = self.server.status
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path in ('', '/status'):
+            self._send(200, status.body)
+        elif path == '/healthz':
+            healthy, body = status.health()
+            self._send(200 if healthy else 503, body)
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def _send(self, code, body):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Status request from {self.client_address[0]}: {format % args}")
+
+
+class StatusServer:
+    """Serve /status and /healthz from a pre-encoded snapshot.
+
+    publish() encodes the snapshot once per cycle and swaps it in; requests
+    only read the latest bytes, so the monitor never waits on a client.
+    /healthz turns 503 when no snapshot arrived for stale_after seconds.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, stale_after=900, clock=time.time):
+        self.stale_after = stale_after
+        self.clock = clock
+        self.body = json.dumps({'status': 'starting'}).encode('utf-8')
+        self.published_at = None
+        self.started_at = clock()
+        self._server = ThreadingHTTPServer((host, port), _StatusHandler)
+        self._server.daemon_threads = True
+        self._server.status = self
+        self._thread = None
+
+    @property
+    def address(self):
+        """(host, port) actually bound; port 0 picks a free one."""
+        return self._server.server_address[:2]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='status-server', daemon=True)
+        self._thread.start()
+        host, port = self.address
+        logger.info(f"Status endpoint listening on http://{host}:{port}/status")
+
+    def publish(self, snapshot):
+        """Replace the served snapshot."""
+        self.body = json.dumps(snapshot, default=str).encode('utf-8')
+        self.published_at = self.clock()
+
+    def health(self):
+        """(healthy, JSON body) based on the age of the last snapshot."""
+        now = self.clock()
+        age = now - (self.published_at if self.published_at is not None else self.started_at)
+        healthy = age <= self.stale_after
+        body = {'ok': healthy, 'last_publish_age_s': round(age, 1), 'published': self.published_at is not None}
+        return healthy, json.dumps(body).encode('utf-8')
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+        self._server.server_close()
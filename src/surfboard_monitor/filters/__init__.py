@@ -0,0 +1 @@
+# Listing filter stages
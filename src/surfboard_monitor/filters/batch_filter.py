@@ -0,0 +1,182 @@
+"""
+Vectorised pre-filter stage between scraping and classification.
+"""
+
+import logging
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+from ..config import Config
+from ..core.metrics import metrics
+from ..geo import haversine_miles, location_point
+from ..listing import ListingBatch, MISSING_PRICE, UNKNOWN_TIME
+from .keywords import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+# 9'6, 9’6", 10' 0", 9 ft 6 in, 9ft
+_LENGTH_RE = re.compile(
+    r"(?<![\d.])(\d{1,2})\s*(?:'|’|ft\b|feet\b|foot\b)\s*(?:(\d{1,2})(?![\d.]))?",
+    re.IGNORECASE
+)
+MIN_BOARD_FEET = 4
+MAX_BOARD_FEET = 14
+
+
+def parse_board_length(text):
+    """Return the first plausible surfboard length in text, in inches, or None."""
+    if not text:
+        return None
+    for match in _LENGTH_RE.finditer(text):
+        feet = int(match.group(1))
+        inches = int(match.group(2)) if match.group(2) else 0
+        if MIN_BOARD_FEET <= feet <= MAX_BOARD_FEET and inches < 12:
+            return feet * 12 + inches
+    return None
+
+
+def board_lengths(batch):
+    """Board length column (inches, NaN when unknown) parsed from title, then description."""
+    lengths = np.full(len(batch), np.nan)
+    for i, (title, description) in enumerate(zip(batch.titles, batch.descriptions)):
+        length = parse_board_length(title)
+        if length is None:
+            length = parse_board_length(description)
+        if length is not None:
+            lengths[i] = length
+    return lengths
+
+
+class FilterSpec:
+    """Declarative description of which listings may go on to classification.
+
+    Prices are in dollars, ages in seconds, lengths in inches and the radius
+    around ``center`` (lat, lon) in miles. ``None`` (or an
+    empty keyword list) disables a term. Listings where a field is unknown pass
+    that term, so a missing price or date never hides a listing.
+    """
+
+    def __init__(self, min_price=None, max_price=None, max_age=None, required_keywords=(),
+                 forbidden_keywords=(), min_length=None, max_length=None, center=None, radius_miles=None):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.max_age = max_age
+        self.required_keywords = list(required_keywords)
+        self.forbidden_keywords = list(forbidden_keywords)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.center = center
+        self.radius_miles = radius_miles
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the spec described by Config settings."""
+        required = list(config.REQUIRED_KEYWORDS)
+        if config.REQUIRE_DESCRIPTION_KEYWORD and config.DESCRIPTION_KEYWORD:
+            required.append(config.DESCRIPTION_KEYWORD)
+        return cls(
+            min_price=config.MIN_PRICE or None,
+            max_price=config.MAX_PRICE or None,
+            max_age=config.MAX_LISTING_AGE_HOURS * 3600 or None,
+            required_keywords=required,
+            forbidden_keywords=config.FORBIDDEN_KEYWORDS,
+            min_length=config.MIN_BOARD_LENGTH_INCHES or None,
+            max_length=config.MAX_BOARD_LENGTH_INCHES or None,
+            center=location_point(config.LOCATION) if config.RADIUS else None,
+            radius_miles=config.RADIUS or None,
+        )
+
+
+class BatchFilter:
+    """Evaluate a FilterSpec over a ListingBatch with array operations."""
+
+    def __init__(self, spec, clock=time.time):
+        self.spec = spec
+        self.clock = clock
+        self.metrics = metrics
+        self.keywords = KeywordMatcher({
+            'required': spec.required_keywords,
+            'forbidden': spec.forbidden_keywords,
+        })
+        self.needs_length = spec.min_length is not None or spec.max_length is not None
+
+    @classmethod
+    def from_config(cls, config=None, clock=time.time):
+        return cls(FilterSpec.from_config(config or Config()), clock=clock)
+
+    def mask(self, batch, posted_after=None, price_range=None, within_radius=True):
+        """Return a boolean array with one entry per listing in batch.
+        
+        price_range, as (min, max) dollars with 0 meaning unbounded, overrides the
+        spec's price terms for this call; within_radius=False skips the distance term.
+        """
+        spec = self.spec
+        min_price, max_price = spec.min_price, spec.max_price
+        if price_range is not None:
+            min_price, max_price = (price_range[0] or None), (price_range[1] or None)
+        keep = np.ones(len(batch), dtype=bool)
+        rejected = {}
+
+        def apply(name, term):
+            nonlocal keep
+            rejected[name] = int(np.count_nonzero(keep & ~term))
+            keep &= term
+
+        prices = batch.price_cents
+        known_price = prices != MISSING_PRICE
+        if min_price is not None:
+            apply('min_price', ~known_price | (prices >= int(min_price * 100)))
+        if max_price is not None:
+            apply('max_price', ~known_price | (prices <= int(max_price * 100)))
+
+        cutoff = None
+        if posted_after is not None:
+            cutoff = int(posted_after.timestamp()) if isinstance(posted_after, datetime) else int(posted_after)
+        if spec.max_age is not None:
+            age_cutoff = int(self.clock() - spec.max_age)
+            cutoff = age_cutoff if cutoff is None else max(cutoff, age_cutoff)
+        if cutoff is not None:
+            apply('age', (batch.posted_at == UNKNOWN_TIME) | (batch.posted_at > cutoff))
+
+        if within_radius and spec.center is not None and spec.radius_miles:
+            # Only listings that published coordinates can be placed
+            distances = haversine_miles(batch.latitudes, batch.longitudes, *spec.center)
+            with np.errstate(invalid='ignore'):
+                apply('distance', np.isnan(distances) | (distances <= spec.radius_miles))
+
+        if self.needs_length:
+            lengths = board_lengths(batch)
+            known_length = ~np.isnan(lengths)
+            with np.errstate(invalid='ignore'):
+                if spec.min_length is not None:
+                    apply('min_length', ~known_length | (lengths >= spec.min_length))
+                if spec.max_length is not None:
+                    apply('max_length', ~known_length | (lengths <= spec.max_length))
+
+        if self.keywords:
+            # One scan per surviving listing yields every keyword category it hits
+            hits = [set()] * len(batch)
+            for i in np.flatnonzero(keep):
+                hits[i] = self.keywords.match(f"{batch.titles[i]} {batch.descriptions[i]}")
+            if spec.required_keywords:
+                apply('required_keywords', np.fromiter(('required' in h for h in hits), bool, len(batch)))
+            if spec.forbidden_keywords:
+                apply('forbidden_keywords', np.fromiter(('forbidden' not in h for h in hits), bool, len(batch)))
+
+        for name, count in rejected.items():
+            if count:
+                self.metrics.increment(f'filter.rejected.{name}', count)
+        return keep
+
+    def apply(self, listings, posted_after=None, price_range=None, within_radius=True):
+        """Filter listings (a list or ListingBatch) and return the surviving rows."""
+        batch = listings if isinstance(listings, ListingBatch) else ListingBatch.from_listings(listings)
+        mask = self.mask(batch, posted_after=posted_after, price_range=price_range, within_radius=within_radius)
+        kept = batch.select(mask).to_listings()
+        self.metrics.increment('filter.input', len(batch))
+        self.metrics.increment('filter.output', len(kept))
+        logger.info(f"Pre-filter: {len(batch)} -> {len(kept)} listings")
+        return kept
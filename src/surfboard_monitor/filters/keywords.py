@@ -0,0 +1,76 @@
+"""
+Compiled multi-keyword matching for listing text.
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    """Case-insensitive Aho–Corasick matcher over named keyword categories.
+
+    The automaton is built once from ``{category: [keywords]}``; ``match`` reads
+    a text a single time, whatever the number of keywords, and returns every
+    category that was hit (overlapping and nested keywords included).
+    """
+
+    def __init__(self, categories):
+        self.categories = {name: [k.lower() for k in keywords if k] for name, keywords in categories.items()}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                self._add(keyword, name)
+        self._link()
+        self._all = frozenset(name for name, keywords in self.categories.items() if keywords)
+
+    def _add(self, keyword, category):
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+            node = nxt
+        self._out[node] = self._out[node] | {category}
+
+    def _link(self):
+        """Compute failure links breadth-first and fold outputs along them."""
+        # Depth-one nodes fail back to the root, which is already their default
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] | self._out[self._fail[child]]
+                queue.append(child)
+
+    def __bool__(self):
+        return bool(self._all)
+
+    def match(self, text):
+        """Return the set of categories with at least one keyword in text."""
+        if not self._all or not text:
+            return set()
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits |= out[node]
+                if len(hits) == len(self._all):
+                    break
+        return hits
+
+    def matches(self, text, category):
+        """Return True if text contains a keyword from category."""
+        return category in self.match(text)
@@ -0,0 +1,214 @@
+"""
+Repost and near-duplicate detection with 64-bit SimHash fingerprints.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from ..core.metrics import metrics
+from ..storage.history import title_key
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+# Feature weights: the photo is the strongest repost signal, then the title
+TITLE_WEIGHT = 3
+BIGRAM_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+IMAGE_WEIGHT = 8
+# Listings with fewer features (e.g. a bare "Surfboard" title) are too generic to match
+MIN_FEATURES = 4
+
+
+def _feature_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def listing_features(listing):
+    """Weighted features from normalised title, description and image URL."""
+    features = defaultdict(int)
+    title_words = title_key(listing.get('title', '')).split()
+    for word in title_words:
+        features[f"t:{word}"] += TITLE_WEIGHT
+    for first, second in zip(title_words, title_words[1:]):
+        features[f"b:{first} {second}"] += BIGRAM_WEIGHT
+    for word in title_key(listing.get('description', '')).split():
+        features[f"d:{word}"] += DESCRIPTION_WEIGHT
+    image_url = listing.get('image_url', '')
+    if image_url:
+        # Craigslist serves the same photo under different size suffixes
+        features[f"i:{image_url.rsplit('/', 1)[-1].split('_')[0]}"] += IMAGE_WEIGHT
+    return features
+
+
+def simhash(features):
+    """64-bit SimHash of a {feature: weight} mapping."""
+    if not features:
+        return 0
+    tokens = list(features)
+    hashes = np.fromiter((_feature_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+    weights = np.fromiter((features[token] for token in tokens), dtype=np.int64, count=len(tokens))
+    bits = ((hashes[:, None] >> _SHIFTS) & np.uint64(1)).astype(np.int64)
+    votes = (weights[:, None] * (2 * bits - 1)).sum(axis=0)
+    return int(((votes > 0).astype(np.uint64) << _SHIFTS).sum())
+
+
+def listing_simhash(listing):
+    return simhash(listing_features(listing))
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def to_signed(fingerprint):
+    """Map an unsigned 64-bit fingerprint into SQLite's signed INTEGER range."""
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+
+def from_signed(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class DuplicateMatch:
+    """An earlier listing that a new one is a near-duplicate of."""
+
+    __slots__ = ('listing_id', 'fingerprint', 'classification', 'price_cents', 'distance')
+
+    def __init__(self, listing_id, fingerprint, classification, price_cents, distance=0):
+        self.listing_id = listing_id
+        self.fingerprint = fingerprint
+        self.classification = classification
+        self.price_cents = price_cents
+        self.distance = distance
+
+    def is_price_drop(self, price_cents):
+        return price_cents is not None and self.price_cents is not None and price_cents < self.price_cents
+
+
+class NearDuplicateIndex:
+    """SimHash index with banded exact-match lookups.
+
+    Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+    principle any fingerprint within max_distance bits shares at least one band
+    exactly, so a lookup is a few dict probes plus Hamming checks on candidates.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._tables = [defaultdict(list) for _ in range(self.bands)]
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_values(self, fingerprint):
+        return [(fingerprint >> (band * self.band_bits)) & self._band_mask for band in range(self.bands)]
+
+    def add(self, listing_id, fingerprint, classification, price_cents):
+        """Index (or update) a listing's fingerprint, classification and latest price."""
+        with self._lock:
+            if listing_id in self._entries:
+                entry = self._entries[listing_id]
+                entry.classification = classification or entry.classification
+                entry.price_cents = price_cents
+                return
+            self._entries[listing_id] = DuplicateMatch(listing_id, fingerprint, classification, price_cents)
+            for table, value in zip(self._tables, self._band_values(fingerprint)):
+                table[value].append(listing_id)
+
+    def query(self, fingerprint, exclude=None):
+        """Closest indexed listing within max_distance bits, or None."""
+        with self._lock:
+            best = None
+            seen = set()
+            for table, value in zip(self._tables, self._band_values(fingerprint)):
+                for listing_id in table.get(value, ()):
+                    if listing_id in seen or listing_id == exclude:
+                        continue
+                    seen.add(listing_id)
+                    entry = self._entries[listing_id]
+                    distance = hamming(fingerprint, entry.fingerprint)
+                    if distance <= self.max_distance and (best is None or distance < best.distance):
+                        best = DuplicateMatch(entry.listing_id, entry.fingerprint, entry.classification,
+                                              entry.price_cents, distance)
+            return best
+
+    def load_history(self, store, since=None, column='simhash'):
+        """Bootstrap from a HistoryStore: latest fingerprint, label and price per listing."""
+        loaded = 0
+        for listing_id, fingerprint, classification, price_cents in store.fingerprints(since=since, column=column):
+            if fingerprint is None or classification is None:
+                continue
+            self.add(listing_id, from_signed(fingerprint), classification, price_cents)
+            loaded += 1
+        logger.info(f"Near-duplicate index loaded {loaded} {column} fingerprints from history")
+        return loaded
+
+
+class NearDuplicateDetector:
+    """Split incoming listings into fresh ones and reposts of classified listings."""
+
+    def __init__(self, max_distance=3, name='dedupe'):
+        self.index = NearDuplicateIndex(max_distance)
+        self.name = name
+        self.metrics = metrics
+        self._fingerprints = {}
+
+    def fingerprint(self, listing):
+        """SimHash of listing, or None when it has too few features to compare."""
+        listing_id = listing.get('id')
+        if listing_id in self._fingerprints:
+            return self._fingerprints[listing_id]
+        features = listing_features(listing)
+        fingerprint = simhash(features) if len(features) >= MIN_FEATURES else None
+        if listing_id is not None:
+            self._fingerprints[listing_id] = fingerprint
+        return fingerprint
+
+    def partition(self, listings):
+        """Return (fresh, [(listing, match)]) where each match carries a reusable classification."""
+        # Fingerprints are cached for one batch so history recording can reuse them
+        self._fingerprints = {}
+        fresh, duplicates = [], []
+        start = time.perf_counter()
+        for listing in listings:
+            fingerprint = self.fingerprint(listing)
+            match = None
+            if fingerprint is not None:
+                match = self.index.query(fingerprint, exclude=listing.get('id'))
+            if match is None or match.classification is None:
+                fresh.append(listing)
+            else:
+                duplicates.append((listing, match))
+        if listings:
+            self.metrics.observe(f'{self.name}.lookup_ms', (time.perf_counter() - start) * 1000 / len(listings))
+        self.metrics.increment(f'{self.name}.reposts', len(duplicates))
+        return fresh, duplicates
+
+    def remember(self, listing, classification):
+        """Index a classified listing so later reposts reuse its classification."""
+        fingerprint = self.fingerprint(listing)
+        if classification is None or fingerprint is None or listing.get('id') is None:
+            return
+        self.index.add(listing.get('id'), fingerprint, classification, listing.get('price_cents'))
+
+    def remember_repost(self, listing, match):
+        """Index a repost under its own ID and move the original to the repost's price.
+
+        Updating the original keeps a later repost at the same price from being
+        reported as a drop against the first asking price.
+        """
+        self.remember(listing, match.classification)
+        self.index.add(match.listing_id, match.fingerprint, match.classification, listing.get('price_cents'))
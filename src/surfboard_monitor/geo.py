@@ -0,0 +1,189 @@
+"""
+Craigslist site coordinates, a grid index over them and vectorised great-circle distances.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+# How far a site's area extends from its centre; sites this much beyond RADIUS can still hold nearby listings
+SITE_REACH_MILES = 30
+
+# Craigslist subdomain -> (name, latitude, longitude) of the area's main city
+SITES = {
+    # California
+    'sandiego': ('San Diego', 32.7157, -117.1611),
+    'orangecounty': ('Orange County', 33.7455, -117.8677),
+    'losangeles': ('Los Angeles', 34.0522, -118.2437),
+    'inlandempire': ('Inland Empire', 34.0553, -117.3150),
+    'palmsprings': ('Palm Springs', 33.8303, -116.5453),
+    'imperial': ('Imperial County', 32.7920, -115.5631),
+    'ventura': ('Ventura', 34.2746, -119.2290),
+    'santabarbara': ('Santa Barbara', 34.4208, -119.6982),
+    'slo': ('San Luis Obispo', 35.2828, -120.6596),
+    'bakersfield': ('Bakersfield', 35.3733, -119.0187),
+    'visalia': ('Visalia', 36.3302, -119.2921),
+    'fresno': ('Fresno', 36.7378, -119.7871),
+    'merced': ('Merced', 37.3022, -120.4830),
+    'modesto': ('Modesto', 37.6391, -120.9969),
+    'stockton': ('Stockton', 37.9577, -121.2908),
+    'monterey': ('Monterey', 36.6002, -121.8947),
+    'sfbay': ('San Francisco', 37.7749, -122.4194),
+    'sacramento': ('Sacramento', 38.5816, -121.4944),
+    'goldcountry': ('Gold Country', 38.3488, -120.7741),
+    'yubasutter': ('Yuba-Sutter', 39.1404, -121.6169),
+    'chico': ('Chico', 39.7285, -121.8375),
+    'mendocino': ('Mendocino', 39.3077, -123.7995),
+    'redding': ('Redding', 40.5865, -122.3917),
+    'humboldt': ('Humboldt', 40.8021, -124.1637),
+    # Pacific Northwest, Hawaii and the West
+    'medford': ('Medford', 42.3265, -122.8756),
+    'eugene': ('Eugene', 44.0521, -123.0868),
+    'oregoncoast': ('Oregon Coast', 44.6368, -124.0535),
+    'corvallis': ('Corvallis', 44.5646, -123.2620),
+    'salem': ('Salem', 44.9429, -123.0351),
+    'bend': ('Bend', 44.0582, -121.3153),
+    'portland': ('Portland', 45.5152, -122.6784),
+    'seattle': ('Seattle', 47.6062, -122.3321),
+    'olympic': ('Olympic Peninsula', 48.1181, -123.4307),
+    'skagit': ('Skagit', 48.4201, -122.3375),
+    'bellingham': ('Bellingham', 48.7519, -122.4787),
+    'spokane': ('Spokane', 47.6588, -117.4260),
+    'honolulu': ('Honolulu', 21.3069, -157.8583),
+    'reno': ('Reno', 39.5296, -119.8138),
+    'vegas': ('Las Vegas', 36.1699, -115.1398),
+    'phoenix': ('Phoenix', 33.4484, -112.0740),
+    'tucson': ('Tucson', 32.2226, -110.9747),
+    'denver': ('Denver', 39.7392, -104.9903),
+    # Texas and the Gulf
+    'austin': ('Austin', 30.2672, -97.7431),
+    'sanantonio': ('San Antonio', 29.4241, -98.4936),
+    'corpuschristi': ('Corpus Christi', 27.8006, -97.3964),
+    'houston': ('Houston', 29.7604, -95.3698),
+    'galveston': ('Galveston', 29.3013, -94.7977),
+    'dallas': ('Dallas', 32.7767, -96.7970),
+    'neworleans': ('New Orleans', 29.9511, -90.0715),
+    # Florida and the Southeast
+    'miami': ('Miami', 25.7617, -80.1918),
+    'treasure': ('Treasure Coast', 27.4467, -80.3256),
+    'spacecoast': ('Space Coast', 28.0836, -80.6081),
+    'daytona': ('Daytona Beach', 29.2108, -81.0228),
+    'orlando': ('Orlando', 28.5383, -81.3792),
+    'jacksonville': ('Jacksonville', 30.3322, -81.6557),
+    'tampa': ('Tampa', 27.9506, -82.4572),
+    'sarasota': ('Sarasota', 27.3364, -82.5307),
+    'fortmyers': ('Fort Myers', 26.6406, -81.8723),
+    'pensacola': ('Pensacola', 30.4213, -87.2169),
+    'atlanta': ('Atlanta', 33.7490, -84.3880),
+    'charleston': ('Charleston', 32.7765, -79.9311),
+    'myrtlebeach': ('Myrtle Beach', 33.6891, -78.8867),
+    'wilmington': ('Wilmington', 34.2257, -77.9447),
+    'outerbanks': ('Outer Banks', 35.9082, -75.6757),
+    # Mid-Atlantic and New England
+    'norfolk': ('Norfolk', 36.8508, -76.2859),
+    'washingtondc': ('Washington', 38.9072, -77.0369),
+    'baltimore': ('Baltimore', 39.2904, -76.6122),
+    'delaware': ('Delaware', 39.1582, -75.5244),
+    'southjersey': ('South Jersey', 39.3643, -74.4229),
+    'jerseyshore': ('Jersey Shore', 40.2204, -74.0121),
+    'philadelphia': ('Philadelphia', 39.9526, -75.1652),
+    'newyork': ('New York', 40.7128, -74.0060),
+    'longisland': ('Long Island', 40.7891, -73.1350),
+    'newhaven': ('New Haven', 41.3083, -72.9279),
+    'providence': ('Providence', 41.8240, -71.4128),
+    'boston': ('Boston', 42.3601, -71.0589),
+    'capecod': ('Cape Cod', 41.6688, -70.2962),
+    'nh': ('New Hampshire', 43.2081, -71.5376),
+    'maine': ('Maine', 43.6591, -70.2568),
+    # Midwest
+    'chicago': ('Chicago', 41.8781, -87.6298),
+    'detroit': ('Detroit', 42.3314, -83.0458),
+    'minneapolis': ('Minneapolis', 44.9778, -93.2650),
+}
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles; any argument may be a NumPy array (NaN in, NaN out)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def parse_point(value):
+    """(lat, lon) from 'lat,lon'; None if value is not a coordinate pair."""
+    parts = str(value).split(',')
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return lat, lon
+    return None
+
+
+def location_point(location):
+    """(lat, lon) for 'lat,lon', a site code or a city name like 'San Diego, CA'; None if unknown."""
+    point = parse_point(location)
+    if point is not None:
+        return point
+    text = str(location or '').strip()
+    if text in SITES:
+        return SITES[text][1:]
+    city = text.split(',')[0].strip().lower()
+    for name, lat, lon in SITES.values():
+        if name.lower() == city:
+            return lat, lon
+    return None
+
+
+class SiteIndex:
+    """Sites bucketed into a grid of cell_degrees squares for radius queries.
+
+    A query only measures the sites in cells overlapping the search circle's
+    bounding box instead of the whole table.
+    """
+
+    def __init__(self, sites=None, cell_degrees=1.0):
+        self.sites = SITES if sites is None else sites
+        self.cell_degrees = cell_degrees
+        self.cells = {}
+        for code, (_, lat, lon) in self.sites.items():
+            self.cells.setdefault(self._cell(lat, lon), []).append(code)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _candidates(self, lat, lon, miles):
+        lat_span = miles / MILES_PER_DEGREE_LAT
+        lon_span = min(180.0, lat_span / max(math.cos(math.radians(min(abs(lat) + lat_span, 89.0))), 0.01))
+        low_lat, low_lon = self._cell(max(lat - lat_span, -90.0), max(lon - lon_span, -180.0))
+        high_lat, high_lon = self._cell(min(lat + lat_span, 90.0), min(lon + lon_span, 180.0))
+        return [code for row in range(low_lat, high_lat + 1) for column in range(low_lon, high_lon + 1)
+                for code in self.cells.get((row, column), ())]
+
+    def within(self, lat, lon, radius_miles, reach_miles=SITE_REACH_MILES):
+        """[(distance, site)] for sites whose area may reach within radius_miles, nearest first."""
+        codes = self._candidates(lat, lon, radius_miles + reach_miles)
+        if not codes:
+            return []
+        distances = haversine_miles(lat, lon, [self.sites[code][1] for code in codes],
+                                    [self.sites[code][2] for code in codes])
+        return sorted((float(distance), code) for distance, code in zip(distances, codes)
+                      if distance <= radius_miles + reach_miles)
+
+    def nearest(self, lat, lon):
+        """Closest site to a point (searching outward until one is found)."""
+        miles = 50.0
+        while True:
+            found = self.within(lat, lon, miles, reach_miles=0)
+            if found or miles > 2 * math.pi * EARTH_RADIUS_MILES:
+                return found[0][1] if found else None
+            miles *= 2
+
+
+SITE_INDEX = SiteIndex()
@@ -0,0 +1 @@
+# Optional thumbnail fetching and perceptual hashing
@@ -0,0 +1,25 @@
+"""
+Repost detection from listing photos, for reposts whose text was rewritten.
+"""
+
+from ..filters.near_duplicates import NearDuplicateDetector
+
+
+class ImageDuplicateDetector(NearDuplicateDetector):
+    """NearDuplicateDetector keyed on the perceptual hash of each listing's thumbnail.
+
+    Thumbnails are fetched lazily: only listings handed to partition (those
+    that survived the cheap filters and text dedup) are downloaded.
+    """
+
+    def __init__(self, fetcher, max_distance=6):
+        super().__init__(max_distance, name='images.dedupe')
+        self.fetcher = fetcher
+
+    def fingerprint(self, listing):
+        """Perceptual hash of the listing's thumbnail if it has been fetched, else None."""
+        return self.fetcher.cached_hash(listing.get('image_url', ''))
+
+    def partition(self, listings):
+        self.fetcher.hash_many(listing.get('image_url', '') for listing in listings)
+        return super().partition(listings)
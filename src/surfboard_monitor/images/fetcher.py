@@ -0,0 +1,143 @@
+"""
+Bounded-concurrency thumbnail fetcher with a content-addressed disk cache.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+from ..core.metrics import metrics
+from .phash import HASHERS, decode_grayscale
+
+logger = logging.getLogger(__name__)
+
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ThumbnailCache:
+    """On-disk cache laid out by content hash.
+
+    ``blobs/ab/<sha256>`` holds image bytes, ``urls/<sha1(url)>`` the content
+    hash a URL resolved to and ``hashes/<sha256>.<algorithm>`` the perceptual
+    hash, so an image reposted under a new URL is stored and hashed once.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, kind, name):
+        return os.path.join(self.root, kind, name[:2], name)
+
+    def content_for_url(self, url):
+        try:
+            with open(self._path('urls', hashlib.sha1(url.encode('utf-8')).hexdigest()), 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def put(self, url, data):
+        """Store image bytes (once per content) and map url to them; return the content hash."""
+        content = hashlib.sha256(data).hexdigest()
+        blob = self._path('blobs', content)
+        if not os.path.exists(blob):
+            _atomic_write(blob, data)
+        _atomic_write(self._path('urls', hashlib.sha1(url.encode('utf-8')).hexdigest()), content.encode('ascii'))
+        return content
+
+    def read(self, content):
+        with open(self._path('blobs', content), 'rb') as f:
+            return f.read()
+
+    def get_hash(self, content, algorithm):
+        try:
+            with open(self._path('hashes', f"{content}.{algorithm}"), 'r') as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def put_hash(self, content, algorithm, value):
+        _atomic_write(self._path('hashes', f"{content}.{algorithm}"), str(value).encode('ascii'))
+
+
+class ThumbnailFetcher:
+    """Download and perceptually hash thumbnails, at most max_workers at a time.
+
+    Hashes are memoised per URL; the shared HostRateLimiter (when given) keeps
+    image requests inside the same per-host budget as the search requests.
+    """
+
+    def __init__(self, cache_dir, max_workers=4, algorithm='phash', session=None, rate_limiter=None, timeout=10):
+        self.cache = ThumbnailCache(cache_dir)
+        self.max_workers = max_workers
+        self.algorithm = algorithm
+        self.hasher = HASHERS[algorithm]
+        self.session = session or requests.Session()
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.metrics = metrics
+        self._hashes = {}  # url -> perceptual hash (None when unavailable)
+        self._lock = threading.Lock()
+
+    def cached_hash(self, url):
+        """Hash already computed for url in this process, without fetching."""
+        return self._hashes.get(url)
+
+    def hash_many(self, urls):
+        """Return {url: perceptual hash or None}, fetching uncached URLs concurrently."""
+        urls = [url for url in dict.fromkeys(urls) if url]
+        missing = [url for url in urls if url not in self._hashes]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='thumbnail') as pool:
+                for url, value in zip(missing, pool.map(self._hash_url, missing)):
+                    with self._lock:
+                        self._hashes[url] = value
+        return {url: self._hashes[url] for url in urls}
+
+    def _hash_url(self, url):
+        try:
+            content = self.cache.content_for_url(url)
+            if content is not None:
+                self.metrics.increment('images.cache_hits')
+                value = self.cache.get_hash(content, self.algorithm)
+                if value is not None:
+                    return value
+                data = self.cache.read(content)
+            else:
+                data = self._download(url)
+                if data is None:
+                    return None
+                content = self.cache.put(url, data)
+            value = self.hasher(decode_grayscale(data))
+            self.cache.put_hash(content, self.algorithm, value)
+            return value
+        except ImportError:
+            raise
+        except Exception as e:
+            logger.warning(f"Could not hash thumbnail {url}: {e}")
+            self.metrics.increment('images.errors')
+            return None
+
+    def _download(self, url):
+        host = urlparse(url).netloc
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(host)
+        response = self.session.get(url, timeout=self.timeout)
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_response(host, response.status_code, response.headers.get('Retry-After'))
+        self.metrics.increment('images.downloads')
+        if response.status_code != 200:
+            logger.debug(f"Thumbnail {url} returned {response.status_code}")
+            return None
+        return response.content
@@ -0,0 +1,80 @@
+"""
+Perceptual image hashes (dHash, pHash) computed with NumPy.
+"""
+
+import io
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is the optional "images" extra
+    Image = None
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+_BIT_WEIGHTS = (1 << np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64)).astype(np.uint64)
+
+
+def decoding_available():
+    return Image is not None
+
+
+def decode_grayscale(data):
+    """Decode image bytes into a float32 luminance array (requires Pillow)."""
+    if Image is None:
+        raise ImportError("Pillow is required for image hashing: pip install 'surfboard-monitor[images]'")
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft('L', (PHASH_SIZE * 4, PHASH_SIZE * 4))  # let JPEG decode at reduced size
+        return np.asarray(image.convert('L'), dtype=np.float32)
+
+
+def _bins(length, count):
+    """Start index and size of count near-equal bins over length pixels."""
+    starts = np.linspace(0, length, count + 1).astype(np.intp)[:-1]
+    sizes = np.diff(np.append(starts, length))
+    # Images smaller than the target repeat pixels rather than leaving bins empty
+    return starts, sizes.clip(min=1)
+
+
+def resize_area(gray, height, width):
+    """Downscale by averaging each output cell's source block."""
+    gray = np.asarray(gray, dtype=np.float64)
+    row_starts, row_sizes = _bins(gray.shape[0], height)
+    col_starts, col_sizes = _bins(gray.shape[1], width)
+    cells = np.add.reduceat(np.add.reduceat(gray, row_starts, axis=0), col_starts, axis=1)
+    return cells / row_sizes[:, None] / col_sizes[None, :]
+
+
+def bits_to_int(bits):
+    """Pack a 64-element boolean array into an int, first element as the lowest bit."""
+    return int((np.asarray(bits, dtype=bool).ravel().astype(np.uint64) * _BIT_WEIGHTS).sum())
+
+
+def dhash(gray):
+    """Difference hash: is each pixel brighter than its right-hand neighbour?"""
+    small = resize_area(gray, HASH_SIZE, HASH_SIZE + 1)
+    return bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def _dct_matrix(size):
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def phash(gray):
+    """DCT hash: low-frequency coefficients compared against their median."""
+    small = resize_area(gray, PHASH_SIZE, PHASH_SIZE)
+    coefficients = (_DCT @ small @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    # The DC term only encodes overall brightness
+    median = np.median(coefficients.ravel()[1:])
+    return bits_to_int(coefficients > median)
+
+
+HASHERS = {'dhash': dhash, 'phash': phash}
@@ -0,0 +1,282 @@
+"""
+Compact listing records and their columnar batch form.
+"""
+
+import hashlib
+import re
+import sys
+from datetime import datetime
+
+import numpy as np
+
+# Sentinels used in the columnar arrays
+MISSING_PRICE = -1
+UNKNOWN_TIME = 0
+
+_PRICE_RE = re.compile(r'\d[\d,]*(?:\.\d+)?|\.\d+')
+_DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M']
+
+
+def parse_price_cents(value):
+    """Parse '$1,200', '300.00' or 450 into integer cents; None if there is no price."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value * 100))
+    match = _PRICE_RE.search(str(value))
+    if not match:
+        return None
+    return int(round(float(match.group(0).replace(',', '')) * 100))
+
+
+def format_price(price_cents):
+    """Format integer cents the way listings have always displayed prices."""
+    if price_cents is None:
+        return 'Price not available'
+    dollars, cents = divmod(price_cents, 100)
+    if cents:
+        return f"${dollars:,}.{cents:02d}"
+    return f"${dollars:,}"
+
+
+def parse_posted_at(value):
+    """Parse a Craigslist date string into an epoch int; None if unparseable."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    date_str = str(value)
+    try:
+        if 'T' in date_str:
+            # ISO format: 2024-01-15T10:30:00-08:00
+            return int(datetime.fromisoformat(date_str.replace('Z', '+00:00')).timestamp())
+        for fmt in _DATE_FORMATS:
+            try:
+                return int(datetime.strptime(date_str, fmt).timestamp())
+            except ValueError:
+                continue
+    except ValueError:
+        return None
+    return None
+
+
+def make_listing_id(*parts, prefix='cl'):
+    """Stable listing ID from identifying fields (unlike hash(), identical across processes)."""
+    digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:16]
+    return f"{prefix}_{digest}"
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Listing:
+    """One scraped listing with typed fields.
+
+    Mapping-style access (``listing['title']``, ``listing.get('price')``) is kept
+    so notification templates and older callers keep working; ``price`` and
+    ``date`` are derived from ``price_cents`` and ``posted_at``.
+    """
+
+    __slots__ = ('id', 'title', 'price_cents', 'posted_at', 'location', 'url',
+                 'description', 'image_url', 'platform', 'region', 'latitude', 'longitude')
+
+    def __init__(self, id, title, price_cents=None, posted_at=None, location='',
+                 url='', description='', image_url='', platform='', region='', latitude=None, longitude=None):
+        self.id = id
+        self.title = title
+        self.price_cents = price_cents
+        self.posted_at = posted_at
+        # A handful of distinct locations repeat across thousands of listings
+        self.location = _intern(location)
+        self.url = url
+        self.description = description
+        self.image_url = image_url
+        self.platform = _intern(platform)
+        self.region = _intern(region)
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @property
+    def price(self):
+        return format_price(self.price_cents)
+
+    @property
+    def date(self):
+        """ISO posting time, or None when unknown (so ``get('date', default)`` returns the default)."""
+        if self.posted_at is None:
+            return None
+        return datetime.fromtimestamp(self.posted_at).isoformat()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Listing from the legacy dict representation."""
+        return cls(
+            id=data.get('id'),
+            title=data.get('title', ''),
+            price_cents=parse_price_cents(data.get('price')),
+            posted_at=parse_posted_at(data.get('date')),
+            location=data.get('location', ''),
+            url=data.get('url', ''),
+            description=data.get('description', ''),
+            image_url=data.get('image_url', ''),
+            platform=data.get('platform', ''),
+            region=data.get('region', ''),
+            latitude=data.get('latitude'),
+            longitude=data.get('longitude'),
+        )
+
+    def to_dict(self):
+        """Return the legacy dict representation."""
+        return {key: self.get(key) for key in self.__slots__ + ('price', 'date')}
+
+    def get(self, key, default=None):
+        if key in self.__slots__ or key in ('price', 'date'):
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key):
+        if key in self.__slots__ or key in ('price', 'date'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'price':
+            self.price_cents = parse_price_cents(value)
+        elif key == 'date':
+            self.posted_at = parse_posted_at(value)
+        elif key in ('location', 'platform', 'region'):
+            setattr(self, key, _intern(value))
+        elif key in self.__slots__:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ or key in ('price', 'date')
+
+    def __reduce__(self):
+        # Pickles as one positional tuple (e.g. from parse workers); locations re-interned on load
+        return (Listing, tuple(getattr(self, key) for key in self.__slots__))
+
+    def __eq__(self, other):
+        if not isinstance(other, Listing):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __hash__(self):
+        # Equal listings share an id, so sets and dict keys work; don't change id while a listing is in one
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"Listing(id={self.id!r}, title={self.title!r}, price={self.price!r})"
+
+
+def _coordinate(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _columns_for(row):
+    """Extract (price_cents, posted_at, title, description, location, latitude, longitude) from any listing row."""
+    if isinstance(row, Listing):
+        return (row.price_cents, row.posted_at, row.title, row.description, row.location,
+                row.latitude, row.longitude)
+    fields = []
+    for key, parse in (('price', parse_price_cents), ('date', parse_posted_at)):
+        try:
+            fields.append(parse(row.get(key)))
+        except Exception:
+            fields.append(None)
+    for key in ('title', 'description', 'location'):
+        try:
+            fields.append(row.get(key) or '')
+        except Exception:
+            fields.append('')
+    for key in ('latitude', 'longitude'):
+        try:
+            fields.append(_coordinate(row.get(key)))
+        except Exception:
+            fields.append(None)
+    return tuple(fields)
+
+
+class ListingBatch:
+    """Struct-of-arrays view over a list of listings for the filter stages.
+
+    Numeric columns are NumPy arrays (``MISSING_PRICE`` / ``UNKNOWN_TIME`` / NaN
+    mark absent values); ``rows`` keeps the original objects so a filtered batch hands
+    back exactly what was passed in.
+    """
+
+    __slots__ = ('rows', 'price_cents', 'posted_at', 'titles', 'descriptions', 'locations',
+                 'latitudes', 'longitudes')
+
+    def __init__(self, rows, price_cents, posted_at, titles, descriptions, locations, latitudes=None, longitudes=None):
+        self.rows = rows
+        self.price_cents = price_cents
+        self.posted_at = posted_at
+        self.titles = titles
+        self.descriptions = descriptions
+        self.locations = locations
+        self.latitudes = np.full(len(rows), np.nan) if latitudes is None else latitudes
+        self.longitudes = np.full(len(rows), np.nan) if longitudes is None else longitudes
+
+    @classmethod
+    def from_listings(cls, listings):
+        rows = list(listings)
+        n = len(rows)
+        if all(type(row) is Listing for row in rows):
+            # Fast path: typed records need no parsing
+            price_cents = np.fromiter(
+                (MISSING_PRICE if row.price_cents is None else row.price_cents for row in rows), np.int64, n)
+            posted_at = np.fromiter(
+                (UNKNOWN_TIME if row.posted_at is None else row.posted_at for row in rows), np.int64, n)
+            latitudes = np.fromiter(
+                (np.nan if row.latitude is None else row.latitude for row in rows), np.float64, n)
+            longitudes = np.fromiter(
+                (np.nan if row.longitude is None else row.longitude for row in rows), np.float64, n)
+            return cls(rows, price_cents, posted_at, [row.title for row in rows],
+                       [row.description for row in rows], [row.location for row in rows], latitudes, longitudes)
+        
+        price_cents = np.full(n, MISSING_PRICE, dtype=np.int64)
+        posted_at = np.full(n, UNKNOWN_TIME, dtype=np.int64)
+        titles = [''] * n
+        descriptions = [''] * n
+        locations = [''] * n
+        latitudes = np.full(n, np.nan)
+        longitudes = np.full(n, np.nan)
+        for i, row in enumerate(rows):
+            price, posted, titles[i], descriptions[i], locations[i], lat, lon = _columns_for(row)
+            if price is not None:
+                price_cents[i] = price
+            if posted is not None:
+                posted_at[i] = posted
+            if lat is not None and lon is not None:
+                latitudes[i], longitudes[i] = lat, lon
+        return cls(rows, price_cents, posted_at, titles, descriptions, locations, latitudes, longitudes)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def select(self, selector):
+        """Return a new batch with the rows picked by a boolean mask or index array."""
+        indices = np.flatnonzero(selector) if np.asarray(selector).dtype == bool else np.asarray(selector, dtype=np.intp)
+        return ListingBatch(
+            [self.rows[i] for i in indices],
+            self.price_cents[indices],
+            self.posted_at[indices],
+            [self.titles[i] for i in indices],
+            [self.descriptions[i] for i in indices],
+            [self.locations[i] for i in indices],
+            self.latitudes[indices],
+            self.longitudes[indices],
+        )
+
+    def to_listings(self):
+        return list(self.rows)
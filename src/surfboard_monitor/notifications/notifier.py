@@ -8,14 +8,19 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from plyer import notification
 from ..config import Config
+from ..listing import format_price
 
 logger = logging.getLogger(__name__)
 
 class Notifier:
     """Handles desktop and email notifications for surfboard listings."""
     
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None):
+        self.config = config or Config()
+    
+    def apply_config(self, config):
+        """Switch to a new config snapshot (channels and recipients are read per message)."""
+        self.config = config
     
     def send_desktop_notification(self, title, message):
         """Send desktop notification."""
@@ -32,19 +37,20 @@ class Notifier:
         except Exception as e:
             logger.error(f"Failed to send desktop notification: {e}")
     
-    def send_email_notification(self, subject, body, listing_url=None):
-        """Send email notification."""
+    def send_email_notification(self, subject, body, listing_url=None, to=None):
+        """Send email notification (to EMAIL_TO unless another recipient is given)."""
         if not self.config.ENABLE_EMAIL_NOTIFICATIONS:
             return
         
-        if not all([self.config.EMAIL_USERNAME, self.config.EMAIL_PASSWORD, self.config.EMAIL_TO]):
+        to = to or self.config.EMAIL_TO
+        if not all([self.config.EMAIL_USERNAME, self.config.EMAIL_PASSWORD, to]):
             logger.warning("Email notifications enabled but credentials not configured")
             return
         
         try:
             msg = MIMEMultipart()
             msg['From'] = self.config.EMAIL_USERNAME
-            msg['To'] = self.config.EMAIL_TO
+            msg['To'] = to
             msg['Subject'] = subject
             
             # Add listing URL to body if provided
@@ -57,20 +63,24 @@ class Notifier:
             server.starttls()
             server.login(self.config.EMAIL_USERNAME, self.config.EMAIL_PASSWORD)
             text = msg.as_string()
-            server.sendmail(self.config.EMAIL_USERNAME, self.config.EMAIL_TO, text)
+            server.sendmail(self.config.EMAIL_USERNAME, to, text)
             server.quit()
             
             logger.info(f"Email notification sent: {subject}")
         except Exception as e:
             logger.error(f"Failed to send email notification: {e}")
     
-    def notify_new_listing(self, listing):
-        """Send notification for a new surfboard listing."""
+    def notify_new_listing(self, listing, profile=None):
+        """Send notification for a new surfboard listing.
+        
+        With a watch profile, its own channels (desktop flag, email recipient) are used.
+        """
         title = f"🏄 New Surfboard Alert!"
         message = f"Found: {listing.get('title', 'Unknown')}\nPrice: {listing.get('price', 'N/A')}\nLocation: {listing.get('location', 'Unknown')}"
         
         # Send desktop notification
-        self.send_desktop_notification(title, message)
+        if profile is None or profile.desktop:
+            self.send_desktop_notification(title, message)
         
         # Send email notification
         email_subject = f"New Surfboard Listing: {listing.get('title', 'Unknown')}"
@@ -85,4 +95,33 @@ Platform: {listing.get('platform', 'Unknown')}
 URL: {listing.get('url', 'No URL available')}
         """
         
-        self.send_email_notification(email_subject, email_body, listing.get('url'))
+        if profile is None:
+            self.send_email_notification(email_subject, email_body, listing.get('url'))
+        elif profile.email_to:
+            self.send_email_notification(email_subject, email_body, listing.get('url'), to=profile.email_to)
+    
+    def notify_price_drop(self, listing, previous_price_cents, profile=None):
+        """Send notification that a previously seen board was reposted at a lower price."""
+        old_price = format_price(previous_price_cents)
+        new_price = listing.get('price', 'N/A')
+        title = f"📉 Surfboard Price Drop!"
+        message = f"{listing.get('title', 'Unknown')}\n{old_price} → {new_price}\nLocation: {listing.get('location', 'Unknown')}"
+        
+        if profile is None or profile.desktop:
+            self.send_desktop_notification(title, message)
+        
+        email_subject = f"Price Drop: {listing.get('title', 'Unknown')} now {new_price}"
+        email_body = f"""
+A surfboard you were alerted about has been reposted at a lower price:
+
+Title: {listing.get('title', 'Unknown')}
+Was: {old_price}
+Now: {new_price}
+Location: {listing.get('location', 'Unknown')}
+URL: {listing.get('url', 'No URL available')}
+        """
+        
+        if profile is None:
+            self.send_email_notification(email_subject, email_body, listing.get('url'))
+        elif profile.email_to:
+            self.send_email_notification(email_subject, email_body, listing.get('url'), to=profile.email_to)
@@ -3,23 +3,253 @@ Craigslist scraping functionality for surfboard monitoring.
 """
 
 import requests
-import time
 import logging
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlencode
 from ..config import Config
+from ..listing import Listing, make_listing_id, parse_price_cents
+from ..filters.batch_filter import BatchFilter
+from ..filters.keywords import KeywordMatcher
+from ..geo import SITE_INDEX, location_point
+from ..core.clock import SystemClock
+from ..core.metrics import metrics
+from ..storage.page_archive import PageArchive
+from .rate_limiter import HostRateLimiter, CircuitBreaker
+from .parse_pool import ParsePool
+
+# Statuses that indicate the region is refusing or throttling us
+UNHEALTHY_STATUSES = (403, 429, 503)
+
+REQUEST_TIMEOUT = 30  # seconds per search request
 
 logger = logging.getLogger(__name__)
 
+# Map location to Craigslist subdomain
+LOCATION_SITES = {
+    'San Francisco': 'sfbay',
+    'Los Angeles': 'losangeles', 
+    'San Diego': 'sandiego',
+    'New York': 'newyork',
+    'Chicago': 'chicago',
+    'Boston': 'boston',
+    'Seattle': 'seattle',
+    'Portland': 'portland',
+    'Miami': 'miami',
+    'Austin': 'austin',
+    'Denver': 'denver',
+    'Phoenix': 'phoenix',
+    'Las Vegas': 'vegas',
+    'Atlanta': 'atlanta',
+    'Dallas': 'dallas',
+    'Houston': 'houston',
+    'Detroit': 'detroit',
+    'Minneapolis': 'minneapolis',
+    'Philadelphia': 'philadelphia',
+    'Washington': 'washingtondc'
+}
+
+
+def craigslist_site(location):
+    """Resolve 'San Diego, CA' (or a bare subdomain like 'sandiego') to a Craigslist subdomain."""
+    city = location.split(',')[0].strip()
+    if city in LOCATION_SITES:
+        return LOCATION_SITES[city]
+    if city and city == city.lower() and ' ' not in city:
+        return city
+    return 'sfbay'  # Default to SF Bay Area
+
+
+def search_regions(location, radius):
+    """Sites to poll: every site whose area may reach within radius miles of location.
+    
+    Radius 0 means the nearest site only; a location without known
+    coordinates falls back to craigslist_site(location).
+    """
+    point = location_point(location)
+    if point is None:
+        return [craigslist_site(location)]
+    sites = [site for _, site in SITE_INDEX.within(point[0], point[1], radius)] if radius else []
+    return sites or [SITE_INDEX.nearest(*point)]
+
+def parse_json_item(item_data, base_url):
+    """Parse a Craigslist JSON-LD item into a Listing."""
+    try:
+        item = item_data.get('item', {})
+        price = item.get('offers', {}).get('price', '')
+        
+        return Listing(
+            id=make_listing_id(item.get('name', ''), price),
+            title=item.get('name', 'No title'),
+            price_cents=parse_price_cents(price),
+            location=json_location(item),
+            url='',  # JSON-LD doesn't include URLs
+            description=item.get('description', ''),
+            image_url=json_image(item),
+            **json_coordinates(item),
+        )
+        
+    except Exception as e:
+        logger.warning(f"Failed to parse JSON item: {e}")
+        return None
+
+
+def json_location(item):
+    """Extract location from JSON item."""
+    try:
+        offers = item.get('offers', {})
+        available_at = offers.get('availableAtOrFrom', {})
+        address = available_at.get('address', {})
+        
+        city = address.get('addressLocality', '')
+        state = address.get('addressRegion', '')
+        
+        if city and state:
+            return f"{city}, {state}"
+        elif city:
+            return city
+        else:
+            return 'Location not available'
+    except:
+        return 'Location not available'
+
+
+def json_coordinates(item):
+    """{'latitude', 'longitude'} from availableAtOrFrom.geo, or {} when absent or malformed."""
+    try:
+        geo = item.get('offers', {}).get('availableAtOrFrom', {}).get('geo') or {}
+        latitude, longitude = float(geo['latitude']), float(geo['longitude'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return {}
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return {}
+    return {'latitude': latitude, 'longitude': longitude}
+
+
+def json_image(item):
+    """Extract image URL from JSON item."""
+    try:
+        images = item.get('image', [])
+        if images and len(images) > 0:
+            return images[0]  # Return first image
+        return ''
+    except:
+        return ''
+
+
+def parse_listing_element(element, base_url):
+    """Parse a Craigslist listing element into a Listing."""
+    try:
+        # Extract title and URL
+        title_link = element.find('a', class_='cl-app-anchor')
+        if title_link:
+            title = title_link.get_text(strip=True)
+            url = urljoin(base_url, title_link.get('href', ''))
+        else:
+            title = 'No title'
+            url = ''
+        
+        # Extract price
+        price_elem = element.find('span', class_='priceinfo')
+        price_cents = parse_price_cents(price_elem.get_text(strip=True)) if price_elem else None
+        
+        # Extract location
+        location_elem = element.find('span', class_='meta')
+        if location_elem:
+            location = location_elem.get_text(strip=True)
+        else:
+            location = 'Location not available'
+        
+        # Extract image URL
+        img_elem = element.find('img')
+        image_url = img_elem.get('src', '') if img_elem else ''
+        
+        return Listing(
+            # Create unique ID for tracking
+            id=make_listing_id(title, url),
+            title=title,
+            price_cents=price_cents,
+            location=location,
+            url=url,
+            # Description from title for now, full description would require visiting each listing
+            description=title,
+            image_url=image_url,
+        )
+        
+    except Exception as e:
+        logger.warning(f"Failed to parse Craigslist listing element: {e}")
+        return None
+
+
+def parse_search_results(content, base_url, max_results, parse_item=parse_json_item, parse_element=parse_listing_element):
+    """Parse a search results page (JSON-LD, falling back to HTML) into listings.
+    
+    Depends only on its arguments, so it can run in a parse worker process.
+    """
+    listings = []
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Craigslist uses JSON-LD structured data, not traditional HTML elements
+    # Look for the JSON-LD script tag with search results
+    json_script = soup.find('script', {'id': 'ld_searchpage_results'})
+    
+    if json_script:
+        try:
+            json_data = json.loads(json_script.string)
+            items = json_data.get('itemListElement', [])
+            logger.info(f"Found {len(items)} listings in JSON-LD data")
+            
+            # Convert JSON items to our format
+            for item_data in items[:max_results]:
+                try:
+                    listing = parse_item(item_data, base_url)
+                    if listing:
+                        listings.append(listing)
+                except Exception as e:
+                    logger.warning(f"Failed to parse JSON item: {e}")
+                    continue
+            
+            return listings
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON-LD data: {e}")
+    else:
+        logger.warning("No JSON-LD data found in response")
+    
+    # Fallback to traditional HTML parsing if JSON-LD fails
+    listing_elements = soup.find_all('li', class_='cl-search-result')
+    if not listing_elements:
+        listing_elements = soup.find_all('li', class_='result-row')
+    if not listing_elements:
+        listing_elements = soup.find_all('div', class_='result-info')
+    
+    logger.info(f"Found {len(listing_elements)} HTML listing elements")
+    
+    for element in listing_elements[:max_results]:
+        try:
+            listing = parse_element(element, base_url)
+            if listing:
+                listings.append(listing)
+        except Exception as e:
+            logger.warning(f"Failed to parse Craigslist listing: {e}")
+            continue
+    
+    return listings
+
+
 class CraigslistScraper:
     """Scraper for Craigslist surfboard listings."""
     
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None, clock=None):
+        self.config = config or Config()
+        self.clock = clock or SystemClock()
         self.seen_listings = set()  # Track seen listings to avoid duplicates
+        self._seen_lock = threading.Lock()  # live polling and the backfill thread both claim listings
+        self.last_scraped = []  # Everything the last get_new_listings fetched, before filtering
+        self.deferred_queries = []  # Queries the last get_new_listings ran out of time for; they go first next time
         self.last_check_file = 'last_check_timestamp.json'
         self.session = requests.Session()
         self.session.headers.update({
@@ -29,6 +259,38 @@ class CraigslistScraper:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         })
+        self.metrics = metrics
+        self.listing_filter = BatchFilter.from_config(self.config, clock=self.clock.time)
+        self.description_matcher = KeywordMatcher({'description': [self.config.DESCRIPTION_KEYWORD]})
+        self.rate_limiter = HostRateLimiter(
+            self.config.CRAIGSLIST_REQUESTS_PER_MINUTE,
+            self.config.CRAIGSLIST_BURST,
+            clock=self.clock.monotonic,
+            sleep=self.clock.sleep
+        )
+        self.circuit_breaker = CircuitBreaker(
+            self.config.CIRCUIT_BREAKER_THRESHOLD,
+            self.config.CIRCUIT_BREAKER_COOLDOWN,
+            clock=self.clock.monotonic
+        )
+        self.parse_pool = None
+        if self.config.PARSE_WORKERS > 0:
+            self.parse_pool = ParsePool(parse_search_results, self.config.PARSE_WORKERS, kind=self.config.PARSE_POOL_KIND)
+        self.archive = None
+        if self.config.PAGE_ARCHIVE_DIR:
+            self.archive = PageArchive(self.config.PAGE_ARCHIVE_DIR, self.config.PAGE_ARCHIVE_CODEC,
+                                       self.config.PAGE_ARCHIVE_RETENTION_DAYS, clock=self.clock.time)
+    
+    def apply_config(self, config):
+        """Switch to a new config snapshot, keeping the session, seen listings and pools."""
+        listing_filter = BatchFilter.from_config(config, clock=self.clock.time)
+        description_matcher = KeywordMatcher({'description': [config.DESCRIPTION_KEYWORD]})
+        self.rate_limiter.configure(config.CRAIGSLIST_REQUESTS_PER_MINUTE, config.CRAIGSLIST_BURST)
+        self.circuit_breaker.failure_threshold = config.CIRCUIT_BREAKER_THRESHOLD
+        self.circuit_breaker.cooldown = config.CIRCUIT_BREAKER_COOLDOWN
+        if self.archive is not None:
+            self.archive.retention_days = config.PAGE_ARCHIVE_RETENTION_DAYS
+        self.listing_filter, self.description_matcher, self.config = listing_filter, description_matcher, config
     
     def _get_last_check_time(self):
         """Get the timestamp of the last check, or 2 weeks ago if first run."""
@@ -43,71 +305,47 @@ class CraigslistScraper:
                 logger.warning(f"Error reading last check time: {e}")
         
         # First run: check last 2 weeks
-        two_weeks_ago = datetime.now() - timedelta(weeks=2)
+        two_weeks_ago = self.clock.now() - timedelta(weeks=2)
         logger.info(f"First run: checking listings from 2 weeks ago: {two_weeks_ago}")
         return two_weeks_ago
     
+    def is_first_run(self):
+        """True until a check time has been saved."""
+        return not os.path.exists(self.last_check_file)
+    
     def _save_check_time(self):
         """Save the current check time."""
         try:
+            now = self.clock.now()
             with open(self.last_check_file, 'w') as f:
-                json.dump({'last_check': datetime.now().isoformat()}, f)
-            logger.info(f"Saved check time: {datetime.now()}")
+                json.dump({'last_check': now.isoformat()}, f)
+            logger.info(f"Saved check time: {now}")
         except Exception as e:
             logger.error(f"Error saving check time: {e}")
     
-    def _filter_listings_by_time(self, listings, cutoff_time):
-        """Filter listings to only include those newer than cutoff_time."""
-        filtered_listings = []
+    def fetch_search_page(self, search_term, location="sfbay", price_range=None, offset=0, rate_limiter=None,
+                          timeout=REQUEST_TIMEOUT, breaker_key=None, deadline=None):
+        """Fetch one search results page; return (content, base_url), or None if unavailable.
         
-        for listing in listings:
-            try:
-                # Parse the date from the listing
-                date_str = listing.get('date', '')
-                if not date_str:
-                    continue
-                
-                # Handle different date formats from Craigslist
-                listing_date = None
-                try:
-                    # Try parsing common Craigslist date formats
-                    if 'T' in date_str:
-                        # ISO format: 2024-01-15T10:30:00-08:00
-                        listing_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    else:
-                        # Try other formats
-                        for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M']:
-                            try:
-                                listing_date = datetime.strptime(date_str, fmt)
-                                break
-                            except ValueError:
-                                continue
-                    
-                    if listing_date and listing_date > cutoff_time:
-                        filtered_listings.append(listing)
-                        logger.debug(f"✅ Listing within time range: {listing.get('title', 'Unknown')} - {listing_date}")
-                    else:
-                        logger.debug(f"❌ Listing too old: {listing.get('title', 'Unknown')} - {listing_date}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error parsing date for listing {listing.get('title', 'Unknown')}: {e}")
-                    # If we can't parse the date, include it to be safe
-                    filtered_listings.append(listing)
-            except Exception as e:
-                logger.warning(f"Error processing listing {listing.get('title', 'Unknown')}: {e}")
-                # If we can't process the listing, include it to be safe
-                filtered_listings.append(listing)
-        
-        logger.info(f"Time filtering: {len(listings)} -> {len(filtered_listings)} listings")
-        return filtered_listings
-    
-    def search_craigslist(self, search_term, location="sfbay"):
-        """Search Craigslist for listings."""
-        listings = []
+        price_range overrides the configured (MIN_PRICE, MAX_PRICE) server-side filter.
+        offset skips that many results (older pages); rate_limiter replaces the
+        live polling limiter, e.g. for the backfill job's separate budget.
+        breaker_key replaces location as the circuit breaker key, so the
+        backfill job's failures don't open the circuit for live polling.
+        When the rate limiter's wait would outlast deadline, the query is added
+        to deferred_queries instead of waiting.
+        """
+        rate_limiter = rate_limiter or self.rate_limiter
+        breaker_key = breaker_key or location
+        if not self.circuit_breaker.allow(breaker_key):
+            logger.warning(f"Circuit open for {location} - skipping search for '{search_term}'")
+            self.metrics.increment('craigslist.circuit_skips')
+            return None
         
+        host = f"{location}.craigslist.org"
         try:
             # Craigslist search URL
-            base_url = f"https://{location}.craigslist.org"
+            base_url = f"https://{host}"
             search_url = f"{base_url}/search/sss"
             
             params = {
@@ -117,240 +355,234 @@ class CraigslistScraper:
             }
             
             # Add price filter if configured
-            if self.config.MIN_PRICE > 0:
-                params['min_price'] = str(self.config.MIN_PRICE)
-            if self.config.MAX_PRICE > 0:
-                params['max_price'] = str(self.config.MAX_PRICE)
+            min_price, max_price = price_range or (self.config.MIN_PRICE, self.config.MAX_PRICE)
+            if min_price > 0:
+                params['min_price'] = str(min_price)
+            if max_price > 0:
+                params['max_price'] = str(max_price)
+            if offset:
+                params['s'] = str(offset)
             
             full_url = f"{search_url}?{urlencode(params)}"
             logger.info(f"Searching Craigslist: {full_url}")
             
-            response = self.session.get(full_url, timeout=30)
-            response.raise_for_status()
+            if rate_limiter.acquire(host, deadline=deadline) is None:
+                logger.warning(f"Rate limit for {host} outlasts the scrape budget - deferring '{search_term}'")
+                self.deferred_queries.append((location, search_term))
+                self.metrics.increment('craigslist.deferred_queries')
+                return None
+            response = self.session.get(full_url, timeout=timeout)
+            self.metrics.increment('craigslist.requests')
+            rate_limiter.record_response(host, response.status_code, response.headers.get('Retry-After'))
+            
+            if response.status_code in UNHEALTHY_STATUSES:
+                logger.warning(f"Craigslist {location} returned {response.status_code} for '{search_term}'")
+                self.metrics.increment('craigslist.throttled')
+                self.circuit_breaker.record_failure(breaker_key)
+                return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response.raise_for_status()
+            self.circuit_breaker.record_success(breaker_key)
             
             # Debug: Check what we actually got
             logger.info(f"Response status: {response.status_code}")
             logger.info(f"Response content length: {len(response.content)}")
-            
-            # Craigslist uses JSON-LD structured data, not traditional HTML elements
-            # Look for the JSON-LD script tag with search results
-            json_script = soup.find('script', {'id': 'ld_searchpage_results'})
-            
-            if json_script:
-                import json
-                try:
-                    json_data = json.loads(json_script.string)
-                    items = json_data.get('itemListElement', [])
-                    logger.info(f"Found {len(items)} listings in JSON-LD data")
-                    
-                    # Convert JSON items to our format
-                    for item_data in items[:self.config.MAX_RESULTS]:
-                        try:
-                            listing = self._parse_craigslist_json_item(item_data, base_url)
-                            if listing:  # Remove mov filter for testing
-                                listing['platform'] = 'Craigslist'
-                                listings.append(listing)
-                        except Exception as e:
-                            logger.warning(f"Failed to parse JSON item: {e}")
-                            continue
-                    
-                    return listings
-                    
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON-LD data: {e}")
-            else:
-                logger.warning("No JSON-LD data found in response")
-            
-            # Fallback to traditional HTML parsing if JSON-LD fails
-            listing_elements = soup.find_all('li', class_='cl-search-result')
-            if not listing_elements:
-                listing_elements = soup.find_all('li', class_='result-row')
-            if not listing_elements:
-                listing_elements = soup.find_all('div', class_='result-info')
-            
-            logger.info(f"Found {len(listing_elements)} HTML listing elements")
-            
-            for element in listing_elements[:self.config.MAX_RESULTS]:
-                try:
-                    listing = self._parse_craigslist_listing(element, base_url)
-                    if listing:  # Remove mov filter for testing
-                        listing['platform'] = 'Craigslist'
-                        listings.append(listing)
-                except Exception as e:
-                    logger.warning(f"Failed to parse Craigslist listing: {e}")
-                    continue
+            if self.archive is not None:
+                self._archive_page(location, search_term, full_url, base_url, response.content)
+            return response.content, base_url
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error searching Craigslist: {e}")
+            self.metrics.increment('craigslist.request_errors')
+            self.circuit_breaker.record_failure(breaker_key)
         except Exception as e:
             logger.error(f"Unexpected error searching Craigslist: {e}")
+        finally:
+            self._publish_politeness_metrics()
+        return None
+    
+    def _archive_page(self, location, search_term, url, base_url, content):
+        """Keep the raw page for replay; archive trouble never fails the search."""
+        try:
+            self.archive.store(location, search_term, content, url=url, base_url=base_url)
+        except Exception as e:
+            logger.warning(f"Could not archive Craigslist page for '{search_term}' in {location}: {e}")
+            self.metrics.increment('archive.errors')
+    
+    def replay_archive(self, archive, region=None, term=None, since=None, until=None):
+        """Parse archived pages; yields (region, term, fetched_at, listings) without touching the network."""
+        for page_region, page_term, fetched_at, base_url, content in archive.replay(region, term, since, until):
+            yield page_region, page_term, fetched_at, self._tag_listings(self.parse_search_results(content, base_url), page_region)
+    
+    def search_craigslist(self, search_term, location="sfbay", price_range=None, timeout=REQUEST_TIMEOUT, deadline=None):
+        """Search Craigslist for listings.
         
+        price_range overrides the configured (MIN_PRICE, MAX_PRICE) server-side filter.
+        """
+        page = self.fetch_search_page(search_term, location, price_range, timeout=timeout, deadline=deadline)
+        if page is None:
+            return []
+        try:
+            return self._tag_listings(self.parse_search_results(*page), location)
+        except Exception as e:
+            logger.error(f"Unexpected error searching Craigslist: {e}")
+            return []
+    
+    def parse_search_results(self, content, base_url):
+        """Parse a search results page in this process."""
+        return parse_search_results(content, base_url, self.config.MAX_RESULTS,
+                                    self._parse_craigslist_json_item, self._parse_craigslist_listing)
+    
+    def _tag_listings(self, listings, location):
+        for listing in listings:
+            listing['platform'] = 'Craigslist'
+            listing['region'] = location
         return listings
     
+    def _publish_politeness_metrics(self):
+        """Expose rate limiter and circuit breaker state through the metrics registry."""
+        self.metrics.set_gauge('craigslist.rate_limiter', self.rate_limiter.state())
+        self.metrics.set_gauge('craigslist.circuit_breaker', self.circuit_breaker.state())
+    
     def _parse_craigslist_json_item(self, item_data, base_url):
         """Parse a Craigslist JSON-LD item into our standard format."""
-        try:
-            item = item_data.get('item', {})
-            
-            listing = {
-                'id': f"cl_{hash(item.get('name', '') + str(item.get('offers', {}).get('price', '')))}",
-                'title': item.get('name', 'No title'),
-                'price': f"${item.get('offers', {}).get('price', 'N/A')}",
-                'location': self._get_json_location(item),
-                'url': '',  # JSON-LD doesn't include URLs
-                'description': item.get('description', ''),
-                'image_url': self._get_json_image(item),
-                'condition': 'Unknown',
-                'seller': 'Unknown',
-                'listing_type': 'Unknown'
-            }
-            
-            return listing
-            
-        except Exception as e:
-            logger.warning(f"Failed to parse JSON item: {e}")
-            return None
+        return parse_json_item(item_data, base_url)
     
     def _get_json_location(self, item):
         """Extract location from JSON item."""
-        try:
-            offers = item.get('offers', {})
-            available_at = offers.get('availableAtOrFrom', {})
-            address = available_at.get('address', {})
-            
-            city = address.get('addressLocality', '')
-            state = address.get('addressRegion', '')
-            
-            if city and state:
-                return f"{city}, {state}"
-            elif city:
-                return city
-            else:
-                return 'Location not available'
-        except:
-            return 'Location not available'
+        return json_location(item)
     
     def _get_json_image(self, item):
         """Extract image URL from JSON item."""
-        try:
-            images = item.get('image', [])
-            if images and len(images) > 0:
-                return images[0]  # Return first image
-            return ''
-        except:
-            return ''
+        return json_image(item)
     
     def _parse_craigslist_listing(self, element, base_url):
         """Parse a Craigslist listing element."""
-        listing = {}
-        
-        try:
-            # Extract title and URL
-            title_link = element.find('a', class_='cl-app-anchor')
-            if title_link:
-                listing['title'] = title_link.get_text(strip=True)
-                listing['url'] = urljoin(base_url, title_link.get('href', ''))
-            else:
-                listing['title'] = 'No title'
-                listing['url'] = ''
-            
-            # Extract price
-            price_elem = element.find('span', class_='priceinfo')
-            if price_elem:
-                listing['price'] = price_elem.get_text(strip=True)
-            else:
-                listing['price'] = 'Price not available'
-            
-            # Extract location
-            location_elem = element.find('span', class_='meta')
-            if location_elem:
-                listing['location'] = location_elem.get_text(strip=True)
-            else:
-                listing['location'] = 'Location not available'
-            
-            # Extract description (from title for now, full description would require visiting each listing)
-            listing['description'] = listing.get('title', '')
-            
-            # Extract image URL
-            img_elem = element.find('img')
-            if img_elem:
-                listing['image_url'] = img_elem.get('src', '')
-            else:
-                listing['image_url'] = ''
-            
-            # Create unique ID for tracking
-            listing['id'] = f"cl_{hash(listing.get('title', '') + listing.get('url', ''))}"
-            
-        except Exception as e:
-            logger.warning(f"Failed to parse Craigslist listing element: {e}")
-            return None
-        
-        return listing
+        return parse_listing_element(element, base_url)
     
     def _contains_mov_keyword(self, listing):
-        """Check if listing contains 'mov' keyword in title or description."""
-        text_to_check = f"{listing.get('title', '')} {listing.get('description', '')}".lower()
-        return 'mov' in text_to_check
+        """Check if listing contains the description keyword ('mov') in title or description."""
+        text_to_check = f"{listing.get('title', '')} {listing.get('description', '')}"
+        return self.description_matcher.matches(text_to_check, 'description')
+    
+    def default_queries(self):
+        """(region, search term) pairs for every site within RADIUS of the configured location."""
+        regions = search_regions(self.config.LOCATION, self.config.RADIUS)
+        return [(region, search_term) for region in regions for search_term in self.config.SEARCH_TERMS]
     
-    def get_new_listings(self):
-        """Get new listings from Craigslist for all search terms."""
+    def _until_deadline(self, queries, deadline):
+        """Yield (query, request timeout) until deadline runs out; the rest are deferred to the next call."""
+        for position, query in enumerate(queries):
+            if deadline is None:
+                yield query, REQUEST_TIMEOUT
+                continue
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                self.deferred_queries.extend(queries[position:])
+                logger.warning(f"Scrape budget exhausted - deferring {len(queries) - position} queries to the next cycle")
+                self.metrics.increment('craigslist.deferred_queries', len(queries) - position)
+                return
+            # A slow response may not eat into the next stage by more than a second
+            yield query, max(1.0, min(REQUEST_TIMEOUT, remaining))
+    
+    def _search_with_parse_pool(self, queries, price_range, deadline=None, on_page=None):
+        """Fetch pages in order while earlier pages parse in the worker pool."""
+        pending = []
+        for (region, search_term), timeout in self._until_deadline(queries, deadline):
+            logger.info(f"Searching Craigslist {region} for: {search_term}")
+            page = self.fetch_search_page(search_term, region, price_range=price_range, timeout=timeout,
+                                          deadline=deadline)
+            if page is not None:
+                pending.append((region, self.parse_pool.submit(page[0], page[1], self.config.MAX_RESULTS)))
+        
+        all_listings = []
+        for region, future in pending:
+            try:
+                listings = self._tag_listings(future.result(), region)
+            except Exception as e:
+                logger.error(f"Failed to parse Craigslist {region} results: {e}")
+                continue
+            all_listings.extend(listings)
+            if on_page is not None:
+                on_page(listings)
+        return all_listings
+    
+    def claim_unseen(self, ids):
+        """Mark ids as seen; return the ones nobody had seen before (each id is claimed once, across threads)."""
+        with self._seen_lock:
+            claimed = {listing_id for listing_id in ids if listing_id and listing_id not in self.seen_listings}
+            self.seen_listings.update(claimed)
+        return claimed
+    
+    def _unseen(self, listings):
+        """Listings not returned before, now marked as seen."""
+        claimed = self.claim_unseen(listing.get('id') for listing in listings)
+        new_listings = []
+        for listing in listings:
+            if listing.get('id') in claimed:
+                claimed.discard(listing.get('id'))  # a repeated id within the batch is kept once
+                new_listings.append(listing)
+        return new_listings
+    
+    def get_new_listings(self, queries=None, price_range=None, within_radius=None, deadline=None, on_new=None):
+        """Get new listings from Craigslist for every (region, search term) query.
+        
+        Defaults to the configured location and SEARCH_TERMS; price_range widens or
+        narrows both the server-side and local price filters. Listings with
+        coordinates farther than RADIUS from LOCATION are dropped when
+        within_radius is set (by default, only for the default queries).
+        Queries still waiting when deadline (see CycleDeadline) runs out, or whose
+        host's rate limit would keep them waiting past it, are skipped and
+        searched first on the next call. on_new, if given, is called
+        with each query's new listings as soon as that query is done, so work on
+        them can start while later queries are still being fetched.
+        """
+        if within_radius is None:
+            within_radius = not queries
         # Get the cutoff time for filtering
         cutoff_time = self._get_last_check_time()
         
-        all_listings = []
+        queries = queries or self.default_queries()
+        deferred, self.deferred_queries = set(self.deferred_queries), []
+        if deferred:
+            queries = sorted(queries, key=lambda query: query not in deferred)
         
-        # Map location to Craigslist subdomain
-        location_map = {
-            'San Francisco': 'sfbay',
-            'Los Angeles': 'losangeles', 
-            'San Diego': 'sandiego',
-            'New York': 'newyork',
-            'Chicago': 'chicago',
-            'Boston': 'boston',
-            'Seattle': 'seattle',
-            'Portland': 'portland',
-            'Miami': 'miami',
-            'Austin': 'austin',
-            'Denver': 'denver',
-            'Phoenix': 'phoenix',
-            'Las Vegas': 'vegas',
-            'Atlanta': 'atlanta',
-            'Dallas': 'dallas',
-            'Houston': 'houston',
-            'Detroit': 'detroit',
-            'Minneapolis': 'minneapolis',
-            'Philadelphia': 'philadelphia',
-            'Washington': 'washingtondc'
-        }
+        new_listings = []
         
-        # Extract city from location
-        location_city = self.config.LOCATION.split(',')[0].strip()
-        craigslist_location = location_map.get(location_city, 'sfbay')  # Default to SF Bay Area
+        def take_new(listings):
+            fresh = self._unseen(self.listing_filter.apply(listings, posted_after=cutoff_time, price_range=price_range,
+                                                           within_radius=within_radius))
+            new_listings.extend(fresh)
+            if fresh:
+                on_new(fresh)
         
-        for search_term in self.config.SEARCH_TERMS:
-            logger.info(f"Searching Craigslist for: {search_term}")
-            
-            listings = self.search_craigslist(search_term, craigslist_location)
-            all_listings.extend(listings)
-            
-            # Add delay between searches to be respectful
-            time.sleep(2)
+        # With on_new, filter each query's page as it arrives instead of in one pass at the end
+        on_page = take_new if on_new is not None else None
+        if self.parse_pool is not None:
+            all_listings = self._search_with_parse_pool(queries, price_range, deadline, on_page)
+        else:
+            all_listings = []
+            for (region, search_term), timeout in self._until_deadline(queries, deadline):
+                logger.info(f"Searching Craigslist {region} for: {search_term}")
+                
+                # Pacing between searches is handled by the per-host rate limiter
+                listings = self.search_craigslist(search_term, region, price_range=price_range, timeout=timeout,
+                                                  deadline=deadline)
+                all_listings.extend(listings)
+                if on_page is not None:
+                    on_page(listings)
         
-        # Filter listings by time (only get listings newer than last check)
-        time_filtered_listings = self._filter_listings_by_time(all_listings, cutoff_time)
+        self.last_scraped = all_listings
         
-        # Filter out seen listings
-        new_listings = []
-        for listing in time_filtered_listings:
-            listing_id = listing.get('id')
-            if listing_id and listing_id not in self.seen_listings:
-                self.seen_listings.add(listing_id)
-                new_listings.append(listing)
+        if on_page is None:
+            # Single pre-filter pass: time since last check, price, keywords and length
+            new_listings = self._unseen(self.listing_filter.apply(all_listings, posted_after=cutoff_time,
+                                                                  price_range=price_range, within_radius=within_radius))
         
-        # Save the current check time
-        self._save_check_time()
+        # Save the current check time; after a cut-short scrape, keep the old one so the
+        # deferred queries still see everything posted since
+        if not self.deferred_queries:
+            self._save_check_time()
         
         logger.info(f"Found {len(new_listings)} new listings since last check")
         return new_listings
@@ -0,0 +1,87 @@
+"""
+Parse search pages in worker processes so HTML parsing is not serialised on the GIL.
+"""
+
+import concurrent.futures
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+logger = logging.getLogger(__name__)
+
+# Bodies at least this large go through shared memory instead of the call pipe
+SHARED_MEMORY_THRESHOLD = 256 * 1024
+
+
+def _parse_bytes(parse, content, base_url, max_results):
+    return parse(content, base_url, max_results)
+
+
+def _parse_shared(parse, name, size, base_url, max_results):
+    try:
+        segment = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 registers attached segments with the resource tracker
+        segment = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    try:
+        content = bytes(segment.buf[:size])
+    finally:
+        segment.close()
+    return parse(content, base_url, max_results)
+
+
+class ParsePool:
+    """Run a module-level parse(content, base_url, max_results) function on a pool of workers.
+
+    Workers return Listings, which pickle as compact positional tuples. Large
+    bodies are written once into a shared memory segment that the worker reads
+    directly; the parent unlinks it when the parse finishes. kind='interpreter'
+    uses a subinterpreter pool where the running Python provides one.
+    """
+
+    def __init__(self, parse, workers, kind='process', shared_memory_threshold=SHARED_MEMORY_THRESHOLD):
+        self.parse_function = parse
+        self.workers = workers
+        self.kind = kind
+        self.shared_memory_threshold = shared_memory_threshold
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor
+            if self.kind == 'interpreter':
+                executor_class = getattr(concurrent.futures, 'InterpreterPoolExecutor', None)
+                if executor_class is None:
+                    logger.warning("Subinterpreter pools need Python 3.14+ - using processes")
+                    executor_class = ProcessPoolExecutor
+                    self.kind = 'process'
+            self._executor = executor_class(max_workers=self.workers)
+            logger.info(f"Started {self.workers} {self.kind} parse workers")
+        return self._executor
+
+    def submit(self, content, base_url, max_results):
+        """Start parsing one page; return a Future of its listings."""
+        pool = self._pool()
+        # Shared memory only saves a copy across process boundaries
+        if self.kind == 'process' and len(content) >= self.shared_memory_threshold:
+            segment = shared_memory.SharedMemory(create=True, size=len(content))
+            segment.buf[:len(content)] = content
+            future = pool.submit(_parse_shared, self.parse_function, segment.name, len(content), base_url, max_results)
+            future.add_done_callback(lambda _, segment=segment: _release(segment))
+            return future
+        return pool.submit(_parse_bytes, self.parse_function, content, base_url, max_results)
+
+    def parse(self, content, base_url, max_results):
+        return self.submit(content, base_url, max_results).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _release(segment):
+    segment.close()
+    segment.unlink()
+
@@ -0,0 +1,260 @@
+"""
+Adaptive per-host rate limiting and per-region circuit breaking for Craigslist.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down" rather than "this request failed"
+THROTTLE_STATUSES = (429, 503)
+
+# Longest a host is ever blocked for, whatever its Retry-After says
+MAX_BACKOFF_SECONDS = 300.0
+
+
+def parse_retry_after(value, now=None):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to throttling (AIMD)."""
+
+    def __init__(self, rate, capacity, min_rate=None, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"TokenBucket rate must be positive, got {rate}")
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate if min_rate is not None else rate / 16.0)
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return how many seconds the caller must wait."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.tokens -= 1.0
+            wait = 0.0
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    def refund(self):
+        """Give back a reserved token whose request was not sent."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1.0)
+
+    def throttled(self, retry_after=None):
+        """Halve the rate and block until Retry-After (or an exponential backoff), at most MAX_BACKOFF_SECONDS."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.consecutive_throttles += 1
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after is None:
+                retry_after = (2 ** self.consecutive_throttles) / self.rate
+            retry_after = min(MAX_BACKOFF_SECONDS, retry_after)
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            return retry_after
+
+    def succeeded(self):
+        """Additively recover the rate after a successful request."""
+        with self._lock:
+            self.consecutive_throttles = 0
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10.0)
+
+    def state(self):
+        """Return a JSON-friendly view of the bucket."""
+        with self._lock:
+            now = self.clock()
+            return {
+                'rate_per_minute': round(self.rate * 60, 2),
+                'tokens': round(min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate), 2),
+                'blocked_for': round(max(0.0, self.blocked_until - now), 2),
+                'consecutive_throttles': self.consecutive_throttles,
+            }
+
+
+class HostRateLimiter:
+    """One adaptive token bucket per host."""
+
+    def __init__(self, requests_per_minute, burst, clock=time.monotonic, sleep=time.sleep):
+        if requests_per_minute <= 0:
+            raise ValueError(f"HostRateLimiter needs a positive requests_per_minute, got {requests_per_minute}")
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def configure(self, requests_per_minute, burst):
+        """Change the limits in place; hosts keep their current backoff state."""
+        if requests_per_minute <= 0:
+            raise ValueError(f"HostRateLimiter needs a positive requests_per_minute, got {requests_per_minute}")
+        with self._lock:
+            self.rate = requests_per_minute / 60.0
+            self.burst = burst
+            for bucket in self.buckets.values():
+                with bucket._lock:
+                    bucket.max_rate = self.rate
+                    bucket.min_rate = self.rate / 16.0
+                    bucket.rate = min(bucket.rate, self.rate)
+                    bucket.capacity = float(burst)
+                    bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    def _bucket(self, host):
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst, clock=self.clock)
+            return bucket
+
+    def acquire(self, host, deadline=None):
+        """Block until a request to host is allowed; return the time waited.
+
+        Returns None, without waiting or using a token, when the wait would
+        outlast deadline (anything with remaining()).
+        """
+        bucket = self._bucket(host)
+        wait = bucket.reserve()
+        if deadline is not None and wait > deadline.remaining():
+            bucket.refund()
+            return None
+        if wait > 0:
+            logger.debug(f"Rate limiter: waiting {wait:.2f}s before requesting {host}")
+            self.sleep(wait)
+        return wait
+
+    def record_response(self, host, status_code, retry_after=None):
+        """Adapt the host's rate to a response status."""
+        bucket = self._bucket(host)
+        if status_code in THROTTLE_STATUSES:
+            delay = bucket.throttled(parse_retry_after(retry_after))
+            logger.warning(f"{host} returned {status_code} - backing off for {delay:.0f}s")
+            return delay
+        if status_code is not None and status_code < 400:
+            bucket.succeeded()
+        return 0.0
+
+    def state(self):
+        """Return per-host limiter state."""
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {host: bucket.state() for host, bucket in buckets.items()}
+
+
+class CircuitBreaker:
+    """Per-key circuit breaker: closed -> open after N failures -> half-open after cooldown."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, cooldown, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.circuits = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, key):
+        circuit = self.circuits.get(key)
+        if circuit is None:
+            circuit = self.circuits[key] = {'state': self.CLOSED, 'failures': 0, 'opened_at': None,
+                                            'trial_started': None}
+        return circuit
+
+    def allow(self, key):
+        """Return True if a request for key may be attempted now.
+
+        A half-open circuit lets one trial request through; other callers are
+        refused until it is recorded (or, if it never is, for another cooldown).
+        """
+        with self._lock:
+            circuit = self._circuit(key)
+            now = self.clock()
+            if circuit['state'] == self.OPEN:
+                if now - circuit['opened_at'] < self.cooldown:
+                    return False
+                # Cool-down elapsed: let a single trial request through
+                circuit['state'] = self.HALF_OPEN
+                circuit['trial_started'] = now
+                logger.info(f"Circuit for {key} half-open - sending trial request")
+                return True
+            if circuit['state'] == self.HALF_OPEN:
+                if now - circuit['trial_started'] < self.cooldown:
+                    return False
+                circuit['trial_started'] = now  # the last trial was never recorded
+                return True
+            return True
+
+    def record_success(self, key):
+        """Close the circuit for key."""
+        with self._lock:
+            circuit = self._circuit(key)
+            if circuit['state'] != self.CLOSED:
+                logger.info(f"Circuit for {key} closed again")
+            circuit.update(state=self.CLOSED, failures=0, opened_at=None, trial_started=None)
+
+    def record_failure(self, key):
+        """Count a failure for key, opening the circuit once the threshold is hit."""
+        with self._lock:
+            circuit = self._circuit(key)
+            circuit['failures'] += 1
+            if circuit['state'] == self.HALF_OPEN or circuit['failures'] >= self.failure_threshold:
+                if circuit['state'] != self.OPEN:
+                    logger.warning(f"Circuit for {key} opened after {circuit['failures']} failures - "
+                                   f"pausing for {self.cooldown}s")
+                circuit['state'] = self.OPEN
+                circuit['opened_at'] = self.clock()
+                circuit['trial_started'] = None
+
+    def state(self):
+        """Return per-key circuit state."""
+        with self._lock:
+            now = self.clock()
+            result = {}
+            for key, circuit in self.circuits.items():
+                retry_in = 0.0
+                if circuit['state'] == self.OPEN:
+                    retry_in = max(0.0, self.cooldown - (now - circuit['opened_at']))
+                result[key] = {
+                    'state': circuit['state'],
+                    'failures': circuit['failures'],
+                    'retry_in': round(retry_in, 2),
+                }
+            return result
@@ -0,0 +1 @@
+# Persistent listing storage
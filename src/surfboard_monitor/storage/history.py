@@ -0,0 +1,252 @@
+"""
+Embedded, append-only listing history backed by SQLite in WAL mode.
+"""
+
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cycles (
+    cycle_id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    scrape_ms REAL,
+    classify_ms REAL,
+    notify_ms REAL,
+    scraped INTEGER,
+    classified INTEGER,
+    notified INTEGER
+);
+CREATE TABLE IF NOT EXISTS observations (
+    listing_id TEXT NOT NULL,
+    observed_at INTEGER NOT NULL,
+    cycle_id INTEGER,
+    region TEXT,
+    title TEXT,
+    title_key TEXT,
+    description TEXT,
+    location TEXT,
+    url TEXT,
+    image_url TEXT,
+    price_cents INTEGER,
+    posted_at INTEGER,
+    classification TEXT,
+    simhash INTEGER,
+    image_hash INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_observations_listing ON observations (listing_id, observed_at);
+CREATE INDEX IF NOT EXISTS idx_observations_title_key ON observations (title_key, observed_at);
+CREATE INDEX IF NOT EXISTS idx_observations_observed ON observations (observed_at);
+"""
+
+_OBSERVATION_COLUMNS = ('listing_id', 'observed_at', 'cycle_id', 'region', 'title', 'title_key', 'description',
+                        'location', 'url', 'image_url', 'price_cents', 'posted_at', 'classification', 'simhash', 'image_hash')
+# Columns added after the first release of the schema, for in-place migration
+_ADDED_COLUMNS = {'simhash': 'INTEGER', 'image_hash': 'INTEGER'}
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def title_key(title):
+    """Normalise a title so trivial punctuation/case edits collapse to one key."""
+    return _NON_WORD_RE.sub(' ', (title or '').lower()).strip()
+
+
+def observation_row(listing, observed_at, cycle_id=None, classification=None, simhash=None, image_hash=None):
+    """Flatten a listing (Listing or legacy dict) into an observations row.
+
+    simhash and image_hash are the listing's text and thumbnail fingerprints,
+    already in SQLite's signed 64-bit range.
+    """
+    title = listing.get('title', '')
+    return (
+        listing.get('id'), int(observed_at), cycle_id, listing.get('region', ''), title, title_key(title),
+        listing.get('description', ''), listing.get('location', ''), listing.get('url', ''),
+        listing.get('image_url', ''), listing.get('price_cents'), listing.get('posted_at'), classification,
+        simhash, image_hash,
+    )
+
+
+class HistoryStore:
+    """Append-optimised history of every scraped listing, with indexed queries.
+
+    Each thread gets its own connection; WAL mode lets the background writer
+    append while other threads query.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn):
+        """Add columns introduced after a history file was created."""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(observations)')}
+        with conn:
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE observations ADD COLUMN {column} {kind}')
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def insert_cycle(self, cycle_id, started_at, timings, counts, observations):
+        """Write one cycle summary and its observation rows in a single transaction."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cycles VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (cycle_id, started_at, timings.get('scrape_ms'), timings.get('classify_ms'),
+                 timings.get('notify_ms'), counts.get('scraped'), counts.get('classified'), counts.get('notified'))
+            )
+            conn.executemany(
+                f"INSERT INTO observations ({', '.join(_OBSERVATION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_OBSERVATION_COLUMNS))})",
+                observations
+            )
+
+    def last_cycle_id(self):
+        row = self._connection().execute('SELECT MAX(cycle_id) FROM cycles').fetchone()
+        return row[0] or 0
+
+    def observation_count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM observations').fetchone()[0]
+
+    def price_history(self, listing_id):
+        """[(observed_at, price_cents)] for each price change of a listing, oldest first."""
+        rows = self._connection().execute(
+            'SELECT observed_at, price_cents FROM observations WHERE listing_id = ? ORDER BY observed_at',
+            (listing_id,)
+        ).fetchall()
+        history = []
+        for observed_at, price_cents in rows:
+            if not history or history[-1][1] != price_cents:
+                history.append((observed_at, price_cents))
+        return history
+
+    def time_on_market(self, listing_id):
+        """Seconds between a listing's post (or first sighting) and its last sighting; None if unseen."""
+        row = self._connection().execute(
+            'SELECT MIN(COALESCE(posted_at, observed_at)), MIN(observed_at), MAX(observed_at) '
+            'FROM observations WHERE listing_id = ?',
+            (listing_id,)
+        ).fetchone()
+        if row[2] is None:
+            return None
+        start = min(row[0], row[1])
+        return row[2] - start
+
+    def find_reposts(self, since=None, min_listings=2):
+        """Titles seen under several listing IDs: [{'title_key', 'listing_ids', 'prices'}]."""
+        params = []
+        where = "WHERE title_key != ''"
+        if since is not None:
+            where += ' AND observed_at >= ?'
+            params.append(int(since))
+        rows = self._connection().execute(
+            f"SELECT title_key, listing_id, MIN(observed_at), price_cents FROM observations {where} "
+            f"GROUP BY title_key, listing_id ORDER BY title_key, MIN(observed_at)",
+            params
+        ).fetchall()
+        groups = {}
+        for key, listing_id, _first_seen, price_cents in rows:
+            group = groups.setdefault(key, {'title_key': key, 'listing_ids': [], 'prices': []})
+            group['listing_ids'].append(listing_id)
+            group['prices'].append(price_cents)
+        return [group for group in groups.values() if len(group['listing_ids']) >= min_listings]
+
+    def fingerprints(self, since=None, column='simhash'):
+        """Latest (listing_id, fingerprint, classification, price_cents) per fingerprinted listing.
+
+        Rows for cycles that only saw a listing again carry no classification,
+        so the label comes from its latest classified row.
+        """
+        if column not in _ADDED_COLUMNS:
+            raise ValueError(f"Unknown fingerprint column: {column}")
+        params = []
+        where = f'WHERE {column} IS NOT NULL'
+        if since is not None:
+            where += ' AND observed_at >= ?'
+            params.append(int(since))
+        # SQLite takes bare columns from the row holding MAX(observed_at)
+        rows = self._connection().execute(
+            f"SELECT listing_id, {column}, COALESCE(classification, ("
+            f"SELECT labelled.classification FROM observations AS labelled "
+            f"WHERE labelled.listing_id = latest.listing_id AND labelled.classification IS NOT NULL "
+            f"ORDER BY labelled.observed_at DESC LIMIT 1)), price_cents, MAX(observed_at) "
+            f"FROM observations AS latest {where} GROUP BY listing_id",
+            params
+        ).fetchall()
+        return [row[:4] for row in rows]
+
+    def reposts_of(self, title):
+        """Distinct listing IDs ever seen with the same normalised title, oldest first."""
+        rows = self._connection().execute(
+            'SELECT listing_id, MIN(observed_at) AS first_seen FROM observations WHERE title_key = ? '
+            'GROUP BY listing_id ORDER BY first_seen',
+            (title_key(title),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class HistoryWriter:
+    """Background thread that applies one batched transaction per monitoring cycle."""
+
+    def __init__(self, store):
+        self.store = store
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, cycle_id, started_at, timings, counts, observations):
+        """Queue a cycle's rows; returns immediately."""
+        self._queue.put((cycle_id, started_at, timings, counts, observations))
+
+    def pending(self):
+        """Cycles queued but not yet written (approximate)."""
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """Block until every queued cycle has been written."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self.store.close()
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            start = time.perf_counter()
+            try:
+                self.store.insert_cycle(*item)
+                logger.debug(f"History: wrote {len(item[4])} observations for cycle {item[0]} "
+                             f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+            except Exception as e:
+                logger.error(f"Failed to write listing history for cycle {item[0]}: {e}")
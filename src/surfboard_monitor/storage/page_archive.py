@@ -0,0 +1,198 @@
+"""
+Content-addressed archive of raw search pages, indexed by (region, term, time).
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:  # zstandard is the optional "archive" extra
+    zstandard = None
+
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    page_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    region TEXT NOT NULL,
+    term TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    url TEXT,
+    base_url TEXT,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_query ON pages (region, term, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pages_fetched ON pages (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_pages_digest ON pages (digest);
+"""
+
+CODECS = ('gzip', 'zstd')
+_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+PRUNE_INTERVAL = 3600  # seconds between automatic retention sweeps
+
+
+def compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    # mtime=0 keeps identical pages byte-identical on disk
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read zstd pages: pip install 'surfboard-monitor[archive]'")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Raw response bodies stored once per distinct content, with a SQLite index.
+
+    Blobs live under objects/<2 hex>/<sha256>.<ext>; identical pages (an
+    unchanged search re-fetched every cycle) add an index row but no bytes.
+    Index rows older than retention_days are swept about hourly, along with
+    blobs nothing references any more. retention_days=0 keeps everything.
+    """
+
+    def __init__(self, directory, codec='gzip', retention_days=30, clock=time.time):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown archive codec {codec!r}; expected one of {', '.join(CODECS)}")
+        if codec == 'zstd' and zstandard is None:
+            logger.warning("zstandard not installed - archiving pages with gzip")
+            codec = 'gzip'
+        self.directory = directory
+        self.codec = codec
+        self.retention_days = retention_days
+        self.clock = clock
+        self.metrics = metrics
+        self._local = threading.local()
+        self._next_prune = 0
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _blob_path(self, digest, codec):
+        return os.path.join(self.directory, 'objects', digest[:2], digest + _EXTENSIONS[codec])
+
+    def store(self, region, term, content, url=None, base_url=None, fetched_at=None):
+        """Archive one response body; returns its digest."""
+        digest = hashlib.sha256(content).hexdigest()
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        conn = self._connection()
+        known = conn.execute('SELECT 1 FROM blobs WHERE digest = ?', (digest,)).fetchone()
+        if known:
+            self.metrics.increment('archive.dedup_hits')
+        else:
+            stored = compress(content, self.codec)
+            path = self._blob_path(digest, self.codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(stored)
+            os.replace(tmp_path, path)
+            self.metrics.increment('archive.bytes_stored', len(stored))
+        with conn:
+            if not known:
+                conn.execute('INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)',
+                             (digest, self.codec, len(content), len(stored)))
+            conn.execute('INSERT INTO pages (region, term, fetched_at, url, base_url, digest) VALUES (?, ?, ?, ?, ?, ?)',
+                         (region, term, fetched_at, url, base_url, digest))
+        self.metrics.increment('archive.pages')
+        if fetched_at >= self._next_prune:
+            self._next_prune = fetched_at + PRUNE_INTERVAL
+            self.prune(now=fetched_at)
+        return digest
+
+    def read(self, digest):
+        """Original bytes of an archived page."""
+        row = self._connection().execute('SELECT codec FROM blobs WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        with open(self._blob_path(digest, row[0]), 'rb') as f:
+            return decompress(f.read(), row[0])
+
+    def pages(self, region=None, term=None, since=None, until=None):
+        """Index rows (page_id, region, term, fetched_at, url, base_url, digest), oldest first."""
+        clauses, params = [], []
+        for clause, value in (('region = ?', region), ('term = ?', term),
+                              ('fetched_at >= ?', since), ('fetched_at < ?', until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._connection().execute(
+            f'SELECT page_id, region, term, fetched_at, url, base_url, digest FROM pages {where} '
+            f'ORDER BY fetched_at, page_id',
+            params
+        ).fetchall()
+
+    def replay(self, region=None, term=None, since=None, until=None):
+        """Yield (region, term, fetched_at, base_url, content) for the matching pages, oldest first.
+
+        Blobs are read lazily and the last one is reused, so replaying an
+        unchanged query decompresses each distinct page once.
+        """
+        last_digest = last_content = None
+        for _, page_region, page_term, fetched_at, _, base_url, digest in self.pages(region, term, since, until):
+            if digest != last_digest:
+                last_digest, last_content = digest, self.read(digest)
+            yield page_region, page_term, fetched_at, base_url, last_content
+
+    def stats(self):
+        """Page count, distinct blobs, raw bytes of all pages and bytes on disk."""
+        conn = self._connection()
+        pages = conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        blobs, stored = conn.execute('SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM blobs').fetchone()
+        raw = conn.execute('SELECT COALESCE(SUM(b.size), 0) FROM pages p JOIN blobs b ON b.digest = p.digest').fetchone()[0]
+        return {'pages': pages, 'blobs': blobs, 'raw_bytes': raw, 'stored_bytes': stored}
+
+    def prune(self, now=None):
+        """Drop index rows past the retention window and unreferenced blobs; returns pages removed."""
+        if not self.retention_days:
+            return 0
+        cutoff = (self.clock() if now is None else now) - self.retention_days * 86400
+        conn = self._connection()
+        with conn:
+            removed = conn.execute('DELETE FROM pages WHERE fetched_at < ?', (cutoff,)).rowcount
+            orphans = conn.execute(
+                'SELECT digest, codec FROM blobs WHERE digest NOT IN (SELECT digest FROM pages)'
+            ).fetchall()
+            conn.executemany('DELETE FROM blobs WHERE digest = ?', [(digest,) for digest, _ in orphans])
+        for digest, codec in orphans:
+            try:
+                os.remove(self._blob_path(digest, codec))
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"Page archive: pruned {removed} pages and {len(orphans)} blobs older than "
+                        f"{self.retention_days} days")
+        return removed
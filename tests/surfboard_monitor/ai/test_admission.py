@@ -0,0 +1,218 @@
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from surfboard_monitor.ai.admission import BACKFILL, LIVE, AdmissionController, parse_quota_error
+from surfboard_monitor.ai.gemini_classifier import GeminiClassifier
+from surfboard_monitor.ai.replay import synthetic_response
+from surfboard_monitor.config import Config
+from surfboard_monitor.core.clock import VirtualClock
+from surfboard_monitor.listing import Listing
+
+
+def quota_error(metric, quota_id, value, retry_delay='7s'):
+    """A 429 shaped like the Gemini API's, with QuotaFailure and RetryInfo details."""
+    return errors.APIError(429, {'error': {
+        'code': 429,
+        'status': 'RESOURCE_EXHAUSTED',
+        'message': 'You exceeded your current quota',
+        'details': [
+            {'@type': 'type.googleapis.com/google.rpc.QuotaFailure',
+             'violations': [{'quotaMetric': metric, 'quotaId': quota_id, 'quotaValue': str(value)}]},
+            {'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': retry_delay},
+        ],
+    }})
+
+
+class QuotaModels:
+    """generate_content that enforces per-model requests- and tokens-per-minute quotas on a virtual clock."""
+
+    def __init__(self, clock, requests_per_minute, tokens_per_minute=0):
+        self.clock = clock
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.calls = {}  # model -> [(time, tokens)]
+        self.rejected = 0
+
+    def generate_content(self, model, contents, config=None):
+        now = self.clock.monotonic()
+        tokens = len(contents) // 4
+        window = [call for call in self.calls.get(model, []) if call[0] > now - 60]
+        if len(window) >= self.requests_per_minute:
+            self.rejected += 1
+            raise quota_error('generativelanguage.googleapis.com/generate_content_free_tier_requests',
+                              'GenerateRequestsPerMinutePerProjectPerModel-FreeTier', self.requests_per_minute)
+        if self.tokens_per_minute and sum(call[1] for call in window) + tokens > self.tokens_per_minute:
+            self.rejected += 1
+            raise quota_error('generativelanguage.googleapis.com/generate_content_free_tier_input_token_count',
+                              'GenerateContentInputTokensPerModelPerMinute-FreeTier', self.tokens_per_minute)
+        self.calls[model] = window + [(now, tokens)]
+        return SimpleNamespace(text=synthetic_response(contents),
+                               usage_metadata=SimpleNamespace(total_token_count=tokens))
+
+
+def _boards(prefix, count):
+    return [Listing(id=f'{prefix}{n}', title=f"9'6 log {prefix}{n}", description='moving sale') for n in range(count)]
+
+
+def _classifier(clock, models, **settings):
+    config = Config()
+    config.GEMINI_MODELS = ['flash']
+    config.GEMINI_ESCALATE_UNCERTAIN = False
+    config.ENABLE_GEMINI_FILTERING = True
+    for name, value in settings.items():
+        setattr(config, name, value)
+    admission = AdmissionController.from_config(config, clock=clock.monotonic, sleep=clock.sleep)
+    classifier = GeminiClassifier(config, admission=admission)
+    classifier.client = SimpleNamespace(models=models)
+    return classifier, admission
+
+
+def test_parse_quota_error_reads_per_minute_limits_and_retry_delay():
+    error = quota_error('generativelanguage.googleapis.com/generate_content_free_tier_requests',
+                        'GenerateRequestsPerMinutePerProjectPerModel-FreeTier', 10, retry_delay='37.5s')
+    assert parse_quota_error(error) == {'retry_delay': 37.5, 'requests_per_minute': 10, 'tokens_per_minute': None}
+    daily = quota_error('generativelanguage.googleapis.com/generate_content_free_tier_requests',
+                        'GenerateRequestsPerDayPerProjectPerModel-FreeTier', 250)
+    assert parse_quota_error(daily)['requests_per_minute'] is None
+    tokens = quota_error('generativelanguage.googleapis.com/generate_content_free_tier_input_token_count',
+                         'GenerateContentInputTokensPerModelPerMinute-FreeTier', 250000)
+    assert parse_quota_error(tokens)['tokens_per_minute'] == 250000
+
+
+def test_backfill_gets_only_its_share_and_live_still_gets_in():
+    clock = VirtualClock(start=0)
+    admission = AdmissionController(requests_per_minute=4, backfill_share=0.5, clock=clock.monotonic, sleep=clock.sleep)
+    deadline = SimpleNamespace(remaining=lambda: 10)
+    assert admission.acquire('flash', priority=BACKFILL) and admission.acquire('flash', priority=BACKFILL)
+    assert admission.acquire('flash', priority=BACKFILL, deadline=deadline) is None
+    assert admission.acquire('flash', priority=LIVE, deadline=deadline)
+    assert admission.acquire('flash', priority=LIVE, deadline=deadline)
+    assert admission.acquire('flash', priority=LIVE, deadline=deadline) is None
+    # Without a deadline the caller waits for the oldest call to leave the window
+    assert admission.acquire('flash', priority=LIVE)
+    assert clock.monotonic() == 60
+    assert admission.state()['flash']['requests_last_minute'] == 1
+
+
+def test_backfill_yields_to_queued_live_calls_and_tokens_are_budgeted():
+    clock = VirtualClock(start=0)
+    admission = AdmissionController(tokens_per_minute=1000, clock=clock.monotonic, sleep=clock.sleep)
+    ticket = admission.acquire('flash', tokens=400)
+    admission.settle('flash', ticket, 700)
+    assert admission._wait_time('flash', 200, LIVE) == 0
+    assert admission._wait_time('flash', 400, LIVE) == 60
+    admission._live_waiting = 1
+    assert admission._wait_time('flash', 0, BACKFILL) > 0
+
+
+def test_quota_errors_defer_listings_and_teach_the_budget():
+    clock = VirtualClock(start=0)
+    models = QuotaModels(clock, requests_per_minute=2)
+    classifier, admission = _classifier(clock, models)
+
+    assert len(classifier.classify_listings(_boards('a', 3))) == 3
+    assert len(classifier.classify_listings(_boards('b', 3))) == 3
+    third = _boards('c', 3)
+    assert classifier.classify_listings(third) == []
+    # Deferred for the caller to retry, not dropped
+    assert classifier.deferred == third
+    assert models.rejected == 1
+    assert admission.state()['flash']['requests_per_minute'] == 2
+
+    # From now on calls wait for quota instead of hitting the limit
+    for n in range(10):
+        assert len(classifier.classify_listings(_boards(f'd{n}-', 2))) == 2
+        assert not classifier.deferred
+    assert models.rejected == 1
+    assert clock.monotonic() >= 4 * 60
+
+
+def test_learns_the_token_limit_and_falls_back_to_another_model():
+    clock = VirtualClock(start=0)
+    models = QuotaModels(clock, requests_per_minute=100, tokens_per_minute=100)
+    classifier, admission = _classifier(clock, models, GEMINI_MODELS=['flash', 'pro'])
+
+    labelled = [len(classifier.classify_listings(_boards(f'e{n}-', 3))) for n in range(4)]
+    assert labelled == [3, 3, 3, 3]
+    assert admission.state()['flash']['tokens_per_minute'] == 100
+    assert models.rejected == 1
+    # The throttled model is paused for its retry delay; the next one takes over meanwhile
+    assert models.calls['pro']
+
+
+def test_live_call_skips_a_model_without_quota_before_its_deadline():
+    clock = VirtualClock(start=0)
+    models = QuotaModels(clock, requests_per_minute=100)
+    classifier, admission = _classifier(clock, models, GEMINI_MODELS=['flash', 'pro'], GEMINI_REQUESTS_PER_MINUTE=1)
+    deadline = SimpleNamespace(remaining=lambda: 5)
+
+    assert [len(classifier.classify_listings(_boards(f'f{n}-', 2), deadline=deadline)) for n in range(3)] == [2, 2, 0]
+    assert [len(calls) for calls in models.calls.values()] == [1, 1]
+    # Both budgets are spent until the window moves on: deferred, not dropped
+    assert len(classifier.deferred) == 2
+    assert clock.monotonic() == 0
+
+
+def test_reload_keeps_limits_learned_from_quota_errors():
+    clock = VirtualClock(start=0)
+    admission = AdmissionController(requests_per_minute=60, clock=clock.monotonic, sleep=clock.sleep)
+    admission.throttled('flash', quota_error('generativelanguage.googleapis.com/generate_content_free_tier_requests',
+                                             'GenerateRequestsPerMinutePerProjectPerModel-FreeTier', 10))
+    admission.configure(60, 0, 0.5)
+    assert admission.state()['flash']['requests_per_minute'] == 10
+    # Raising the configured limit is a deliberate change and wins
+    admission.configure(120, 0, 0.5)
+    assert admission.state()['flash']['requests_per_minute'] == 120
+
+
+def test_failed_and_streamed_calls_settle_their_tickets():
+    clock = VirtualClock(start=0)
+    models = QuotaModels(clock, requests_per_minute=100)
+    classifier, admission = _classifier(clock, models, GEMINI_MODELS=['broken', 'flash'])
+    unavailable = errors.APIError(503, {'error': {'code': 503, 'message': 'unavailable'}})
+    generate = models.generate_content
+
+    def generate_content(model, contents, config=None):
+        if model == 'broken':
+            raise unavailable
+        return generate(model, contents, config)
+
+    def generate_content_stream(model, contents, config=None):
+        if model == 'broken':
+            raise unavailable
+        return iter([SimpleNamespace(text='1. LONGBOARD', usage_metadata=None),
+                     SimpleNamespace(text='', usage_metadata=SimpleNamespace(total_token_count=77))])
+
+    models.generate_content = generate_content
+    models.generate_content_stream = generate_content_stream
+    assert len(classifier.classify_listings(_boards('g', 1))) == 1
+    assert len(list(classifier.stream_labels(_boards('h', 1)))) == 1
+    # Failed attempts gave their quota back; the stream was charged its final chunk's usage
+    assert admission.state()['broken']['requests_last_minute'] == 0
+    assert admission.state()['flash']['tokens_last_minute'] == models.calls['flash'][0][1] + 77
+
+
+def test_throttled_calls_stay_charged():
+    clock = VirtualClock(start=0)
+    models = QuotaModels(clock, requests_per_minute=1)
+    classifier, admission = _classifier(clock, models, GEMINI_MODELS=['flash', 'pro'])
+
+    assert len(classifier.classify_listings(_boards('i', 1))) == 1
+    assert len(classifier.classify_listings(_boards('j', 1))) == 1
+    # The server counted the rejected call, so its ticket is not given back
+    assert models.rejected == 1
+    assert admission.state()['flash']['requests_last_minute'] == 2
+
+
+def test_label_batch_returns_its_labels_without_touching_shared_results():
+    clock = VirtualClock(start=0)
+    classifier, _ = _classifier(clock, QuotaModels(clock, requests_per_minute=100))
+    assert [label for _, label in classifier.label_listings(_boards('k', 2))] == ['LONGBOARD', 'LONGBOARD']
+    labels = dict(classifier.last_labels)
+
+    labelled, deferred = classifier.label_batch(_boards('l', 1))
+    assert [(listing.id, label) for listing, label in labelled] == [('l0', 'LONGBOARD')]
+    assert not deferred
+    # The micro-batcher's thread leaves the synchronous caller's results alone
+    assert classifier.last_labels == labels == {'k0': 'LONGBOARD', 'k1': 'LONGBOARD'}
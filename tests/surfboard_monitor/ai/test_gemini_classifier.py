@@ -103,3 +103,35 @@ def test_no_api_key_warning_path():
         cfg.GEMINI_API_KEY = ''
         classifier = GeminiClassifier()
         assert classifier.client is None
+
+
+def test_safety_keywords_come_from_config():
+    fake_response = MagicMock()
+    fake_response.text = "1. LONGBOARD\n2. LONGBOARD"
+    fake_client = MagicMock()
+    fake_client.models.generate_content.return_value = fake_response
+
+    classifier = GeminiClassifier()
+    classifier.client = fake_client
+    with patch.object(classifier.config, 'CLASSIFIER_BLACKLIST_KEYWORDS', ['foamie']), \
+            patch.object(classifier.config, 'ENABLE_GEMINI_FILTERING', True):
+        classifier.safety_matcher = classifier._build_safety_matcher()
+        kept = classifier.classify_listings([
+            {'title': "9'0 Foamie", 'description': '', 'price': '$100'},
+            {'title': "9'0 Router-shaped log", 'description': '', 'price': '$100'},
+        ])
+    # 'router' is no longer blacklisted once the list is overridden
+    assert [x['title'] for x in kept] == ["9'0 Router-shaped log"]
+
+
+def test_compact_prompt_sends_rubric_as_system_instruction():
+    from surfboard_monitor.ai.prompts import CLASSIFICATION_RUBRIC
+    classifier = GeminiClassifier()
+    classifier.client = MagicMock()
+    classifier.client.models.generate_content.return_value = MagicMock(text='1. LONGBOARD', usage_metadata=None)
+    with patch.object(classifier.config, 'ENABLE_GEMINI_FILTERING', True):
+        kept = classifier.classify_listings([{'title': "9'6 Log", 'description': 'Single fin.', 'price': '$500'}])
+    assert len(kept) == 1
+    kwargs = classifier.client.models.generate_content.call_args.kwargs
+    assert kwargs['config'].system_instruction.startswith(CLASSIFICATION_RUBRIC)
+    assert kwargs['contents'] == "Classify:\n1. Title: 9'6 Log | Single fin.\n"
@@ -0,0 +1,15 @@
+from surfboard_monitor.ai.loadtest import main, make_listings
+
+
+def test_make_listings_unique_ids():
+    listings = make_listings(5, offset=10)
+    assert [l.id for l in listings] == [f"load_{i}" for i in range(10, 15)]
+
+
+def test_load_test_reports_percentiles(capsys):
+    report = main(['--requests', '12', '--concurrency', '3', '--batch-size', '4',
+                   '--latency-ms', '1', '--jitter-ms', '0'])
+    assert report['requests'] == 12
+    assert report['api_calls'] == 12
+    assert report['p50_ms'] <= report['p95_ms'] <= report['p99_ms']
+    assert '"p99_ms"' in capsys.readouterr().out
@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import Mock
+
+import pytest
+
+from surfboard_monitor.ai.micro_batcher import DEFERRED, MicroBatcher
+from surfboard_monitor.core.clock import VirtualClock
+from surfboard_monitor.core.deadline import CycleDeadline
+from surfboard_monitor.core.monitor import SurfboardMonitor
+from surfboard_monitor.core.simulation import simulation_config
+from surfboard_monitor.listing import Listing
+
+
+class FakeClassifier:
+    """label_batch that records each batch and labels titles containing 'log' as longboards.
+
+    Titles containing 'later' are deferred, as when the quota runs out.
+    """
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.deadlines = []
+        self.fail = fail
+
+    def label_batch(self, listings, deadline=None):
+        self.batches.append(len(listings))
+        self.deadlines.append(deadline)
+        if self.fail:
+            return [], []
+        deferred = [listing for listing in listings if 'later' in listing.get('title')]
+        return [(listing, 'LONGBOARD' if 'log' in listing.get('title') else 'SHORTBOARD')
+                for listing in listings if listing not in deferred], deferred
+
+
+def _boards(prefix, count):
+    return [Listing(id=f'{prefix}{n}', title=f"{prefix} log {n}" if n % 2 else f"{prefix} fish {n}")
+            for n in range(count)]
+
+
+def test_listings_from_concurrent_producers_share_one_call():
+    classifier = FakeClassifier()
+    batcher = MicroBatcher(classifier, max_batch_size=100, max_wait_ms=500)
+    results = {}
+
+    def produce(prefix):
+        boards = _boards(prefix, 5)
+        results[prefix] = [future.result(timeout=5) for future in batcher.submit(boards)]
+
+    producers = [threading.Thread(target=produce, args=(prefix,)) for prefix in 'abc']
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    batcher.close()
+
+    assert classifier.batches == [15]
+    assert results['a'] == ['SHORTBOARD', 'LONGBOARD', 'SHORTBOARD', 'LONGBOARD', 'SHORTBOARD']
+    assert batcher.state()['batch_size']['max'] >= 15
+
+
+def test_full_batch_goes_out_without_waiting():
+    classifier = FakeClassifier()
+    batcher = MicroBatcher(classifier, max_batch_size=4, max_wait_ms=10000)
+    start = time.monotonic()
+    futures = batcher.submit(_boards('a', 6))
+    assert [future.result(timeout=5) for future in futures[:4]]
+    assert time.monotonic() - start < 2
+    # The remainder waits out max_wait_ms, or leaves when the batcher closes
+    batcher.close()
+    assert classifier.batches == [4, 2]
+    assert futures[5].result() == 'LONGBOARD'
+
+
+def test_failed_calls_resolve_to_none_or_raise():
+    batcher = MicroBatcher(FakeClassifier(fail=True), max_wait_ms=0)
+    assert [future.result(timeout=5) for future in batcher.submit(_boards('a', 2))] == [None, None]
+    assert batcher.label_listings(_boards('b', 2)) == []
+    batcher.close()
+
+    broken = FakeClassifier()
+    broken.label_batch = lambda listings, deadline=None: 1 / 0
+    batcher = MicroBatcher(broken, max_wait_ms=0)
+    with pytest.raises(ZeroDivisionError):
+        batcher.submit(_boards('a', 1))[0].result(timeout=5)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(_boards('a', 1))
+
+
+def test_monitor_classifies_early_searches_while_later_ones_are_fetched(tmp_path):
+    config = simulation_config()
+    config.GEMINI_MICROBATCH = True
+    config.GEMINI_MICROBATCH_MAX_WAIT_MS = 0
+    config.SEARCH_TERMS = ['a', 'b']
+    config.LOCATION = 'sandiego'
+    config.RADIUS = 0
+    config.ENABLE_NEAR_DUPLICATE_DETECTION = False
+    monitor = SurfboardMonitor(config, clock=VirtualClock(start=1_700_000_000))
+    monitor.scraper.last_check_file = str(tmp_path / 'last_check.json')
+    classifier = FakeClassifier()
+    first_call = threading.Event()
+    label = classifier.label_batch
+    classifier.label_batch = lambda listings, deadline=None: (first_call.set(), label(listings))[1]
+    monitor.batcher.classifier = classifier
+    monitor.scraper.listing_filter.apply = lambda listings, **kwargs: listings
+
+    def search(term, region, price_range=None, timeout=None, deadline=None):
+        if term == 'b':
+            # The second search only returns once the first one's listings reached Gemini
+            assert first_call.wait(5)
+        return _boards(term, 2)
+
+    monitor.scraper.search_craigslist = search
+    notified = []
+    monitor.notifier.notify_new_listing = lambda listing, profile=None: notified.append(listing.get('id'))
+    monitor.check_for_new_listings()
+    monitor.batcher.close()
+
+    assert classifier.batches == [2, 2]
+    assert sorted(notified) == ['a1', 'b1']
+    assert monitor.cycle_counts['classified'] == 4
+    assert monitor.cycle_labels == {'a0': 'SHORTBOARD', 'a1': 'LONGBOARD', 'b0': 'SHORTBOARD', 'b1': 'LONGBOARD'}
+
+
+def test_pending_listings_keep_their_futures_and_only_deferred_ones_are_resubmitted(tmp_path):
+    config = simulation_config()
+    config.GEMINI_MICROBATCH = True
+    config.ENABLE_NEAR_DUPLICATE_DETECTION = False
+    monitor = SurfboardMonitor(config, clock=VirtualClock(start=1_700_000_000))
+    monitor.deadline = CycleDeadline(0, {})
+    in_flight, later = Listing(id='a', title='log a'), Listing(id='b', title='log later')
+    futures = [Future(), Future()]
+    futures[1].set_result(DEFERRED)
+    monitor.batcher.submit = Mock(side_effect=lambda listings: [Future() for _ in listings])
+    monitor._batched = {id(in_flight): futures[0], id(later): futures[1]}
+
+    assert monitor._await_batched([in_flight, later]) == ([], [in_flight, later])
+    monitor.carry_over = [in_flight, later]
+    monitor._scrape = Mock(return_value=[])
+    monitor._check_single_search()
+    # The in-flight listing waited on its original future; only the deferred one went out again
+    assert [call.args[0] for call in monitor.batcher.submit.call_args_list if call.args[0]] == [[later]]
+
+
+def test_flushes_are_bounded_by_the_timeout():
+    classifier = FakeClassifier()
+    batcher = MicroBatcher(classifier, max_wait_ms=0, timeout_seconds=7)
+    listings = _boards('later', 2)
+    assert [future.result(timeout=5) for future in batcher.submit(listings)] == [DEFERRED, DEFERRED]
+    batcher.close()
+    assert 0 < classifier.deadlines[0].remaining() <= 7
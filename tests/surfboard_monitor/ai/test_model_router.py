@@ -0,0 +1,89 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from google.genai import errors
+
+from surfboard_monitor import GeminiClassifier
+from surfboard_monitor.ai.model_router import DeadlineExceeded, ModelRouter, ModelTimeout
+
+
+class FakeModels:
+    """generate_content with a fixed latency, answer or error per model."""
+
+    def __init__(self, latencies, answers=None, failures=None):
+        self.latencies = latencies
+        self.answers = answers or {}
+        self.failures = failures or {}
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append((model, contents))
+        time.sleep(self.latencies.get(model, 0))
+        if model in self.failures:
+            raise errors.APIError(self.failures[model], {'error': {'code': self.failures[model], 'message': 'fail'}})
+        return SimpleNamespace(text=self.answers.get(model, '1. LONGBOARD'), usage_metadata=None)
+
+
+def fake_client(latencies, answers=None, failures=None):
+    return SimpleNamespace(models=FakeModels(latencies, answers, failures))
+
+
+def test_routes_to_cheapest_model_meeting_slo():
+    client = fake_client({'lite': 0.03, 'flash': 0.0})
+    router = ModelRouter(['lite', 'flash'], slo_ms=15, timeout_seconds=5, min_samples=2)
+    # Unknown models get the benefit of the doubt, then the slow one is skipped
+    assert [router.generate(client, 'p')[0] for _ in range(4)] == ['lite', 'lite', 'flash', 'flash']
+    assert router.p95('lite') >= 30
+    assert router.state()['flash']['samples'] == 2
+
+
+def test_picks_fastest_when_no_model_meets_slo():
+    router = ModelRouter(['a', 'b'], slo_ms=1, timeout_seconds=5, min_samples=1)
+    router._record('a', 50)
+    router._record('b', 20)
+    assert router.choose() == 'b'
+
+
+def test_falls_back_on_timeout_and_retryable_errors():
+    client = fake_client({'slow': 0.3}, failures={'busy': 503})
+    router = ModelRouter(['slow', 'busy', 'ok'], slo_ms=1000, timeout_seconds=0.05)
+    model, response = router.generate(client, 'p')
+    assert model == 'ok'
+    assert [call[0] for call in client.models.calls] == ['slow', 'busy', 'ok']
+    assert router.p95('slow') == 50
+
+    with pytest.raises(ModelTimeout):
+        router.generate(client, 'p', models=['slow'])
+
+
+def test_deadline_shortens_the_call_and_stops_fallback():
+    client = fake_client({'slow': 0.3})
+    router = ModelRouter(['slow', 'ok'], slo_ms=1000, timeout_seconds=5)
+    ends_at = time.monotonic() + 0.05
+    deadline = SimpleNamespace(remaining=lambda: ends_at - time.monotonic())
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        router.generate(client, 'p', deadline=deadline)
+    assert time.monotonic() - start < 0.25
+    # No time left for the fallback model
+    assert [call[0] for call in client.models.calls] == ['slow']
+    with pytest.raises(errors.APIError):
+        router.generate(fake_client({}, failures={'ok': 400}), 'p', models=['ok', 'busy'])
+
+
+def test_classifier_escalates_only_uncertain_listings():
+    classifier = GeminiClassifier()
+    classifier.client = fake_client({}, answers={
+        'gemini-2.5-flash': '1. LONGBOARD\n2. UNCERTAIN',
+        'gemini-2.5-pro': '1. MIDLENGTH',
+    })
+    listings = [{'id': 'a', 'title': "9'6 Log", 'description': ''},
+                {'id': 'b', 'title': 'Board for sale', 'description': 'Good shape.'}]
+    with patch.object(classifier.config, 'ENABLE_GEMINI_FILTERING', True):
+        labelled = classifier.label_listings(listings)
+    assert [label for _, label in labelled] == ['LONGBOARD', 'MIDLENGTH']
+    (_, first), (model, second) = classifier.client.models.calls
+    assert model == 'gemini-2.5-pro'
+    assert 'Board for sale' in second and "9'6 Log" not in second
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from surfboard_monitor import Listing
+from surfboard_monitor.ai.prompt_builder import (
+    PromptBuilder, RubricCache, estimate_tokens, record_token_usage, truncate
+)
+from surfboard_monitor.ai.replay import synthetic_response
+from surfboard_monitor.core.metrics import metrics
+
+DESCRIPTION = ("Selling because I'm moving.   Pick up in Encinitas only, cash or venmo. "
+               "It's a 9'6 single fin noserider with a few pressure dings. No trades please!")
+
+
+def test_relevant_description_keeps_board_sentences():
+    builder = PromptBuilder()
+    assert builder.relevant_description('Surfboard', DESCRIPTION) == \
+        "It's a 9'6 single fin noserider with a few pressure dings."
+    # Nothing relevant: keep the first sentence
+    assert builder.relevant_description('Log', 'Great deal.  Call me.') == 'Great deal.'
+    # HTML listings repeat the title as description
+    assert builder.relevant_description("9'6 Log", "9'6  Log") == ''
+
+
+def test_short_board_words_only_match_whole_words():
+    builder = PromptBuilder()
+    description = "Super clean, see my blog. Comes with a board bag. Leggings and baggage not included."
+    assert builder.relevant_description('Surfboard', description) == 'Comes with a board bag.'
+    assert builder.mentions_board('Two logs and a SUP')
+
+
+def test_truncate_cuts_at_word_boundary():
+    assert truncate('single fin noserider log', 14) == 'single fin…'
+    assert truncate('short', 14) == 'short'
+
+
+def test_compact_prompt_drops_price_and_is_smaller():
+    listings = [Listing(id=f"cl_{i}", title=f"Surfboard {i}", price_cents=50000, description=DESCRIPTION * 3)
+                for i in range(10)]
+    compact = PromptBuilder('compact').build(listings)
+    full = PromptBuilder('full').build(listings)
+    assert 'Price' not in compact and '$500' not in compact
+    assert estimate_tokens(compact) * 3 < estimate_tokens(full)
+    # Replays and load tests still count one answer per listing
+    assert synthetic_response(compact).count('LONGBOARD') == 10
+    assert PromptBuilder('full').system_instruction is None
+
+
+def test_rubric_cache_creates_once_and_falls_back_inline():
+    client = MagicMock()
+    client.caches.create.return_value = SimpleNamespace(name='cachedContents/abc')
+    cache = RubricCache(client, 'gemini-2.5-flash', 'rubric')
+    assert cache.generate_config().cached_content == 'cachedContents/abc'
+    assert cache.generate_config().cached_content == 'cachedContents/abc'
+    assert client.caches.create.call_count == 1
+
+    client.caches.create.side_effect = Exception('content below minimum cacheable size')
+    failing = RubricCache(client, 'gemini-2.5-flash', 'rubric')
+    config = failing.generate_config()
+    assert config.cached_content is None and config.system_instruction == 'rubric'
+    assert RubricCache(object(), 'm', 'rubric').generate_config().system_instruction == 'rubric'
+
+
+def test_record_token_usage_tracks_estimated_and_actual():
+    metrics.reset()
+    usage = SimpleNamespace(prompt_token_count=120, cached_content_token_count=None, candidates_token_count=8)
+    record_token_usage(100, SimpleNamespace(usage_metadata=usage))
+    record_token_usage(50, SimpleNamespace(usage_metadata=None))
+    assert metrics.counter('gemini.calls') == 2
+    assert metrics.samples('gemini.tokens.estimated') == [100, 50]
+    assert metrics.counter('gemini.tokens.prompt_total') == 120
+    assert metrics.samples('gemini.tokens.output') == [8]
+    assert metrics.samples('gemini.tokens.cached') == []
@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import MagicMock
+from google.genai import errors
+from surfboard_monitor import GeminiClassifier
+from surfboard_monitor.ai.replay import (
+    RecordingClient, ReplayClient, load_recording, prompt_key, synthetic_response
+)
+
+
+def test_recording_then_replay_round_trip(tmp_path):
+    path = str(tmp_path / 'gemini.jsonl')
+    real = MagicMock()
+    real.models.generate_content.return_value = MagicMock(
+        text='1. LONGBOARD', usage_metadata=MagicMock(prompt_token_count=12, candidates_token_count=3,
+                                                       total_token_count=15))
+    recorder = RecordingClient(real, path)
+    assert recorder.models.generate_content(model='m', contents='prompt one').text == '1. LONGBOARD'
+
+    real.models.generate_content.side_effect = errors.APIError(429, {'error': {'code': 429, 'message': 'quota'}})
+    with pytest.raises(errors.APIError):
+        recorder.models.generate_content(model='m', contents='prompt two')
+
+    records = load_recording(path)
+    assert [r['key'] for r in records] == [prompt_key('m', 'prompt one'), prompt_key('m', 'prompt two')]
+    assert records[0]['usage']['total_token_count'] == 15
+    assert records[1]['error']['code'] == 429
+
+    replay = ReplayClient.from_file(path)
+    response = replay.models.generate_content(model='m', contents='prompt one')
+    assert response.text == '1. LONGBOARD'
+    assert response.usage_metadata.prompt_token_count == 12
+    with pytest.raises(errors.APIError) as exc:
+        replay.models.generate_content(model='m', contents='prompt two')
+    assert exc.value.code == 429
+    assert replay.calls == 2 and replay.errors == 1
+
+
+def test_replay_latency_and_error_injection():
+    slept = []
+    replay = ReplayClient(latency_ms=200, error_rate=1.0, error_code=503, seed=1, sleep=slept.append)
+    with pytest.raises(errors.APIError) as exc:
+        replay.models.generate_content(model='m', contents='x')
+    assert exc.value.code == 503
+    assert slept == [0.2]
+
+
+def test_synthetic_response_matches_listing_count():
+    prompt = "\n1. Title: a\n   Description: \n\n2. Title: b\n"
+    assert synthetic_response(prompt) == '1. LONGBOARD\n2. LONGBOARD'
+
+
+def test_classifier_runs_against_replay_client():
+    classifier = GeminiClassifier()
+    classifier.client = ReplayClient()
+    classifier.config.ENABLE_GEMINI_FILTERING = True
+    kept = classifier.classify_listings([{'title': "9'6 Log", 'description': '', 'price': '$500'},
+                                         {'title': 'Wetsuit', 'description': '', 'price': '$50'}])
+    assert [x['title'] for x in kept] == ["9'6 Log"]
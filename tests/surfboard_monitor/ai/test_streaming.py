@@ -0,0 +1,86 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from surfboard_monitor import GeminiClassifier
+from surfboard_monitor.ai.model_router import ModelRouter
+from surfboard_monitor.ai.replay import ReplayClient
+from surfboard_monitor.ai.streaming import VerdictParser
+
+
+class StreamingModels:
+    """generate_content_stream yielding fixed chunks per model, with an optional first-chunk delay."""
+
+    def __init__(self, chunks, delays=None):
+        self.chunks = chunks
+        self.delays = delays or {}
+        self.calls = []
+
+    def generate_content_stream(self, model, contents, config=None):
+        self.calls.append((model, contents))
+        time.sleep(self.delays.get(model, 0))
+        for text in self.chunks[model]:
+            yield SimpleNamespace(text=text, usage_metadata=None)
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append((model, contents))
+        return SimpleNamespace(text=''.join(self.chunks[model]), usage_metadata=None)
+
+
+def test_parser_emits_verdicts_only_for_complete_lines():
+    parser = VerdictParser(3)
+    assert parser.feed('1. LONG') == []
+    assert parser.feed('BOARD\n2. Short') == [(0, 'LONGBOARD')]
+    assert parser.feed('board\n') == [(1, 'SHORTBOARD')]
+    assert parser.missing() == [2]
+    assert parser.close() == []
+
+
+def test_parser_places_numbered_lines_and_ignores_noise():
+    parser = VerdictParser(3)
+    verdicts = parser.feed('3. OTHER\n\n**1.** LONGBOARD\n3. LONGBOARD\n9. OTHER\n')
+    assert verdicts == [(2, 'OTHER'), (0, 'LONGBOARD')]
+    assert parser.feed('MIDLENGTH') == []
+    assert parser.close() == [(1, 'MIDLENGTH')]
+
+
+def test_router_stream_falls_back_before_first_chunk():
+    client = SimpleNamespace(models=StreamingModels({'slow': ['1. OTHER'], 'ok': ['1. LONG', 'BOARD']},
+                                                    delays={'slow': 0.3}))
+    router = ModelRouter(['slow', 'ok'], slo_ms=1000, timeout_seconds=0.05)
+    model, chunks = router.stream(client, 'p')
+    assert model == 'ok'
+    assert ''.join(chunk.text for chunk in chunks) == '1. LONGBOARD'
+    assert router.state()['ok']['samples'] == 1
+
+
+def test_stream_labels_yields_as_lines_arrive():
+    classifier = GeminiClassifier()
+    classifier.client = ReplayClient()
+    listings = [{'id': f'cl_{i}', 'title': f"9'{i} Log", 'description': ''} for i in range(3)]
+    with patch.object(classifier.config, 'ENABLE_GEMINI_FILTERING', True):
+        stream = classifier.stream_labels(listings)
+        first = next(stream)
+        # The first verdict is available before the rest of the answer has been read
+        assert first == (listings[0], 'LONGBOARD')
+        assert classifier.last_labels == {'cl_0': 'LONGBOARD'}
+        rest = list(stream)
+    assert [label for _, label in rest] == ['LONGBOARD', 'LONGBOARD']
+
+
+def test_stream_labels_escalates_uncertain_and_missing_after_stream():
+    classifier = GeminiClassifier()
+    classifier.client = SimpleNamespace(models=StreamingModels({
+        'gemini-2.5-flash': ['1. UNCERTAIN\n2. LONG', 'BOARD'],
+        'gemini-2.5-pro': ['1. MIDLENGTH\n2. OTHER'],
+    }))
+    listings = [{'id': 'a', 'title': 'Board for sale', 'description': ''},
+                {'id': 'b', 'title': "9'6 Log", 'description': ''},
+                {'id': 'c', 'title': 'Surfboard', 'description': ''}]
+    with patch.object(classifier.config, 'ENABLE_GEMINI_FILTERING', True):
+        labelled = list(classifier.stream_labels(listings))
+    assert [(listing['id'], label) for listing, label in labelled] == [
+        ('b', 'LONGBOARD'), ('a', 'MIDLENGTH'), ('c', 'OTHER')]
+    (_, _), (model, escalated) = classifier.client.models.calls
+    assert model == 'gemini-2.5-pro'
+    assert 'Board for sale' in escalated and "9'6 Log" not in escalated
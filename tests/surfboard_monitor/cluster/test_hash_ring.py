@@ -0,0 +1,35 @@
+from surfboard_monitor.cluster.hash_ring import HashRing, query_key
+
+QUERIES = [(f"region{r}", f"term{t}") for r in range(20) for t in range(10)]
+
+
+def test_every_query_has_exactly_one_owner():
+    ring = HashRing(['w1', 'w2', 'w3'])
+    assignment = ring.assign(QUERIES)
+    assert sorted(q for queries in assignment.values() for q in queries) == sorted(QUERIES)
+    # 64 virtual nodes keep the split reasonably even
+    assert all(30 < len(queries) < 110 for queries in assignment.values())
+
+
+def test_join_only_moves_queries_to_the_new_worker():
+    before = HashRing(['w1', 'w2', 'w3'])
+    after = HashRing(['w1', 'w2', 'w3', 'w4'])
+    moved = [q for q in QUERIES if before.node_for(query_key(q)) != after.node_for(query_key(q))]
+    assert moved
+    assert all(after.node_for(query_key(q)) == 'w4' for q in moved)
+    assert len(moved) < len(QUERIES) / 2
+
+
+def test_leave_only_moves_the_departed_workers_queries():
+    ring = HashRing(['w1', 'w2', 'w3'])
+    owners = {q: ring.node_for(query_key(q)) for q in QUERIES}
+    ring.remove('w2')
+    for query, owner in owners.items():
+        if owner != 'w2':
+            assert ring.node_for(query_key(query)) == owner
+        else:
+            assert ring.node_for(query_key(query)) in ('w1', 'w3')
+
+
+def test_empty_ring_has_no_owner():
+    assert HashRing().node_for('sfbay/longboard') is None
@@ -0,0 +1,77 @@
+from surfboard_monitor.cluster.store import ClusterStore
+from surfboard_monitor.cluster.worker import ShardWorker
+from surfboard_monitor.listing import Listing
+
+QUERIES = [(f"region{r}", f"term{t}") for r in range(10) for t in range(5)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _workers(tmp_path, *names, clock=None):
+    store = ClusterStore(str(tmp_path / 'cluster.db'), clock=clock or FakeClock())
+    workers = [ShardWorker(store, name) for name in names]
+    for worker in workers:
+        worker.heartbeat()
+    for worker in workers:  # the first ones only see the later joiners on their next heartbeat
+        worker.heartbeat()
+    return store, workers
+
+
+def test_workers_split_queries_without_overlap(tmp_path):
+    _, workers = _workers(tmp_path, 'w1', 'w2', 'w3')
+    owned = [set(worker.owned(QUERIES)) for worker in workers]
+    assert set().union(*owned) == set(QUERIES)
+    assert sum(len(queries) for queries in owned) == len(QUERIES)
+
+
+def test_silent_worker_queries_move_after_timeout(tmp_path):
+    clock = FakeClock()
+    _, (w1, w2) = _workers(tmp_path, 'w1', 'w2', clock=clock)
+    w1_before = set(w1.owned(QUERIES))
+    clock.now += w1.heartbeat_timeout + 1
+    w1.heartbeat()
+    assert w1.workers == ['w1']
+    assert set(w1.owned(QUERIES)) == set(QUERIES) >= w1_before
+
+
+def test_leave_hands_queries_over(tmp_path):
+    _, (w1, w2) = _workers(tmp_path, 'w1', 'w2')
+    w2.leave()
+    w1.heartbeat()
+    assert w1.owned(QUERIES) == QUERIES
+
+
+def test_listing_is_claimed_by_one_worker_only(tmp_path):
+    _, (w1, w2) = _workers(tmp_path, 'w1', 'w2')
+    board = Listing(id='cl_1', title="9'6 Log")
+    assert w1.claim([board]) == [board]
+    assert w2.claim([board, Listing(id='cl_2', title='Fish')])[0].id == 'cl_2'
+    # Re-scraping your own claim keeps it
+    assert w1.claim([board]) == [board]
+
+
+def test_updates_return_other_workers_labels_once(tmp_path):
+    _, (w1, w2) = _workers(tmp_path, 'w1', 'w2')
+    w1.publish([('cl_1', 'LONGBOARD', -5, None, 60000)])
+    w2.publish([('cl_2', 'SHORTBOARD', 7, None, 30000)])
+    assert w2.updates() == [('cl_1', 'LONGBOARD', -5, None, 60000)]
+    assert w2.updates() == []
+    assert w1.updates() == [('cl_2', 'SHORTBOARD', 7, None, 30000)]
+
+
+def test_old_claims_are_pruned(tmp_path):
+    clock = FakeClock()
+    store, (w1, w2) = _workers(tmp_path, 'w1', 'w2', clock=clock)
+    board = Listing(id='cl_1', title="9'6 Log")
+    w1.claim([board])
+    clock.now += store.retention_days * 86400 + 1
+    assert w2.claim([Listing(id='cl_2', title='Fish')])[0].id == 'cl_2'
+    assert store._connection().execute('SELECT listing_id FROM claims').fetchall() == [('cl_2',)]
+    store.retention_days = 0
+    assert store.prune(now=clock.now + 10 ** 9) == 0
@@ -0,0 +1,205 @@
+import json
+from unittest.mock import Mock
+
+from surfboard_monitor.ai.replay import ReplayClient
+from surfboard_monitor.config import Config
+from surfboard_monitor.core.backfill import PAGE_SIZE, BackfillJob, backfill_config
+from surfboard_monitor.core.clock import VirtualClock
+from surfboard_monitor.core.monitor import SurfboardMonitor
+from surfboard_monitor.core.simulation import simulation_config
+from surfboard_monitor.scrapers.craigslist_scraper import CraigslistScraper
+
+
+def _config(tmp_path, **settings):
+    config = Config()
+    config.LOCATION = 'sandiego'
+    config.RADIUS = 0
+    config.SEARCH_TERMS = ['surfboard']
+    config.ENABLE_GEMINI_FILTERING = True
+    config.BACKFILL_CHECKPOINT = str(tmp_path / 'backfill.json')
+    config.BACKFILL_MAX_PAGES = 10
+    config.BACKFILL_BATCH_SIZE = 4
+    for name, value in settings.items():
+        setattr(config, name, value)
+    return config
+
+
+def _page(titles):
+    items = ','.join(json.dumps({'item': {'name': title, 'description': 'moving sale',
+                                          'offers': {'price': '500.00'}}}) for title in titles)
+    return (f'<script id="ld_searchpage_results" type="application/ld+json">{{"itemListElement": [{items}]}}'
+            f'</script>').encode('utf-8')
+
+
+class FakeCraigslist:
+    """fetch_search_page stand-in: three pages of three listings, then an empty page."""
+
+    def __init__(self, pages=3):
+        self.pages = pages
+        self.offsets = []
+        self.breaker_keys = []
+
+    def __call__(self, search_term, location, price_range=None, offset=0, rate_limiter=None, breaker_key=None):
+        self.breaker_keys.append(breaker_key)
+        self.offsets.append(offset)
+        page = offset // PAGE_SIZE
+        titles = [f"9'0 log {page}-{n}" for n in range(3)] if page < self.pages else []
+        return _page(titles), f"https://{location}.craigslist.org"
+
+
+def _job(config, notified, site=None):
+    clock = VirtualClock(start=1_700_000_000)
+    scraper = CraigslistScraper(config, clock=clock)
+    scraper.fetch_search_page = site or FakeCraigslist()
+    classifier = Mock()
+    classifier.classify_listings.side_effect = lambda listings: list(listings)
+    classifier.deferred = []
+    return BackfillJob(scraper, notified.append, config, classifier=classifier)
+
+
+def test_backfill_pages_until_empty_and_classifies_in_batches(tmp_path):
+    notified = []
+    job = _job(_config(tmp_path), notified)
+    job._run()
+
+    assert job.scraper.fetch_search_page.offsets == [0, 120, 240, 360]
+    assert len(notified) == 9
+    # Batches of at least BACKFILL_BATCH_SIZE, the remainder at the end
+    assert [len(call.args[0]) for call in job.classifier.classify_listings.call_args_list] == [6, 3]
+    with open(job.path) as f:
+        checkpoint = json.load(f)
+    assert checkpoint['queries'] == {'sandiego/surfboard': {'offset': 480, 'done': True}}
+    assert not job.remaining()
+
+
+def test_backfill_stops_at_max_pages(tmp_path):
+    notified = []
+    job = _job(_config(tmp_path, BACKFILL_MAX_PAGES=2), notified)
+    job._run()
+    assert job.scraper.fetch_search_page.offsets == [0, 120]
+    assert len(notified) == 6
+
+
+def test_crash_before_classification_resumes_from_last_checkpoint(tmp_path):
+    config = _config(tmp_path, BACKFILL_BATCH_SIZE=100)
+    first = _job(config, [])
+    first._fetch_page('sandiego', 'surfboard')
+    first._classify_pending()
+    first._fetch_page('sandiego', 'surfboard')
+    # Crash: the second page was fetched but never classified
+
+    notified = []
+    resumed = _job(config, notified)
+    assert resumed.resumed
+    assert resumed.cutoff == first.cutoff
+    resumed._run()
+    assert resumed.scraper.fetch_search_page.offsets == [120, 240, 360]
+    assert len(notified) == 6
+
+
+def test_backfill_classifier_uses_one_cheap_model():
+    config = Config()
+    config.GEMINI_MODELS = ['gemini-2.5-flash', 'gemini-2.5-pro']
+    config.BACKFILL_MODEL = 'gemini-2.5-flash-lite'
+    cheap = backfill_config(config)
+    assert cheap.GEMINI_MODELS == ['gemini-2.5-flash-lite']
+    assert not cheap.GEMINI_ESCALATE_UNCERTAIN and not cheap.GEMINI_STREAMING
+    assert config.GEMINI_MODELS == ['gemini-2.5-flash', 'gemini-2.5-pro']
+
+
+def test_fetch_search_page_sends_offset_through_given_limiter():
+    scraper = CraigslistScraper()
+    scraper.session = Mock()
+    scraper.session.get.return_value = Mock(status_code=200, headers={}, content=b'<html></html>')
+    limiter = Mock()
+    assert scraper.fetch_search_page('surfboard', 'sandiego', offset=240, rate_limiter=limiter) is not None
+    assert 's=240' in scraper.session.get.call_args.args[0]
+    limiter.acquire.assert_called_once_with('sandiego.craigslist.org', deadline=None)
+    limiter.record_response.assert_called_once()
+
+
+def test_first_live_cycle_hands_its_results_to_backfill(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    config = simulation_config(_config(tmp_path, ENABLE_BACKFILL=True))
+    monitor = SurfboardMonitor(config, clock=clock)
+    monitor.scraper.last_check_file = str(tmp_path / 'last_check.json')
+    monitor.classifier.client = ReplayClient()
+    listings = CraigslistScraper(config).parse_search_results(_page(["9'6 log mov"]), 'https://sandiego.craigslist.org')
+    monitor._scrape = Mock(return_value=listings)
+    monitor.classifier.classify_listings = Mock(return_value=[])
+
+    monitor.check_for_new_listings()
+    assert monitor.backfill.pending == listings
+    assert monitor.cycle_counts['deferred_to_backfill'] == 1
+    monitor.classifier.classify_listings.assert_not_called()
+    # Paused only while the live cycle ran
+    assert monitor.backfill._live_idle.is_set()
+
+    monitor.check_for_new_listings()
+    monitor.classifier.classify_listings.assert_called_once()
+    assert monitor.status_snapshot(clock.time())['backfill']['pending'] == 1
+
+
+def test_listings_deferred_for_quota_are_retried_before_checkpointing(tmp_path):
+    notified = []
+    job = _job(_config(tmp_path, BACKFILL_BATCH_SIZE=100), notified)
+    calls = []
+
+    def classify(listings):
+        calls.append(len(listings))
+        job.classifier.deferred = list(listings) if len(calls) == 1 else []
+        return [] if len(calls) == 1 else list(listings)
+
+    job.classifier.classify_listings.side_effect = classify
+    job._fetch_page('sandiego', 'surfboard')
+    job._classify_pending()
+    assert len(job.pending) == 3
+    assert not (tmp_path / 'backfill.json').exists()
+
+    job._classify_pending()
+    assert calls == [3, 3]
+    assert len(notified) == 3
+    with open(job.path) as f:
+        assert json.load(f)['queries']['sandiego/surfboard']['offset'] == 120
+
+
+def test_final_batch_is_retried_until_nothing_is_deferred(tmp_path):
+    notified = []
+    job = _job(_config(tmp_path, BACKFILL_BATCH_SIZE=100), notified)
+    calls = []
+
+    def classify(listings):
+        calls.append(len(listings))
+        job.classifier.deferred = list(listings) if len(calls) < 3 else []
+        return [] if len(calls) < 3 else list(listings)
+
+    job.classifier.classify_listings.side_effect = classify
+    job._run()
+    assert calls == [9, 9, 9]
+    assert len(notified) == 9 and not job.pending
+    with open(job.path) as f:
+        assert json.load(f)['queries']['sandiego/surfboard'] == {'offset': 480, 'done': True}
+
+
+def test_stopping_with_deferred_listings_keeps_the_old_checkpoint(tmp_path):
+    job = _job(_config(tmp_path, BACKFILL_BATCH_SIZE=100), [])
+
+    def classify(listings):
+        job.classifier.deferred = list(listings)
+        job._stop.set()
+        return []
+
+    job.classifier.classify_listings.side_effect = classify
+    job._run()
+    assert len(job.pending) == 9
+    assert not (tmp_path / 'backfill.json').exists()
+
+
+def test_backfill_and_live_polling_claim_each_listing_once(tmp_path):
+    job = _job(_config(tmp_path), [])
+    live = job.scraper._unseen(job.scraper.parse_search_results(_page(["9'0 log 0-1"]), 'https://sandiego.craigslist.org'))
+    job._fetch_page('sandiego', 'surfboard')
+    assert [listing.get('title') for listing in job.pending] == ["9'0 log 0-0", "9'0 log 0-2"]
+    assert len(live) == 1
+    # Backfill failures count against their own circuit, not live polling's
+    assert job.scraper.fetch_search_page.breaker_keys == ['backfill:sandiego']
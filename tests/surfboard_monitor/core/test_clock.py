@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from surfboard_monitor import CraigslistScraper
+from surfboard_monitor.core.clock import SystemClock, VirtualClock
+
+
+def test_virtual_clock_only_moves_when_advanced_or_slept():
+    clock = VirtualClock(start=1_700_000_000)
+    assert clock.time() == clock.monotonic() == 1_700_000_000
+    clock.sleep(30)
+    clock.advance(-5)  # never goes backwards
+    assert clock.time() == 1_700_000_030
+    assert clock.now() == datetime.fromtimestamp(1_700_000_030)
+
+
+def test_system_clock_tracks_wall_time():
+    clock = SystemClock()
+    assert abs(clock.now() - datetime.now()) < timedelta(seconds=5)
+
+
+def test_scraper_uses_injected_clock_for_cutoff_and_rate_limit(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    scraper = CraigslistScraper(clock=clock)
+    scraper.last_check_file = str(tmp_path / 'last_check.json')
+    assert scraper._get_last_check_time() == clock.now() - timedelta(weeks=2)
+    scraper._save_check_time()
+    clock.advance(3600)
+    assert scraper._get_last_check_time() == datetime.fromtimestamp(1_700_000_000)
+
+    # Waiting for a token advances virtual time instead of sleeping
+    for _ in range(scraper.config.CRAIGSLIST_BURST + 1):
+        scraper.rate_limiter.acquire('sandiego.craigslist.org')
+    assert clock.time() > 1_700_003_600
@@ -0,0 +1,83 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from surfboard_monitor import Config, SurfboardMonitor
+from surfboard_monitor.core.config_manager import ConfigManager, build_snapshot
+
+
+def write(path, data, tick):
+    path.write_text(json.dumps(data))
+    # Bump mtime explicitly; some filesystems have coarse timestamps
+    os.utime(path, ns=(tick * 10 ** 9, tick * 10 ** 9))
+
+
+def test_build_snapshot_coerces_and_validates():
+    snapshot = build_snapshot({'MAX_PRICE': 900, 'SEARCH_TERMS': 'log, longboard', 'GEMINI_LATENCY_SLO_MS': 500},
+                              version=3)
+    assert (snapshot.MAX_PRICE, snapshot.SEARCH_TERMS, snapshot.version) == (900, ['log', 'longboard'], 3)
+    assert isinstance(snapshot.GEMINI_LATENCY_SLO_MS, float)
+    # The class defaults are untouched
+    assert Config.SEARCH_TERMS != ['log', 'longboard']
+
+    with pytest.raises(ValueError) as excinfo:
+        build_snapshot({'MAX_PRICE': '900', 'NOT_A_SETTING': 1, 'ENABLE_GEMINI_FILTERING': 1})
+    message = str(excinfo.value)
+    assert 'MAX_PRICE expects int' in message and 'unknown setting NOT_A_SETTING' in message
+    assert 'ENABLE_GEMINI_FILTERING expects bool' in message
+    with pytest.raises(ValueError, match='MAX_PRICE must be 0 or at least MIN_PRICE'):
+        build_snapshot({'MIN_PRICE': 500, 'MAX_PRICE': 100})
+
+
+def test_manager_reloads_on_change_and_keeps_last_good_snapshot(tmp_path):
+    path = tmp_path / 'config.json'
+    write(path, {'MAX_PRICE': 900}, tick=1)
+    manager = ConfigManager(str(path))
+    seen = []
+    manager.subscribe(seen.append)
+    assert manager.current.version == 1 and manager.current.MAX_PRICE == 900
+    assert manager.check() is None
+
+    write(path, {'MAX_PRICE': 1200}, tick=2)
+    assert manager.check().MAX_PRICE == 1200
+    assert [snapshot.version for snapshot in seen] == [2]
+
+    write(path, {'MAX_PRICE': -5}, tick=3)
+    assert manager.check() is None
+    assert manager.current.version == 2 and manager.current.MAX_PRICE == 1200
+    path.write_text('{not json')
+    os.utime(path, ns=(4 * 10 ** 9, 4 * 10 ** 9))
+    assert manager.check() is None and len(seen) == 1
+
+
+def test_restart_only_settings_are_not_reloaded(tmp_path):
+    path = tmp_path / 'config.json'
+    write(path, {'PARSE_WORKERS': 2}, tick=1)
+    manager = ConfigManager(str(path))
+    assert manager.current.PARSE_WORKERS == 2
+    write(path, {'PARSE_WORKERS': 4, 'MAX_RESULTS': 10}, tick=2)
+    snapshot = manager.check()
+    assert (snapshot.PARSE_WORKERS, snapshot.MAX_RESULTS) == (2, 10)
+
+
+def test_monitor_swaps_snapshot_into_components(tmp_path):
+    path = tmp_path / 'config.json'
+    write(path, {'MAX_PRICE': 900}, tick=1)
+    with patch.object(Config, 'CONFIG_FILE', str(path)):
+        monitor = SurfboardMonitor()
+    session, seen = monitor.scraper.session, monitor.scraper.seen_listings
+    assert monitor.scraper.config.MAX_PRICE == 900
+
+    write(path, {'MAX_PRICE': 700, 'CLASSIFIER_BLACKLIST_KEYWORDS': ['leash'],
+                 'CRAIGSLIST_REQUESTS_PER_MINUTE': 12}, tick=2)
+    monitor.config_manager.check()
+    assert monitor.config.version == 2
+    for component in (monitor.scraper, monitor.classifier, monitor.notifier):
+        assert component.config is monitor.config
+    assert monitor.scraper.listing_filter.spec.max_price == 700
+    assert monitor.scraper.rate_limiter.rate == 0.2
+    assert 'blacklist' in monitor.classifier.safety_matcher.match('Surf leash')
+    # Warm state survives the reload
+    assert monitor.scraper.session is session and monitor.scraper.seen_listings is seen
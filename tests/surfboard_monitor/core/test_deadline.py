@@ -0,0 +1,150 @@
+from unittest.mock import Mock
+
+import pytest
+
+from surfboard_monitor.ai.replay import ReplayClient
+from surfboard_monitor.core.clock import VirtualClock
+from surfboard_monitor.core.deadline import CycleDeadline, parse_stage_budgets
+from surfboard_monitor.core.metrics import metrics
+from surfboard_monitor.core.monitor import SurfboardMonitor
+from surfboard_monitor.core.simulation import simulation_config
+from surfboard_monitor.listing import Listing
+from surfboard_monitor.scrapers.craigslist_scraper import CraigslistScraper
+
+
+def test_parse_stage_budgets():
+    assert parse_stage_budgets(['scrape:0.5', ' classify : 0.4']) == {'scrape': 0.5, 'classify': 0.4}
+    for items in (['scrape'], ['scrape:-0.1'], ['scrape:0.7', 'classify:0.4']):
+        with pytest.raises(ValueError):
+            parse_stage_budgets(items)
+
+
+def test_unused_budget_carries_forward_and_overruns_are_counted():
+    clock = VirtualClock(start=0)
+    deadline = CycleDeadline(100, {'scrape': 0.5, 'classify': 0.4}, clock=clock.monotonic)
+    before = metrics.snapshot()['counters'].get('cycle.overruns.classify', 0)
+
+    deadline.start_stage('scrape')
+    assert deadline.remaining() == 50
+    clock.advance(30)
+    deadline.end_stage('scrape')
+
+    deadline.start_stage('classify')
+    # 40s of its own plus 20s left over by scrape
+    assert deadline.remaining() == 60
+    deadline.start_stage('dedupe')  # unbudgeted stages keep the current window
+    assert deadline.remaining() == 60
+    clock.advance(65)
+    assert deadline.expired()
+    deadline.end_stage('classify')
+    assert deadline.overruns_ms == {'classify': 5000}
+    assert metrics.snapshot()['counters']['cycle.overruns.classify'] == before + 1
+
+    assert deadline.remaining() == 5
+    assert deadline.finish() == 0
+    clock.advance(10)
+    assert deadline.finish() == 5
+
+
+def test_scrape_defers_queries_past_the_deadline_and_runs_them_first_next_time(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    scraper = CraigslistScraper(clock=clock)
+    scraper.last_check_file = str(tmp_path / 'last_check.json')
+    searched = []
+
+    def search(term, region, price_range=None, timeout=None, deadline=None):
+        searched.append((region, term))
+        clock.advance(20)
+        return []
+
+    scraper.search_craigslist = search
+    queries = [('sandiego', 'a'), ('sandiego', 'b'), ('sandiego', 'c')]
+    deadline = CycleDeadline(30, {}, clock=clock.monotonic)
+    scraper.get_new_listings(queries=queries, deadline=deadline)
+    assert searched == queries[:2]
+    assert scraper.deferred_queries == queries[2:]
+    # The cutoff stays put so the deferred query still sees everything since the last full scrape
+    assert scraper.is_first_run()
+
+    searched.clear()
+    scraper.get_new_listings(queries=queries, deadline=CycleDeadline(300, {}, clock=clock.monotonic))
+    assert searched == [('sandiego', 'c'), ('sandiego', 'a'), ('sandiego', 'b')]
+    assert not scraper.deferred_queries and not scraper.is_first_run()
+
+
+def test_scrape_defers_a_query_whose_host_is_backing_off_past_the_deadline(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    scraper = CraigslistScraper(clock=clock)
+    scraper.last_check_file = str(tmp_path / 'last_check.json')
+    scraper.session = Mock()
+    scraper.session.get.return_value = Mock(status_code=200, headers={}, content=b'<html></html>')
+    scraper.rate_limiter.record_response('sandiego.craigslist.org', 429, '120')
+
+    queries = [('sandiego', 'a'), ('orangecounty', 'b')]
+    start = clock.monotonic()
+    scraper.get_new_listings(queries=queries, deadline=CycleDeadline(30, {}, clock=clock.monotonic))
+    assert [call.args[0].split('//')[1].split('.')[0] for call in scraper.session.get.call_args_list] == ['orangecounty']
+    assert scraper.deferred_queries == [('sandiego', 'a')]
+    assert clock.monotonic() == start
+
+
+def test_listings_the_classify_budget_cuts_off_carry_into_the_next_cycle(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    config = simulation_config()
+    config.CHECK_INTERVAL = 100
+    config.CYCLE_STAGE_BUDGETS = ['scrape:0.5', 'classify:0.4', 'notify:0.1']
+    config.ENABLE_NEAR_DUPLICATE_DETECTION = False
+    monitor = SurfboardMonitor(config, clock=clock)
+    monitor.scraper.last_check_file = str(tmp_path / 'last_check.json')
+    monitor.classifier.client = ReplayClient(sleep=clock.sleep)
+    boards = [Listing(id=f'cl_{n}', title=f"9'{n} log", price_cents=50000) for n in range(2)]
+    notified = []
+    monitor.notifier.notify_new_listing = lambda listing, profile=None: notified.append(listing.get('id'))
+
+    def slow_scrape(on_new=None):
+        clock.advance(80)  # the whole cycle's budget
+        return boards[:1]
+
+    monitor._scrape = slow_scrape
+    monitor.check_for_new_listings()
+    assert notified == []
+    assert monitor.carry_over == boards[:1]
+    assert monitor.cycle_counts['deferred'] == 1
+    assert monitor.deadline.overruns_ms['scrape'] == 40000
+
+    monitor._scrape = lambda on_new=None: boards[1:]
+    monitor.check_for_new_listings()
+    assert notified == ['cl_0', 'cl_1']
+    assert monitor.carry_over == []
+    assert monitor.cycle_counts['classified'] == 2
+    assert monitor.status_snapshot(clock.time())['deadline']['budget_s'] == 80
+
+
+def test_notifications_past_the_notify_budget_go_out_next_cycle(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    config = simulation_config()
+    config.CHECK_INTERVAL = 100
+    config.CYCLE_STAGE_BUDGETS = ['scrape:0.5', 'classify:0.4', 'notify:0.1']
+    config.ENABLE_NEAR_DUPLICATE_DETECTION = False
+    monitor = SurfboardMonitor(config, clock=clock)
+    monitor.scraper.last_check_file = str(tmp_path / 'last_check.json')
+    monitor.classifier.client = ReplayClient(sleep=clock.sleep)
+    boards = [Listing(id=f'cl_{n}', title=f"9'{n} log", price_cents=50000) for n in range(3)]
+    notified = []
+
+    def slow_notify(listing, profile=None):
+        notified.append(listing.get('id'))
+        if len(notified) == 1:
+            clock.advance(80)  # the notify budget plus everything scrape and classify left
+
+    monitor.notifier.notify_new_listing = slow_notify
+    monitor._scrape = lambda on_new=None: boards
+    monitor.check_for_new_listings()
+    assert notified == ['cl_0']
+    assert monitor.pending_notifications == boards[1:]
+    assert (monitor.cycle_counts['notified'], monitor.cycle_counts['notify_deferred']) == (1, 2)
+
+    monitor._scrape = lambda on_new=None: []
+    monitor.check_for_new_listings()
+    assert notified == ['cl_0', 'cl_1', 'cl_2']
+    assert monitor.pending_notifications == []
@@ -0,0 +1,74 @@
+import io
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from surfboard_monitor.core.logging_setup import PER_LISTING, JsonFormatter, ListingSampler, configure_logging
+
+
+def log_config(tmp_path, **overrides):
+    values = dict(LOG_FILE=str(tmp_path / 'monitor.log'), LOG_LEVEL='DEBUG', LOG_MODE='queue', LOG_FORMAT='json',
+                  LOG_MAX_BYTES=0, LOG_ROTATE_WHEN='', LOG_BACKUP_COUNT=2, LOG_LISTING_SAMPLE_RATE=1.0)
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture
+def clean_root():
+    root = logging.getLogger()
+    saved, level = root.handlers[:], root.level
+    root.handlers = []
+    yield
+    for handler in root.handlers:
+        handler.close()
+    root.handlers, root.level = saved, level
+
+
+def make_record(per_listing=False, level=logging.DEBUG):
+    record = logging.LogRecord('test', level, __file__, 1, 'listing %s', ('x',), None)
+    if per_listing:
+        record.per_listing = True
+    return record
+
+
+def test_sampler_keeps_every_nth_listing_record_and_all_others():
+    sampler = ListingSampler(0.25)
+    kept = [sampler.filter(make_record(per_listing=True)) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert sampler.filter(make_record())
+    assert sampler.filter(make_record(per_listing=True, level=logging.WARNING))
+    assert not ListingSampler(0).filter(make_record(per_listing=True))
+    # Handlers sharing a sampler see the same decision for a record
+    record = make_record(per_listing=True)
+    assert sampler.filter(record) == sampler.filter(record)
+
+
+def test_json_formatter_writes_one_object_per_line():
+    line = JsonFormatter().format(make_record(per_listing=True))
+    entry = json.loads(line)
+    assert entry['message'] == 'listing x' and entry['level'] == 'DEBUG' and entry['per_listing']
+
+
+def test_queue_mode_writes_json_lines_off_thread(tmp_path, clean_root):
+    stream = io.StringIO()
+    listener = configure_logging(log_config(tmp_path, LOG_LISTING_SAMPLE_RATE=0.5), stream=stream)
+    assert isinstance(logging.getLogger().handlers[0], logging.handlers.QueueHandler)
+    log = logging.getLogger('logging_setup_test')
+    for i in range(4):
+        log.debug("Keeping %s", i, extra=PER_LISTING)
+    log.info("Cycle summary")
+    listener.stop()
+    entries = [json.loads(line) for line in (tmp_path / 'monitor.log').read_text().splitlines()]
+    assert [entry['message'] for entry in entries] == ['Keeping 0', 'Keeping 2', 'Cycle summary']
+    assert 'Cycle summary' in stream.getvalue()
+
+
+def test_sync_mode_rotates_by_size(tmp_path, clean_root):
+    assert configure_logging(log_config(tmp_path, LOG_MODE='sync', LOG_FORMAT='text', LOG_MAX_BYTES=200),
+                             stream=io.StringIO()) is None
+    log = logging.getLogger('logging_setup_test')
+    for i in range(20):
+        log.info("line %s with some padding to fill the file", i)
+    assert (tmp_path / 'monitor.log.1').exists()
@@ -0,0 +1,31 @@
+from surfboard_monitor.core.metrics import Metrics
+
+
+def test_counters_gauges_and_samples():
+    m = Metrics(max_samples=100)
+    m.increment('requests')
+    m.increment('requests', 2)
+    m.set_gauge('queue_depth', 5)
+    for value in range(1, 101):
+        m.observe('latency', value)
+
+    assert m.counter('requests') == 3
+    assert m.counter('missing') == 0
+    assert m.gauge('queue_depth') == 5
+    assert m.percentile('latency', 50) == 50
+    assert m.percentile('latency', 99) == 99
+    assert m.percentile('missing', 50) is None
+
+    snap = m.snapshot()
+    assert snap['counters']['requests'] == 3
+    assert snap['samples']['latency']['p95'] == 95
+    assert snap['samples']['latency']['max'] == 100
+
+
+def test_sample_window_is_bounded_and_reset_clears():
+    m = Metrics(max_samples=3)
+    for value in range(10):
+        m.observe('x', value)
+    assert m.samples('x') == [7, 8, 9]
+    m.reset()
+    assert m.snapshot() == {'counters': {}, 'gauges': {}, 'samples': {}}
@@ -101,5 +101,163 @@ def test_run_logs_unexpected_exception_and_exits():
                     with patch('surfboard_monitor.core.monitor.time.sleep'):
                         monitor.run()
 
+
+def test_cycle_records_history_with_labels(tmp_path):
+    from surfboard_monitor import Config, Listing
+    from surfboard_monitor.storage.history import HistoryStore
+    path = str(tmp_path / 'history.db')
+    with patch.object(Config, 'HISTORY_DB', path):
+        monitor = SurfboardMonitor()
+    board = Listing(id='cl_1', title="9'6 Log", price_cents=60000)
+    monitor.scraper.last_scraped = [board]
+    monitor.classifier.last_labels = {'cl_1': 'LONGBOARD'}
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[board]), \
+            patch.object(monitor.classifier, 'classify_listings', return_value=[board]), \
+            patch.object(monitor.notifier, 'notify_new_listing'):
+        monitor.check_for_new_listings()
+    assert monitor.history.flush(timeout=10)
+    store = HistoryStore(path)
+    assert store.price_history('cl_1') == [(store.price_history('cl_1')[0][0], 60000)]
+    assert store.last_cycle_id() == 1
+    assert set(monitor.cycle_timings) == {'scrape_ms', 'dedupe_ms', 'classify_ms', 'notify_ms'}
+
+
+def test_repost_reuses_classification_and_alerts_on_price_drop(tmp_path):
+    from surfboard_monitor import Config, Listing
+    path = str(tmp_path / 'history.db')
+    original = Listing(id='cl_1', title="9'6 Bing Classic Noserider Log", price_cents=90000,
+                       description='Single fin longboard, a few dings', image_url='https://images/abc_600x450.jpg')
+    with patch.object(Config, 'HISTORY_DB', path):
+        monitor = SurfboardMonitor()
+    monitor.scraper.last_scraped = [original]
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[original]), \
+            patch.object(monitor.classifier, 'classify_listings', return_value=[original]), \
+            patch.object(monitor.notifier, 'notify_new_listing'):
+        monitor.check_for_new_listings()
+    assert monitor.history.flush(timeout=10)
+    monitor.history.close()
+
+    # A restarted monitor rebuilds the repost index from history
+    repost = Listing(id='cl_2', title="9'6 Bing Classic Noserider Log!!", price_cents=75000,
+                     description='Single fin longboard, a few dings', image_url='https://images/abc_300x300.jpg')
+    with patch.object(Config, 'HISTORY_DB', path):
+        restarted = SurfboardMonitor()
+    assert len(restarted.duplicates.index) == 1
+    with patch.object(restarted.scraper, 'get_new_listings', return_value=[repost]), \
+            patch.object(restarted.classifier, 'classify_listings') as mock_classify, \
+            patch.object(restarted.notifier, 'notify_new_listing') as mock_new, \
+            patch.object(restarted.notifier, 'notify_price_drop') as mock_drop:
+        restarted.check_for_new_listings()
+    mock_classify.assert_not_called()
+    mock_new.assert_not_called()
+    mock_drop.assert_called_once_with(repost, 90000)
+    assert restarted.cycle_labels == {'cl_2': 'LONGBOARD'}
+
+
+def test_restart_keeps_labelled_listings_that_were_seen_again(tmp_path):
+    from surfboard_monitor import Config, Listing
+    from surfboard_monitor.core.clock import VirtualClock
+    path = str(tmp_path / 'history.db')
+    clock = VirtualClock(start=1_700_000_000)
+    original = Listing(id='cl_1', title="9'6 Bing Classic Noserider Log", price_cents=90000,
+                       description='Single fin longboard, a few dings')
+    with patch.object(Config, 'HISTORY_DB', path):
+        monitor = SurfboardMonitor(clock=clock)
+    monitor.scraper.last_scraped = [original]
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[original]), \
+            patch.object(monitor.classifier, 'classify_listings', return_value=[original]), \
+            patch.object(monitor.notifier, 'notify_new_listing'):
+        monitor.check_for_new_listings()
+    # Seen again, not new: the next cycle's row carries no classification
+    clock.advance(600)
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[]):
+        monitor.check_for_new_listings()
+    assert monitor.history.flush(timeout=10)
+    monitor.history.close()
+
+    with patch.object(Config, 'HISTORY_DB', path):
+        restarted = SurfboardMonitor(clock=clock)
+    assert len(restarted.duplicates.index) == 1
+
+
+def test_streaming_notifies_each_longboard_as_it_is_classified():
+    from surfboard_monitor import Config, Listing
+    boards = [Listing(id='cl_1', title="9'6 Log"), Listing(id='cl_2', title="6'0 Fish")]
+    monitor = SurfboardMonitor()
+    monitor.config.GEMINI_STREAMING = True
+    notified = []
+
+    def stream_labels(listings, deadline=None):
+        yield listings[0], 'LONGBOARD'
+        # The first alert has gone out before the second verdict is produced
+        assert notified == ['cl_1']
+        yield listings[1], 'SHORTBOARD'
+
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=boards), \
+            patch.object(monitor.classifier, 'stream_labels', side_effect=stream_labels), \
+            patch.object(monitor.notifier, 'notify_new_listing',
+                         side_effect=lambda listing: notified.append(listing['id'])):
+        monitor.check_for_new_listings()
+    assert notified == ['cl_1']
+    assert monitor.cycle_counts['notified'] == 1
+    assert 'first_alert_ms' in monitor.cycle_timings and 'notify_ms' not in monitor.cycle_timings
+
+
+def test_cluster_workers_suppress_cross_shard_reposts(tmp_path):
+    from surfboard_monitor import Config, Listing
+    path = str(tmp_path / 'cluster.db')
+    original = Listing(id='cl_1', title="9'6 Bing Classic Noserider Log", price_cents=90000,
+                       description='Single fin longboard, a few dings')
+    repost = Listing(id='cl_2', title="9'6 Bing Classic Noserider Log!!", price_cents=90000,
+                     description='Single fin longboard, a few dings')
+    with patch.object(Config, 'CLUSTER_DB', path):
+        with patch.object(Config, 'CLUSTER_WORKER_ID', 'w1'):
+            first = SurfboardMonitor()
+        with patch.object(Config, 'CLUSTER_WORKER_ID', 'w2'):
+            second = SurfboardMonitor()
+    assert first.scraper.last_check_file != second.scraper.last_check_file
+    first.classifier.last_labels = {'cl_1': 'LONGBOARD'}
+    with patch.object(first.scraper, 'get_new_listings', return_value=[original]), \
+            patch.object(first.shard, 'owned', side_effect=lambda queries: queries), \
+            patch.object(first.classifier, 'classify_listings', return_value=[original]), \
+            patch.object(first.notifier, 'notify_new_listing') as first_notify:
+        first.check_for_new_listings()
+    first_notify.assert_called_once()
+
+    # The second worker scrapes the repost under its own query and reuses the shared label
+    with patch.object(second.scraper, 'get_new_listings', return_value=[repost, original]), \
+            patch.object(second.shard, 'owned', side_effect=lambda queries: queries), \
+            patch.object(second.classifier, 'classify_listings') as second_classify, \
+            patch.object(second.notifier, 'notify_new_listing') as second_notify:
+        second.check_for_new_listings()
+    second_classify.assert_not_called()
+    second_notify.assert_not_called()
+    assert second.cycle_labels['cl_2'] == 'LONGBOARD'
+
+
+def test_cluster_worker_without_queries_skips_scrape(tmp_path):
+    from surfboard_monitor import Config
+    with patch.object(Config, 'CLUSTER_DB', str(tmp_path / 'cluster.db')):
+        monitor = SurfboardMonitor()
+    with patch.object(monitor.shard, 'owned', return_value=[]), \
+            patch.object(monitor.scraper, 'get_new_listings') as mock_get:
+        monitor.check_for_new_listings()
+    mock_get.assert_not_called()
+    assert monitor.cycle_counts['owned_queries'] == 0
+
+
+def test_run_writes_queued_history_and_closes_status_server_before_exiting():
+    monitor = SurfboardMonitor()
+    monitor.history = Mock()
+    monitor.status_server = Mock()
+    with patch.object(monitor, 'setup_logging'), patch.object(monitor, 'check_for_new_listings'), \
+            patch('surfboard_monitor.core.monitor.schedule.every'), \
+            patch('surfboard_monitor.core.monitor.time.sleep', side_effect=KeyboardInterrupt()):
+        monitor.run()
+    monitor.history.close.assert_called_once()
+    monitor.status_server.start.assert_called_once()
+    monitor.status_server.close.assert_called_once()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
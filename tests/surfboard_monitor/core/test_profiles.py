@@ -0,0 +1,83 @@
+import json
+import pytest
+from unittest.mock import ANY, patch
+from surfboard_monitor import Config, Listing, SurfboardMonitor
+from surfboard_monitor.core.profiles import ProfileIndex, WatchProfile, load_profiles
+
+
+def listing(id, region, price, title='Board', description=''):
+    return Listing(id=id, title=title, price_cents=None if price is None else price * 100,
+                   region=region, description=description)
+
+
+def test_profile_regions_resolve_to_sites():
+    profile = WatchProfile('a', ['San Diego, CA', 'sfbay'], ['surfboard'])
+    assert profile.regions == ['sandiego', 'sfbay']
+
+
+def test_index_queries_are_unique_and_price_range_covers_all():
+    index = ProfileIndex([
+        WatchProfile('a', ['sandiego'], ['surfboard', 'longboard'], max_price=800),
+        WatchProfile('b', ['sandiego', 'losangeles'], ['surfboard'], min_price=200, max_price=1500),
+    ])
+    assert index.queries() == [('losangeles', 'surfboard'), ('sandiego', 'longboard'), ('sandiego', 'surfboard')]
+    assert index.price_range() == (0, 1500)
+    index.profiles.append(WatchProfile('c', ['sandiego'], ['x']))
+    assert index.price_range() == (0, 0)
+
+
+def test_match_uses_region_class_price_and_keywords():
+    cheap = WatchProfile('cheap', ['sandiego'], ['surfboard'], max_price=500)
+    logs = WatchProfile('logs', ['sandiego'], ['surfboard'], board_classes=['LONGBOARD', 'MIDLENGTH'],
+                        keywords=['single fin'])
+    rich = WatchProfile('rich', ['losangeles'], ['surfboard'], min_price=1000)
+    index = ProfileIndex([cheap, logs, rich])
+
+    names = lambda profiles: sorted(p.name for p in profiles)
+    assert names(index.match(listing('1', 'sandiego', 400, 'Single Fin log'), 'LONGBOARD')) == ['cheap', 'logs']
+    assert names(index.match(listing('2', 'sandiego', 450), 'LONGBOARD')) == ['cheap']
+    assert names(index.match(listing('3', 'sandiego', 550, 'single fin'), 'MIDLENGTH')) == ['logs']
+    assert names(index.match(listing('4', 'sandiego', 499), 'SHORTBOARD')) == []
+    assert names(index.match(listing('5', 'losangeles', 50000), 'LONGBOARD')) == ['rich']
+    # Unknown price passes every price term
+    assert names(index.match(listing('6', 'losangeles', None), 'LONGBOARD')) == ['rich']
+
+
+def test_candidates_stay_small_with_many_profiles():
+    profiles = [WatchProfile(f"p{i}", [f"region{i % 50}"], ['surfboard'], min_price=(i // 50 % 10) * 100,
+                             max_price=(i // 50 % 10) * 100 + 99) for i in range(5000)]
+    index = ProfileIndex(profiles)
+    candidates = index.candidates('region7', 'LONGBOARD', 750 * 100)
+    assert 0 < len(candidates) <= 20
+
+
+def test_load_profiles_defaults_and_duplicates(tmp_path):
+    path = tmp_path / 'profiles.json'
+    path.write_text(json.dumps({'profiles': [{'name': 'a', 'email_to': 'a@example.com'}]}))
+    profiles = load_profiles(str(path), Config())
+    assert profiles[0].search_terms == Config.SEARCH_TERMS
+    assert profiles[0].board_classes == ['LONGBOARD']
+
+    path.write_text(json.dumps({'profiles': [{'name': 'a'}, {'name': 'a'}]}))
+    with pytest.raises(ValueError):
+        load_profiles(str(path), Config())
+
+
+def test_monitor_scrapes_once_and_notifies_each_matching_profile(tmp_path):
+    path = tmp_path / 'profiles.json'
+    path.write_text(json.dumps({'profiles': [
+        {'name': 'ann', 'regions': ['sandiego'], 'search_terms': ['surfboard'], 'email_to': 'ann@example.com'},
+        {'name': 'bob', 'regions': ['sandiego'], 'search_terms': ['surfboard', 'log'], 'max_price': 300},
+    ]}))
+    board = listing('cl_1', 'sandiego', 250, "9'6 Log")
+    with patch.object(Config, 'WATCH_PROFILES_FILE', str(path)):
+        monitor = SurfboardMonitor()
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[board]) as mock_get, \
+            patch.object(monitor.classifier, 'label_listings', return_value=[(board, 'LONGBOARD')]) as mock_label, \
+            patch.object(monitor.notifier, 'notify_new_listing') as mock_notify:
+        monitor.check_for_new_listings()
+    mock_get.assert_called_once_with(queries=[('sandiego', 'log'), ('sandiego', 'surfboard')],
+                                     price_range=(Config.MIN_PRICE, Config.MAX_PRICE), deadline=ANY,
+                                     on_new=None)
+    mock_label.assert_called_once_with([board], deadline=ANY)
+    assert sorted(call.kwargs['profile'].name for call in mock_notify.call_args_list) == ['ann', 'bob']
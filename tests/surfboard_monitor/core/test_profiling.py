@@ -0,0 +1,60 @@
+import os
+import pstats
+import cProfile
+from unittest.mock import patch
+
+from surfboard_monitor import Config, Listing, SurfboardMonitor
+from surfboard_monitor.core.profiling import CycleProfiler, collapsed_stacks
+
+
+def leaf(n):
+    return sum(i * i for i in range(n))
+
+
+def branch():
+    return leaf(20000) + leaf(5000)
+
+
+def test_collapsed_stacks_follow_call_paths():
+    profile = cProfile.Profile()
+    profile.enable()
+    branch()
+    profile.disable()
+    lines = collapsed_stacks(pstats.Stats(profile))
+    stacks = {line.rsplit(' ', 1)[0]: int(line.rsplit(' ', 1)[1]) for line in lines}
+    leaf_paths = [stack for stack in stacks if stack.split(';')[-1].startswith('test_profiling.py:leaf:')]
+    assert leaf_paths and all('test_profiling.py:branch:' in stack for stack in leaf_paths)
+    assert all(value > 0 for value in stacks.values())
+
+
+def test_profiles_only_selected_cycles_and_keeps_last_n(tmp_path):
+    profiler = CycleProfiler(str(tmp_path), keep=2, every_n_cycles=3, memory=True)
+    for cycle in range(1, 10):
+        profiler.begin_cycle(cycle)
+        if profiler.active:
+            profiler.start_stage('scrape')
+            branch()
+            profiler.stop_stage()
+        profiler.end_cycle()
+    names = sorted(os.listdir(tmp_path))
+    assert names == ['cycle000006-scrape.alloc.txt', 'cycle000006-scrape.collapsed', 'cycle000006-scrape.pstats',
+                     'cycle000009-scrape.alloc.txt', 'cycle000009-scrape.collapsed', 'cycle000009-scrape.pstats']
+    assert 'peak traced memory' in (tmp_path / 'cycle000009-scrape.alloc.txt').read_text()
+
+
+def test_arming_profiles_the_next_cycle_of_the_monitor(tmp_path):
+    with patch.object(Config, 'ENABLE_PROFILING', True), patch.object(Config, 'PROFILE_DIR', str(tmp_path)):
+        monitor = SurfboardMonitor()
+    board = Listing(id='cl_1', title="9'6 Log")
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[board]), \
+            patch.object(monitor.classifier, 'classify_listings', return_value=[board]), \
+            patch.object(monitor.notifier, 'notify_new_listing'):
+        monitor.check_for_new_listings()
+        assert os.listdir(tmp_path) == []
+        monitor.profiler.arm()
+        monitor.check_for_new_listings()
+        monitor.check_for_new_listings()
+    stages = {name.split('-', 1)[1].split('.')[0] for name in os.listdir(tmp_path)}
+    assert stages == {'scrape', 'dedupe', 'classify', 'notify'}
+    assert all(name.startswith('cycle000002-') for name in os.listdir(tmp_path))
+    assert not monitor.profiler.active
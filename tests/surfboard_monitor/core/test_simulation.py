@@ -0,0 +1,63 @@
+from surfboard_monitor.ai.replay import ReplayClient
+from surfboard_monitor.core.clock import VirtualClock
+from surfboard_monitor.core.monitor import SurfboardMonitor
+from surfboard_monitor.core.simulation import (ArchivedCraigslist, SyntheticCraigslist, run_simulation,
+                                               simulation_config, synthetic_timeline)
+from surfboard_monitor.storage.page_archive import PageArchive
+
+
+def _monitor(clock, tmp_path):
+    monitor = SurfboardMonitor(simulation_config(), clock=clock)
+    monitor.classifier.client = ReplayClient(latency_ms=500, sleep=clock.sleep)
+    monitor.scraper.last_check_file = str(tmp_path / 'last_check.json')
+    return monitor
+
+
+def test_synthetic_pages_only_show_posted_listings():
+    clock = VirtualClock(start=0)
+    timeline = synthetic_timeline([('sandiego', 'surfboard')], 0, days=1, per_day=10, seed=3)
+    site = SyntheticCraigslist(timeline, clock)
+    assert site.get('https://sandiego.craigslist.org/search/sss?query=surfboard').content.count(b'"name"') == 0
+    clock.advance(86400)
+    assert site.get('https://sandiego.craigslist.org/search/sss?query=surfboard').content.count(b'"name"') == 10
+    assert site.get('https://sfbay.craigslist.org/search/sss?query=surfboard').content.count(b'"name"') == 0
+
+
+def test_simulated_day_reports_latency_calls_and_memory(tmp_path):
+    clock = VirtualClock(start=1_700_000_000)
+    monitor = _monitor(clock, tmp_path)
+    timeline = synthetic_timeline(monitor.scraper.default_queries(), clock.time(), days=0.5, per_day=48, seed=7)
+    site = SyntheticCraigslist(timeline, clock)
+    monitor.scraper.session = site
+    report = run_simulation(monitor, clock, site, duration=43200, interval=900)
+
+    assert report['cycles'] == 48
+    assert clock.time() >= 1_700_043_200
+    assert report['listings_published'] == 24
+    assert 0 < report['alerts'] <= 24
+    # Alerts land within one polling interval plus the virtual API latency
+    assert 0 <= report['detection_latency_s']['max'] <= 900 + 60
+    assert report['api_calls']['craigslist'] == 48 * len(monitor.scraper.default_queries())
+    assert report['api_calls']['gemini'] >= 1
+    assert 'growth' in report['memory_kib']
+    assert report['speedup'] > 100
+
+
+def test_archived_pages_replay_in_fetch_order(tmp_path):
+    archive = PageArchive(str(tmp_path / 'archive'), retention_days=0)
+    item = [(0, 'sandiego', 'surfboard', {'name': "9'6 Log", 'description': 'Moving', 'offers': {'price': '500'}})]
+    empty = SyntheticCraigslist([], VirtualClock(start=0))
+    board = SyntheticCraigslist(item, VirtualClock(start=10))
+    url = 'https://sandiego.craigslist.org/search/sss?query=surfboard'
+    archive.store('sandiego', 'surfboard', empty.get(url).content, base_url='https://sandiego.craigslist.org',
+                  fetched_at=100)
+    archive.store('sandiego', 'surfboard', board.get(url).content, base_url='https://sandiego.craigslist.org',
+                  fetched_at=400)
+    clock = VirtualClock(start=50)
+    site = ArchivedCraigslist(archive, clock)
+    assert b'"name"' not in site.get(url).content
+    clock.advance(100)
+    assert b'"name"' not in site.get(url).content
+    clock.advance(300)
+    assert b"9'6 Log" in site.get(url).content
+    assert list(site.published.values()) == [400]
@@ -0,0 +1,63 @@
+import json
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from surfboard_monitor import Config, Listing, SurfboardMonitor
+from surfboard_monitor.core.status import StatusServer
+
+
+def get(server, path):
+    host, port = server.address
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.fixture
+def server():
+    clock = [1000.0]
+    server = StatusServer(port=0, stale_after=60, clock=lambda: clock[0])
+    server.clock_value = clock
+    server.start()
+    yield server
+    server.close()
+
+
+def test_serves_latest_published_snapshot(server):
+    assert get(server, '/status') == (200, {'status': 'starting'})
+    server.publish({'cycle': 1})
+    server.publish({'cycle': 2})
+    assert get(server, '/status') == (200, {'cycle': 2})
+    assert get(server, '/nope')[0] == 404
+
+
+def test_healthz_goes_stale_without_new_snapshots(server):
+    server.publish({'cycle': 1})
+    code, body = get(server, '/healthz')
+    assert code == 200 and body['ok']
+    server.clock_value[0] += 61
+    code, body = get(server, '/healthz')
+    assert code == 503 and body['last_publish_age_s'] == 61
+
+
+def test_monitor_publishes_snapshot_once_per_cycle():
+    with patch.object(Config, 'STATUS_PORT', 1):
+        with patch('surfboard_monitor.core.monitor.StatusServer') as server_cls:
+            monitor = SurfboardMonitor()
+    board = Listing(id='cl_1', title="9'6 Log")
+    with patch.object(monitor.scraper, 'get_new_listings', return_value=[board]), \
+            patch.object(monitor.classifier, 'classify_listings', return_value=[board]), \
+            patch.object(monitor.notifier, 'notify_new_listing'):
+        monitor.check_for_new_listings()
+    (snapshot,), _ = server_cls.return_value.publish.call_args
+    assert snapshot['cycle'] == 1
+    assert set(snapshot['last_cycle']['stages_ms']) == {'scrape_ms', 'dedupe_ms', 'classify_ms', 'notify_ms'}
+    assert snapshot['last_cycle']['counts']['notified'] == 1
+    assert set(snapshot['next_poll']) == {f"sandiego/{term}" for term in Config.SEARCH_TERMS}
+    assert 'gemini-2.5-flash' in snapshot['models']
+    json.dumps(snapshot)
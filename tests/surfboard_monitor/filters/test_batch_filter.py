@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from surfboard_monitor import Config, Listing, ListingBatch
+from surfboard_monitor.core.metrics import Metrics
+from surfboard_monitor.filters.batch_filter import BatchFilter, FilterSpec, parse_board_length
+
+
+def make(id, title, price=None, posted_at=None, description=''):
+    return Listing(id=id, title=title, price_cents=None if price is None else price * 100,
+                   posted_at=posted_at, description=description)
+
+
+def test_parse_board_length_variants():
+    assert parse_board_length("10'0 Classic Log") == 120
+    assert parse_board_length('7’6 Noserider special') == 90
+    assert parse_board_length('9\' 6" single fin') == 114
+    assert parse_board_length('9ft longboard') == 108
+    assert parse_board_length("5'10 shortboard ripper") == 70
+    assert parse_board_length('2 ft leash') is None
+    assert parse_board_length('Nice board') is None
+
+
+def test_price_and_unknown_price_terms():
+    listings = [make('cheap', 'a', 50), make('mid', 'b', 500), make('dear', 'c', 5000), make('unknown', 'd')]
+    kept = BatchFilter(FilterSpec(min_price=100, max_price=1000)).apply(listings)
+    assert [l.id for l in kept] == ['mid', 'unknown']
+
+
+def test_age_and_posted_after_terms_use_latest_cutoff():
+    now = time.time()
+    listings = [make('new', 'a', posted_at=int(now - 60)),
+                make('day_old', 'b', posted_at=int(now - 86400)),
+                make('undated', 'c')]
+    engine = BatchFilter(FilterSpec(max_age=3600), clock=lambda: now)
+    assert [l.id for l in engine.apply(listings)] == ['new', 'undated']
+    engine = BatchFilter(FilterSpec(max_age=7 * 86400), clock=lambda: now)
+    recent = datetime.fromtimestamp(now) - timedelta(hours=1)
+    assert [l.id for l in engine.apply(listings, posted_after=recent)] == ['new', 'undated']
+
+
+def test_keyword_and_length_terms():
+    listings = [
+        make('log', "9'6 Log", description='Moving sale'),
+        make('short', "5'10 fish", description='moving, must go'),
+        make('sup', "10'0 SUP paddleboard", description='moving'),
+        make('nolen', 'Longboard', description='moving soon'),
+        make('nomov', "9'0 Longboard", description='firm price'),
+    ]
+    spec = FilterSpec(required_keywords=['mov'], forbidden_keywords=['paddleboard'], min_length=96)
+    m = Metrics()
+    engine = BatchFilter(spec)
+    engine.metrics = m
+    assert [l.id for l in engine.apply(listings)] == ['log', 'nolen']
+    assert m.counter('filter.rejected.min_length') == 1
+    assert m.counter('filter.rejected.required_keywords') == 1
+    assert m.counter('filter.rejected.forbidden_keywords') == 1
+    assert m.counter('filter.input') == 5 and m.counter('filter.output') == 2
+
+
+def test_apply_accepts_batch_and_returns_original_rows():
+    rows = [{'id': 'a', 'title': 'A', 'price': '$20'}, {'id': 'b', 'title': 'B', 'price': '$2,000'}]
+    kept = BatchFilter(FilterSpec(max_price=100)).apply(ListingBatch.from_listings(rows))
+    assert kept == [rows[0]]
+
+
+def test_spec_from_config_wires_description_keyword():
+    config = Config()
+    with patch.object(config, 'REQUIRE_DESCRIPTION_KEYWORD', True), \
+            patch.object(config, 'MIN_PRICE', 0), patch.object(config, 'MAX_PRICE', 800), \
+            patch.object(config, 'MAX_LISTING_AGE_HOURS', 2):
+        spec = FilterSpec.from_config(config)
+    assert config.DESCRIPTION_KEYWORD in spec.required_keywords
+    assert spec.min_price is None and spec.max_price == 800
+    assert spec.max_age == 7200
+    assert spec.min_length is None
+
+
+def test_distance_term_keeps_nearby_and_unplaced_listings():
+    san_diego = (32.7157, -117.1611)
+    listings = [
+        Listing(id='la_jolla', title='a', latitude=32.8328, longitude=-117.2713),
+        Listing(id='oceanside', title='b', latitude=33.1959, longitude=-117.3795),
+        Listing(id='no_coordinates', title='c'),
+    ]
+    rows = [{'id': 'dict_far', 'title': 'd', 'latitude': '34.05', 'longitude': '-118.24'}]
+    engine = BatchFilter(FilterSpec(center=san_diego, radius_miles=25))
+    assert [l.id for l in engine.apply(listings)] == ['la_jolla', 'no_coordinates']
+    assert engine.apply(rows) == []
+    assert len(engine.apply(listings, within_radius=False)) == 3
+
+    config = Config()
+    with patch.object(config, 'LOCATION', 'San Diego, CA'), patch.object(config, 'RADIUS', 40):
+        spec = FilterSpec.from_config(config)
+    assert spec.center == san_diego and spec.radius_miles == 40
+    with patch.object(config, 'RADIUS', 0):
+        assert FilterSpec.from_config(config).center is None
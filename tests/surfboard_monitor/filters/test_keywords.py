@@ -0,0 +1,39 @@
+import random
+from surfboard_monitor.filters.keywords import KeywordMatcher
+
+
+def test_match_reports_all_categories_including_nested_and_overlapping():
+    matcher = KeywordMatcher({
+        'blacklist': ['sup', 'paddleboard', 'board bag'],
+        'shortboard': ["5'10", "6'0"],
+        'noserider': ['noserider'],
+    })
+    # 'sup' is nested inside 'super', 'board bag' overlaps 'paddleboard'
+    assert matcher.match('Super paddleBOARD BAG') == {'blacklist'}
+    assert matcher.match("5'10 NOSERIDER") == {'shortboard', 'noserider'}
+    assert matcher.match("9'6 Log") == set()
+    assert matcher.matches("6'0\" fish", 'shortboard')
+    assert not matcher.matches("6'0\" fish", 'blacklist')
+
+
+def test_prefix_keywords_both_reported():
+    matcher = KeywordMatcher({'short': ['mov'], 'long': ['moving']})
+    assert matcher.match('moving sale') == {'short', 'long'}
+
+
+def test_empty_matcher_is_falsy():
+    matcher = KeywordMatcher({'required': [], 'forbidden': ['']})
+    assert not matcher
+    assert matcher.match('anything') == set()
+    assert KeywordMatcher({'x': ['a']})
+
+
+def test_agrees_with_naive_substring_scan():
+    rng = random.Random(7)
+    words = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    categories = {f'c{i}': words[i::5] for i in range(5)}
+    matcher = KeywordMatcher(categories)
+    for _ in range(200):
+        text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 30)))
+        expected = {name for name, kws in categories.items() if any(k in text for k in kws)}
+        assert matcher.match(text) == expected
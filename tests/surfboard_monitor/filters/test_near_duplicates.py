@@ -0,0 +1,85 @@
+import random
+import time
+
+from surfboard_monitor import Listing
+from surfboard_monitor.filters.near_duplicates import (
+    NearDuplicateDetector, NearDuplicateIndex, from_signed, hamming, listing_simhash, to_signed
+)
+from surfboard_monitor.storage.history import HistoryStore, observation_row
+
+
+def board(id, title, price=500, description='', image_url=''):
+    return Listing(id=id, title=title, price_cents=price * 100, description=description, image_url=image_url)
+
+
+def test_simhash_is_close_for_reposts_and_far_for_other_boards():
+    original = board('a', "9'6 Donald Takayama In The Pink longboard", description='Great noserider, clean')
+    edited = board('b', "9'6 Donald Takayama In The Pink Longboard!!", description='Great noserider, clean.')
+    other = board('c', "5'10 Lost Puddle Jumper shortboard", description='Futures fins included')
+    assert hamming(listing_simhash(original), listing_simhash(edited)) <= 3
+    assert hamming(listing_simhash(original), listing_simhash(other)) > 10
+
+
+def test_signed_round_trip():
+    for fingerprint in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        assert -(1 << 63) <= to_signed(fingerprint) < (1 << 63)
+        assert from_signed(to_signed(fingerprint)) == fingerprint
+
+
+def test_index_finds_fingerprints_within_distance():
+    index = NearDuplicateIndex(max_distance=3)
+    index.add('a', 0b1011 << 40, 'LONGBOARD', 50000)
+    # Flip bits spread over several bands
+    match = index.query((0b1011 << 40) ^ (1 << 2) ^ (1 << 30) ^ (1 << 60))
+    assert match.listing_id == 'a'
+    assert match.distance == 3
+    assert index.query((0b1011 << 40) ^ 0b1111) is None
+    assert index.query(0b1011 << 40, exclude='a') is None
+
+
+def test_detector_skips_generic_titles_and_updates_original_price():
+    detector = NearDuplicateDetector()
+    detector.remember(board('a', 'Surfboard'), 'OTHER')
+    assert len(detector.index) == 0
+
+    log = board('b', "9'0 Classic Log Single Fin", price=800, image_url='https://images/xyz_600x450.jpg')
+    detector.remember(log, 'LONGBOARD')
+    fresh, reposts = detector.partition([board('c', "9'0 Classic Log Single Fin", price=700,
+                                               image_url='https://images/xyz_50x50c.jpg'),
+                                         board('d', 'Surfboard')])
+    assert [listing.get('id') for listing in fresh] == ['d']
+    (repost, match), = reposts
+    assert match.classification == 'LONGBOARD'
+    assert match.is_price_drop(repost.get('price_cents'))
+    detector.remember_repost(repost, match)
+    # Another repost at the same price is not a second drop
+    _, (( _, again),) = detector.partition([board('e', "9'0 Classic Log Single Fin", price=700,
+                                                                     image_url='https://images/xyz_600x450.jpg')])
+    assert not again.is_price_drop(70000)
+
+
+def test_index_bootstraps_from_history(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    log = board('a', "9'6 Classic Log Single Fin", price=800)
+    fingerprint = to_signed(listing_simhash(log))
+    store.insert_cycle(1, 1000.0, {}, {}, [
+        observation_row(log, 1000, 1, 'LONGBOARD', fingerprint),
+        observation_row(board('a', "9'6 Classic Log Single Fin", price=750), 2000, 1, 'LONGBOARD', fingerprint),
+        observation_row(board('b', 'Unclassified'), 2000, 1, None, 1),
+    ])
+    index = NearDuplicateIndex()
+    assert index.load_history(store) == 1
+    assert index.query(listing_simhash(log)).price_cents == 75000
+    assert NearDuplicateIndex().load_history(store, since=3000) == 0
+
+
+def test_lookup_is_sub_millisecond_on_large_index():
+    rng = random.Random(0)
+    index = NearDuplicateIndex()
+    for i in range(100000):
+        index.add(f"id{i}", rng.getrandbits(64), 'LONGBOARD', 50000)
+    queries = [rng.getrandbits(64) for _ in range(1000)]
+    start = time.perf_counter()
+    for fingerprint in queries:
+        index.query(fingerprint)
+    assert (time.perf_counter() - start) / len(queries) < 0.001
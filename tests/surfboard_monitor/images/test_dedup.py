@@ -0,0 +1,32 @@
+from surfboard_monitor import Listing
+from surfboard_monitor.images.dedup import ImageDuplicateDetector
+
+
+class FakeFetcher:
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.fetched = []
+
+    def hash_many(self, urls):
+        urls = list(urls)
+        self.fetched.extend(urls)
+        return {url: self.hashes.get(url) for url in urls}
+
+    def cached_hash(self, url):
+        return self.hashes.get(url) if url in self.fetched else None
+
+
+def test_reposts_with_rewritten_text_match_on_thumbnail():
+    fetcher = FakeFetcher({'a.jpg': 0xF0F0, 'b.jpg': 0xF0F1, 'c.jpg': 0xFFFF << 40})
+    detector = ImageDuplicateDetector(fetcher, max_distance=4)
+    original = Listing(id='cl_a', title='Longboard for sale', price_cents=60000, image_url='a.jpg')
+    detector.partition([original])
+    detector.remember(original, 'LONGBOARD')
+
+    rewritten = Listing(id='cl_b', title='Moving, must sell 9ft log', price_cents=50000, image_url='b.jpg')
+    other = Listing(id='cl_c', title='Longboard for sale', price_cents=60000, image_url='c.jpg')
+    fresh, reposts = detector.partition([rewritten, other])
+    assert fresh == [other]
+    assert reposts[0][0] is rewritten
+    assert reposts[0][1].listing_id == 'cl_a'
+    assert reposts[0][1].is_price_drop(50000)
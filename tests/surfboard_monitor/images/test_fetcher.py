@@ -0,0 +1,66 @@
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+from surfboard_monitor.images.fetcher import ThumbnailFetcher
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FakeSession:
+    """Serves fixed bytes per URL and records peak concurrency."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.requested.append(url)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        if url not in self.pages:
+            return FakeResponse(b'', 404)
+        return FakeResponse(self.pages[url])
+
+
+def fake_decode(data):
+    # Deterministic "image" derived from the bytes
+    return np.frombuffer(data * 64, dtype=np.uint8)[:256].reshape(16, 16).astype(np.float32)
+
+
+@patch('surfboard_monitor.images.fetcher.decode_grayscale', side_effect=fake_decode)
+def test_fetches_concurrently_and_caches_by_content(mock_decode, tmp_path):
+    pages = {f"https://images/{i}_300x300.jpg": bytes(range(i, i + 8)) for i in range(8)}
+    pages['https://images/same_600x450.jpg'] = pages['https://images/0_300x300.jpg']
+    session = FakeSession(pages)
+    fetcher = ThumbnailFetcher(str(tmp_path), max_workers=3, session=session)
+
+    hashes = fetcher.hash_many(list(pages) + ['https://images/missing.jpg', ''])
+    assert session.peak <= 3
+    assert hashes['https://images/missing.jpg'] is None
+    assert '' not in hashes
+    assert hashes['https://images/same_600x450.jpg'] == hashes['https://images/0_300x300.jpg']
+    # The repeated photo was stored once
+    assert len(list((tmp_path / 'blobs').rglob('*'))) - len(list((tmp_path / 'blobs').iterdir())) == 8
+
+    # A new process reuses the disk cache: no downloads, no decoding
+    session.requested.clear()
+    mock_decode.reset_mock()
+    again = ThumbnailFetcher(str(tmp_path), session=session).hash_many(list(pages))
+    assert again == {url: hashes[url] for url in pages}
+    assert session.requested == []
+    mock_decode.assert_not_called()
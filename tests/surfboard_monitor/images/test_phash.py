@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from surfboard_monitor.filters.near_duplicates import hamming
+from surfboard_monitor.images.phash import bits_to_int, dhash, phash, resize_area
+
+
+def photo(seed=0, shape=(240, 320)):
+    rng = np.random.default_rng(seed)
+    # Smooth gradients plus blobs, like a board on a plain background
+    y, x = np.mgrid[0:shape[0], 0:shape[1]]
+    image = 80 + 60 * np.sin(x / 37.0 + seed) + 40 * np.cos(y / 23.0 - seed)
+    for cy, cx, r in rng.integers(20, 200, size=(5, 3)):
+        image += 50 * ((y - cy) ** 2 + (x - cx) ** 2 < r ** 2)
+    return image
+
+
+def test_resize_area_averages_blocks_and_upsamples_small_images():
+    gray = np.arange(16, dtype=float).reshape(4, 4)
+    assert resize_area(gray, 2, 2).tolist() == [[2.5, 4.5], [10.5, 12.5]]
+    assert resize_area(np.ones((3, 3)), 8, 9).shape == (8, 9)
+
+
+def test_bits_to_int_uses_first_element_as_lowest_bit():
+    bits = np.zeros(64, dtype=bool)
+    bits[0] = bits[63] = True
+    assert bits_to_int(bits) == 1 | (1 << 63)
+
+
+@pytest.mark.parametrize('hasher', [dhash, phash])
+def test_hashes_survive_rescaling_and_brightness_but_not_other_photos(hasher):
+    original = photo(1)
+    thumbnail = resize_area(original, 120, 160) * 0.8 + 20
+    assert hamming(hasher(original), hasher(thumbnail)) <= 6
+    assert hamming(hasher(original), hasher(photo(7))) > 12
+
+
+def test_decode_grayscale_with_pillow():
+    Image = pytest.importorskip('PIL.Image')
+    import io
+    from surfboard_monitor.images.phash import decode_grayscale
+    buffer = io.BytesIO()
+    Image.fromarray(photo(2).clip(0, 255).astype(np.uint8)).save(buffer, format='PNG')
+    assert decode_grayscale(buffer.getvalue()).shape == (240, 320)
@@ -133,3 +133,25 @@ class TestNotifier:
                     with patch.object(notifier.config, 'EMAIL_TO', 'z'):
                         # Should not raise on exception
                         notifier.send_email_notification('s', 'b')
+
+
+def test_notify_new_listing_uses_profile_channels():
+    from surfboard_monitor.core.profiles import WatchProfile
+    notifier = Notifier()
+    profile = WatchProfile('ann', ['sandiego'], ['surfboard'], email_to='ann@example.com', desktop=False)
+    with patch.object(notifier, 'send_desktop_notification') as mock_desktop, \
+            patch.object(notifier, 'send_email_notification') as mock_email:
+        notifier.notify_new_listing({'title': 'Log', 'url': 'u'}, profile=profile)
+    mock_desktop.assert_not_called()
+    assert mock_email.call_args.kwargs['to'] == 'ann@example.com'
+
+
+def test_notify_price_drop_shows_old_and_new_price():
+    from surfboard_monitor import Listing
+    notifier = Notifier()
+    listing = Listing(id='cl_2', title="9'6 Log", price_cents=70000, url='u')
+    with patch.object(notifier, 'send_desktop_notification') as mock_desktop, \
+            patch.object(notifier, 'send_email_notification') as mock_email:
+        notifier.notify_price_drop(listing, 90000)
+    assert '$900 → $700' in mock_desktop.call_args[0][1]
+    assert 'Was: $900' in mock_email.call_args[0][1]
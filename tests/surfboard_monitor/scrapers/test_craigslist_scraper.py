@@ -1,4 +1,5 @@
 import json
+import threading
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 from unittest.mock import Mock, patch
@@ -44,7 +45,7 @@ def test_save_check_time_success_and_error(tmp_path, monkeypatch):
         scraper._save_check_time()
 
 
-def test_filter_listings_by_time_parsing_and_fallback(tmp_path):
+def test_listing_filter_time_parsing_and_fallback(tmp_path):
     scraper = CraigslistScraper()
     now = datetime.now()
     cutoff = now - timedelta(days=1)
@@ -70,7 +71,7 @@ def test_filter_listings_by_time_parsing_and_fallback(tmp_path):
             return default
     listings.append(FakeListing('Outer except'))
 
-    filtered = scraper._filter_listings_by_time(listings, cutoff)
+    filtered = scraper.listing_filter.apply(listings, posted_after=cutoff)
     titles = [getattr(l, '_title', l.get('title')) for l in filtered if isinstance(l, (dict, FakeListing))]
     assert 'ISO format' in titles
     assert 'Outer except' in titles
@@ -94,7 +95,8 @@ def test_parse_craigslist_json_item_and_helpers():
     }
     listing = scraper._parse_craigslist_json_item({'item': item}, base_url='https://sfbay.craigslist.org')
     assert listing['title'] == 'Board'
-    assert listing['price'] == '$300.00'
+    assert listing.price_cents == 30000
+    assert listing['price'] == '$300'
     assert listing['location'] == 'San Diego, CA'
     assert listing['image_url'] == 'https://example.com/image.jpg'
 
@@ -141,6 +143,7 @@ def test_parse_craigslist_listing_html_minimal():
     listing = scraper._parse_craigslist_listing(listing_el, 'https://sfbay.craigslist.org')
     assert listing['title'] == 'Great Board'
     assert listing['price'] == '$450'
+    assert listing.price_cents == 45000
     assert listing['location'] == 'San Diego'
     assert listing['url'].endswith('/item/123')
     assert listing['image_url'].startswith('https://')
@@ -317,3 +320,108 @@ def test_contains_mov_keyword_cases():
     assert scraper._contains_mov_keyword({'title': 'MOV sale on surfboards'}) is True
     assert scraper._contains_mov_keyword({'description': 'must mov soon'}) is True
     assert scraper._contains_mov_keyword({'title': 'surfboard'}) is False
+
+
+@patch('surfboard_monitor.scrapers.craigslist_scraper.requests.Session.get')
+def test_search_craigslist_throttled_backs_off_and_opens_circuit(mock_get):
+    scraper = CraigslistScraper()
+    scraper.circuit_breaker.failure_threshold = 2
+    scraper.rate_limiter.sleep = lambda seconds: None
+    mock_resp = Mock()
+    mock_resp.status_code = 429
+    mock_resp.headers = {'Retry-After': '0'}
+    mock_get.return_value = mock_resp
+
+    assert scraper.search_craigslist('surfboard', 'sandiego') == []
+    assert scraper.search_craigslist('surfboard', 'sandiego') == []
+    assert mock_get.call_count == 2
+    # Circuit is now open: no further request goes out for this region
+    assert scraper.search_craigslist('surfboard', 'sandiego') == []
+    assert mock_get.call_count == 2
+    state = scraper.metrics.gauge('craigslist.circuit_breaker')
+    assert state['sandiego']['state'] == 'open'
+    assert scraper.metrics.gauge('craigslist.rate_limiter')['sandiego.craigslist.org']['consecutive_throttles'] == 2
+
+
+def test_contains_mov_keyword_uses_compiled_matcher():
+    scraper = CraigslistScraper()
+    assert scraper._contains_mov_keyword({'title': 'Longboard', 'description': 'MOVING, must sell'})
+    assert not scraper._contains_mov_keyword({'title': 'Longboard', 'description': 'firm'})
+
+
+@patch('surfboard_monitor.scrapers.craigslist_scraper.requests.Session.get')
+def test_get_new_listings_with_parse_pool_overlaps_fetch_and_parse(mock_get, tmp_path):
+    from surfboard_monitor.scrapers.parse_pool import ParsePool
+    from surfboard_monitor.scrapers.craigslist_scraper import parse_search_results
+    scraper = CraigslistScraper()
+    scraper.last_check_file = str(tmp_path / 'last_check.json')
+    scraper.rate_limiter.sleep = lambda s: None
+    scraper.parse_pool = ParsePool(parse_search_results, workers=1)
+    json_ld = {'itemListElement': [{'item': {'name': 'Pool Log', 'offers': {'price': '500'}}}]}
+    mock_resp = Mock(status_code=200, headers={})
+    mock_resp.content = (f'<script id="ld_searchpage_results" type="application/ld+json">'
+                         f'{json.dumps(json_ld)}</script>').encode('utf-8')
+    mock_get.return_value = mock_resp
+    try:
+        listings = scraper.get_new_listings(queries=[('sandiego', 'log'), ('sfbay', 'log')])
+    finally:
+        scraper.parse_pool.close()
+    assert [listing['region'] for listing in scraper.last_scraped] == ['sandiego', 'sfbay']
+    assert len(listings) == 1  # same board in both regions has one ID
+
+
+@patch('surfboard_monitor.scrapers.craigslist_scraper.requests.Session.get')
+def test_fetched_pages_are_archived_and_replay_without_network(mock_get, tmp_path):
+    from surfboard_monitor.storage.page_archive import PageArchive
+    scraper = CraigslistScraper()
+    scraper.rate_limiter.sleep = lambda s: None
+    scraper.archive = PageArchive(str(tmp_path / 'archive'))
+    json_ld = {'itemListElement': [{'item': {'name': 'Archived Log', 'offers': {'price': '500'}}}]}
+    mock_resp = Mock(status_code=200, headers={})
+    mock_resp.content = (f'<script id="ld_searchpage_results" type="application/ld+json">'
+                         f'{json.dumps(json_ld)}</script>').encode('utf-8')
+    mock_get.return_value = mock_resp
+    live = scraper.search_craigslist('log', 'sandiego')
+    scraper.search_craigslist('log', 'sandiego')
+    assert scraper.archive.stats()['pages'] == 2
+    assert scraper.archive.stats()['blobs'] == 1
+
+    mock_get.reset_mock()
+    replayed = list(scraper.replay_archive(scraper.archive, region='sandiego'))
+    mock_get.assert_not_called()
+    assert len(replayed) == 2
+    region, term, _, listings = replayed[0]
+    assert (region, term) == ('sandiego', 'log')
+    assert [listing['title'] for listing in listings] == [listing['title'] for listing in live]
+    assert listings[0]['region'] == 'sandiego'
+
+
+def test_json_coordinates_and_radius_region_selection():
+    from surfboard_monitor.scrapers.craigslist_scraper import json_coordinates, parse_json_item, search_regions
+    item = {'name': "9'6 Log", 'offers': {'price': '500', 'availableAtOrFrom': {
+        'address': {'addressLocality': 'Oceanside'}, 'geo': {'latitude': '33.1959', 'longitude': -117.3795}}}}
+    listing = parse_json_item({'item': item}, 'https://sandiego.craigslist.org')
+    assert (listing.latitude, listing.longitude) == (33.1959, -117.3795)
+    assert json_coordinates({'offers': {'availableAtOrFrom': {'geo': {'latitude': 'x'}}}}) == {}
+
+    assert search_regions('San Diego, CA', 25) == ['sandiego']
+    assert search_regions('33.1959,-117.3795', 25) == ['sandiego', 'orangecounty']
+    assert search_regions('33.1959,-117.3795', 0) == ['sandiego']
+    assert search_regions('sfbay', 0) == ['sfbay']
+    assert search_regions('somewhere', 25) == ['somewhere']
+
+    scraper = CraigslistScraper()
+    scraper.config.LOCATION, scraper.config.RADIUS = '33.1959,-117.3795', 25
+    assert {region for region, _ in scraper.default_queries()} == {'sandiego', 'orangecounty'}
+
+
+def test_claim_unseen_hands_each_id_to_one_thread():
+    scraper = CraigslistScraper()
+    ids = [f'id{n}' for n in range(500)]
+    claimed = []
+    threads = [threading.Thread(target=lambda: claimed.append(scraper.claim_unseen(ids))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(listing_id for batch in claimed for listing_id in batch) == sorted(ids)
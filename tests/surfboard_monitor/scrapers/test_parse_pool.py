@@ -0,0 +1,40 @@
+import json
+
+from surfboard_monitor.scrapers.craigslist_scraper import parse_search_results
+from surfboard_monitor.scrapers.parse_pool import ParsePool
+
+
+def search_page(count):
+    items = [{'item': {
+        'name': f"9'{i % 12} Longboard {i}",
+        'description': 'Single fin noserider ' * 20,
+        'offers': {'price': f"{100 + i}.00",
+                   'availableAtOrFrom': {'address': {'addressLocality': 'Encinitas', 'addressRegion': 'CA'}}},
+        'image': [f"https://images.craigslist.org/{i}_300x300.jpg"],
+    }} for i in range(count)]
+    return (f'<html><head><script id="ld_searchpage_results" type="application/ld+json">'
+            f'{json.dumps({"itemListElement": items})}</script></head><body></body></html>').encode('utf-8')
+
+
+def test_pool_matches_inline_parse_for_small_and_shared_memory_pages():
+    small, large = search_page(3), search_page(600)
+    pool = ParsePool(parse_search_results, workers=2, shared_memory_threshold=64 * 1024)
+    try:
+        assert len(large) > pool.shared_memory_threshold > len(small)
+        futures = [pool.submit(page, 'https://sandiego.craigslist.org', 1000) for page in (small, large)]
+        results = [future.result(timeout=60) for future in futures]
+    finally:
+        pool.close()
+    assert results[0] == parse_search_results(small, 'https://sandiego.craigslist.org', 1000)
+    assert results[1] == parse_search_results(large, 'https://sandiego.craigslist.org', 1000)
+    assert len(results[1]) == 600
+    assert results[1][0].location == 'Encinitas, CA'
+
+
+def test_interpreter_pool_falls_back_to_processes_when_unavailable():
+    pool = ParsePool(parse_search_results, workers=1, kind='interpreter')
+    try:
+        assert len(pool.parse(search_page(2), 'https://sandiego.craigslist.org', 10)) == 2
+        assert pool.kind in ('interpreter', 'process')
+    finally:
+        pool.close()
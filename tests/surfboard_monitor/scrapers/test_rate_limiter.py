@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from surfboard_monitor.scrapers.rate_limiter import (
+    TokenBucket, HostRateLimiter, CircuitBreaker, parse_retry_after
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_parse_retry_after_seconds_and_date():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('garbage') is None
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    header = format_datetime(now + timedelta(seconds=30), usegmt=True)
+    assert parse_retry_after(header, now=now) == 30.0
+
+
+def test_token_bucket_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 1.0
+
+
+def test_token_bucket_throttle_halves_rate_and_honours_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=1, clock=clock)
+    bucket.throttled(retry_after=60)
+    assert bucket.rate == 0.5
+    assert bucket.reserve() >= 60
+    bucket.succeeded()
+    assert bucket.rate > 0.5
+
+
+def test_token_bucket_caps_a_huge_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=1, clock=clock)
+    assert bucket.throttled(retry_after=86400) == 300.0
+    assert bucket.state()['blocked_for'] == 300.0
+
+
+def test_host_rate_limiter_sleeps_and_backs_off_per_host():
+    clock = FakeClock()
+    limiter = HostRateLimiter(requests_per_minute=60, burst=1, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire('sandiego.craigslist.org') == 0
+    assert limiter.acquire('sandiego.craigslist.org') == 1.0
+    # Other hosts are unaffected
+    assert limiter.acquire('sfbay.craigslist.org') == 0
+
+    assert limiter.record_response('sandiego.craigslist.org', 429, '10') == 10.0
+    assert limiter.record_response('sandiego.craigslist.org', 200) == 0.0
+    state = limiter.state()
+    assert state['sandiego.craigslist.org']['blocked_for'] == 10.0
+    assert state['sfbay.craigslist.org']['consecutive_throttles'] == 0
+
+
+def test_host_rate_limiter_does_not_wait_past_a_deadline():
+    clock = FakeClock()
+    limiter = HostRateLimiter(requests_per_minute=60, burst=1, clock=clock, sleep=clock.sleep)
+    limiter.record_response('sandiego.craigslist.org', 429, '30')
+    deadline = SimpleNamespace(remaining=lambda: 10)
+    assert limiter.acquire('sandiego.craigslist.org', deadline=deadline) is None
+    assert clock.now == 1000.0
+    # The token was given back, so a later caller does not pay for the skipped request
+    assert limiter.acquire('sandiego.craigslist.org') == 30.0
+
+
+def test_host_rate_limiter_configure_keeps_backoff():
+    clock = FakeClock()
+    limiter = HostRateLimiter(requests_per_minute=60, burst=4, clock=clock, sleep=clock.sleep)
+    limiter.acquire('sandiego.craigslist.org')
+    limiter.record_response('sandiego.craigslist.org', 429)
+    limiter.configure(requests_per_minute=30, burst=2)
+    bucket = limiter.buckets['sandiego.craigslist.org']
+    assert (bucket.max_rate, bucket.capacity) == (0.5, 2.0)
+    assert bucket.rate == 0.5 and bucket.consecutive_throttles == 1
+    # New hosts get the new limits
+    limiter.acquire('sfbay.craigslist.org')
+    assert limiter.buckets['sfbay.craigslist.org'].capacity == 2.0
+
+def test_circuit_breaker_opens_and_half_opens_after_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=clock)
+    assert breaker.allow('sandiego')
+    breaker.record_failure('sandiego')
+    assert breaker.allow('sandiego')
+    breaker.record_failure('sandiego')
+    assert not breaker.allow('sandiego')
+    assert breaker.state()['sandiego']['state'] == 'open'
+
+    clock.now += 61
+    assert breaker.allow('sandiego')
+    assert breaker.state()['sandiego']['state'] == 'half_open'
+    # A failed trial re-opens immediately
+    breaker.record_failure('sandiego')
+    assert not breaker.allow('sandiego')
+
+    clock.now += 61
+    assert breaker.allow('sandiego')
+    breaker.record_success('sandiego')
+    assert breaker.state()['sandiego'] == {'state': 'closed', 'failures': 0, 'retry_in': 0.0}
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+    breaker.record_failure('sandiego')
+    clock.now += 61
+    assert [breaker.allow('sandiego') for _ in range(3)] == [True, False, False]
+    # A trial that is never recorded doesn't wedge the circuit
+    clock.now += 61
+    assert breaker.allow('sandiego')
+    breaker.record_success('sandiego')
+    assert breaker.allow('sandiego') and breaker.allow('sandiego')
+
+
+def test_rates_must_be_positive():
+    for make in (lambda: TokenBucket(0, 1), lambda: HostRateLimiter(0, 1), lambda: HostRateLimiter(60, 1).configure(-1, 1)):
+        with pytest.raises(ValueError):
+            make()
@@ -0,0 +1,48 @@
+from surfboard_monitor import Listing
+from surfboard_monitor.storage.history import HistoryStore, HistoryWriter, observation_row, title_key
+
+
+def board(id, title, price, posted_at=None):
+    return Listing(id=id, title=title, price_cents=price * 100, posted_at=posted_at, region='sandiego')
+
+
+def test_title_key_normalises_punctuation_and_case():
+    assert title_key("9'6  Classic LOG!!") == title_key('9 6 classic log')
+
+
+def test_price_history_time_on_market_and_reposts(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.insert_cycle(1, 1000.0, {'scrape_ms': 5.0}, {'scraped': 2}, [
+        observation_row(board('a', "9'6 Classic Log", 800, posted_at=900), 1000, 1, 'LONGBOARD'),
+        observation_row(board('b', '5\'10 Fish', 300), 1000, 1, 'SHORTBOARD'),
+    ])
+    store.insert_cycle(2, 2000.0, {}, {}, [
+        observation_row(board('a', "9'6 Classic Log", 800, posted_at=900), 2000, 2, 'LONGBOARD'),
+    ])
+    store.insert_cycle(3, 3000.0, {}, {}, [
+        observation_row(board('a', "9'6 Classic Log", 700, posted_at=900), 3000, 3, 'LONGBOARD'),
+        # Same board reposted under a new ID with a tweaked title
+        observation_row(board('c', "9'6 classic log!", 650), 3000, 3, 'LONGBOARD'),
+    ])
+
+    assert store.observation_count() == 5
+    assert store.last_cycle_id() == 3
+    assert store.price_history('a') == [(1000, 80000), (3000, 70000)]
+    assert store.time_on_market('a') == 2100
+    assert store.time_on_market('b') == 0
+    assert store.time_on_market('missing') is None
+    assert store.reposts_of("9'6 Classic Log") == ['a', 'c']
+    reposts = store.find_reposts()
+    assert len(reposts) == 1
+    assert reposts[0]['listing_ids'] == ['a', 'c']
+    assert store.find_reposts(since=2500)[0]['listing_ids'] == ['a', 'c']
+
+
+def test_writer_batches_off_thread(tmp_path):
+    path = str(tmp_path / 'history.db')
+    writer = HistoryWriter(HistoryStore(path))
+    rows = [observation_row(board(f"id{i}", f"Board {i}", 100 + i), 1000, 1) for i in range(500)]
+    writer.submit(1, 1000.0, {'scrape_ms': 1.0}, {'scraped': 500}, rows)
+    assert writer.flush(timeout=10)
+    writer.close()
+    assert HistoryStore(path).observation_count() == 500
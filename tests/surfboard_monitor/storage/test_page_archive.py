@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from surfboard_monitor.storage import page_archive
+from surfboard_monitor.storage.page_archive import PageArchive
+
+PAGE = b'<html>' + b'<li class="cl-static-search-result">9\'6 log</li>' * 200 + b'</html>'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _blob_files(directory):
+    return [name for _, _, files in os.walk(os.path.join(directory, 'objects')) for name in files]
+
+
+def test_identical_pages_are_stored_once(tmp_path):
+    archive = PageArchive(str(tmp_path), clock=FakeClock())
+    first = archive.store('sandiego', 'longboard', PAGE, fetched_at=1000)
+    second = archive.store('sandiego', 'longboard', PAGE, fetched_at=2000)
+    archive.store('sandiego', 'longboard', PAGE + b'<!-- new -->', fetched_at=3000)
+    assert first == second
+    assert len(_blob_files(str(tmp_path))) == 2
+    stats = archive.stats()
+    assert (stats['pages'], stats['blobs']) == (3, 2)
+    assert stats['stored_bytes'] < stats['raw_bytes'] / 10
+    assert archive.read(first) == PAGE
+
+
+def test_index_filters_by_query_and_time(tmp_path):
+    archive = PageArchive(str(tmp_path), clock=FakeClock())
+    archive.store('sandiego', 'longboard', PAGE, fetched_at=1000)
+    archive.store('sfbay', 'longboard', PAGE, fetched_at=1500)
+    archive.store('sandiego', 'surfboard', b'other', fetched_at=2000)
+    archive.store('sandiego', 'longboard', b'later', fetched_at=3000)
+    assert [row[3] for row in archive.pages(region='sandiego', term='longboard')] == [1000, 3000]
+    assert [row[1] for row in archive.pages(since=1500, until=3000)] == ['sfbay', 'sandiego']
+    replayed = list(archive.replay(region='sandiego', term='longboard'))
+    assert [(fetched_at, content) for _, _, fetched_at, _, content in replayed] == [(1000, PAGE), (3000, b'later')]
+
+
+def test_retention_drops_old_pages_and_orphaned_blobs(tmp_path):
+    clock = FakeClock()
+    archive = PageArchive(str(tmp_path), retention_days=1, clock=clock)
+    archive.store('sandiego', 'longboard', b'old only', fetched_at=clock.now - 2 * 86400)
+    archive.store('sandiego', 'longboard', PAGE, fetched_at=clock.now - 2 * 86400)
+    assert archive.prune() == 2
+    assert archive.stats()['pages'] == 0
+    assert _blob_files(str(tmp_path)) == []
+    archive.store('sandiego', 'longboard', PAGE, fetched_at=clock.now - 2 * 86400)
+    # The next store more than an hour later sweeps automatically
+    archive.store('sandiego', 'longboard', PAGE, fetched_at=clock.now)
+    assert archive.stats()['pages'] == 1
+    assert len(_blob_files(str(tmp_path))) == 1
+    assert list(archive.replay())[0][4] == PAGE
+
+
+def test_unknown_codec_rejected_and_zstd_falls_back_without_extra(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        PageArchive(str(tmp_path), codec='lz4')
+    monkeypatch.setattr(page_archive, 'zstandard', None)
+    assert PageArchive(str(tmp_path), codec='zstd').codec == 'gzip'
@@ -0,0 +1,37 @@
+"""
+Tests for site coordinates, the grid index and haversine distances.
+"""
+
+import numpy as np
+from surfboard_monitor.geo import SITES, SiteIndex, haversine_miles, location_point, parse_point
+
+
+def test_haversine_known_distance_and_nan_propagation():
+    assert abs(float(haversine_miles(32.7157, -117.1611, 34.0522, -118.2437)) - 111) < 2
+    distances = haversine_miles(np.array([32.7157, np.nan]), np.array([-117.1611, np.nan]), 32.7157, -117.1611)
+    assert distances[0] == 0 and np.isnan(distances[1])
+
+
+def test_grid_index_matches_brute_force():
+    index = SiteIndex(cell_degrees=0.5)
+    codes = list(SITES)
+    for lat, lon, radius in ((33.2, -117.35, 25), (37.0, -122.0, 60), (40.7, -74.0, 10), (21.3, -157.9, 5)):
+        brute = haversine_miles(lat, lon, [SITES[c][1] for c in codes], [SITES[c][2] for c in codes])
+        expected = sorted(code for code, distance in zip(codes, brute) if distance <= radius + 30)
+        assert sorted(code for _, code in index.within(lat, lon, radius, reach_miles=30)) == expected
+
+
+def test_region_edge_reaches_neighbouring_site():
+    index = SiteIndex()
+    # Oceanside sits between the San Diego and Orange County sites
+    assert [code for _, code in index.within(33.1959, -117.3795, 25)] == ['sandiego', 'orangecounty']
+    assert [code for _, code in index.within(32.7157, -117.1611, 25)] == ['sandiego']
+    assert index.nearest(0.0, -150.0) == 'honolulu'
+
+
+def test_location_point_forms():
+    assert location_point('San Diego, CA') == SITES['sandiego'][1:]
+    assert location_point('orangecounty') == SITES['orangecounty'][1:]
+    assert location_point(' 33.1, -117.3 ') == (33.1, -117.3)
+    assert location_point('Atlantis') is None
+    assert parse_point('95,10') is None
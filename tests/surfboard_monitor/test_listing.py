@@ -0,0 +1,104 @@
+"""
+Tests for the Listing record and ListingBatch columnar view.
+"""
+
+import pickle
+from datetime import datetime
+import numpy as np
+from surfboard_monitor import Listing, ListingBatch
+from surfboard_monitor.listing import (
+    MISSING_PRICE, UNKNOWN_TIME, format_price, parse_posted_at, parse_price_cents
+)
+
+
+def test_parse_price_cents_variants():
+    assert parse_price_cents('$1,200') == 120000
+    assert parse_price_cents('300.00') == 30000
+    assert parse_price_cents('$49.99') == 4999
+    assert parse_price_cents(450) == 45000
+    assert parse_price_cents('N/A') is None
+    assert parse_price_cents(None) is None
+
+
+def test_format_price_round_trips_display_strings():
+    assert format_price(120000) == '$1,200'
+    assert format_price(4999) == '$49.99'
+    assert format_price(None) == 'Price not available'
+
+
+def test_parse_posted_at_formats():
+    now = datetime(2024, 1, 15, 10, 30)
+    assert parse_posted_at(now.isoformat()) == int(now.timestamp())
+    assert parse_posted_at('2024-01-15 10:30:00') == int(now.timestamp())
+    assert parse_posted_at('2024-01-15T10:30:00Z') is not None
+    assert parse_posted_at('not-a-date') is None
+    assert parse_posted_at('') is None
+
+
+def test_listings_are_hashable_by_id():
+    first, again = Listing(id='cl_1', title='Board'), Listing(id='cl_1', title='Board')
+    assert len({first, again, Listing(id='cl_2', title='Board')}) == 2
+    assert {first: 'LONGBOARD'}[again] == 'LONGBOARD'
+
+
+def test_listing_mapping_access_and_interning():
+    location = ''.join(['San ', 'Diego'])
+    listing = Listing(id='cl_1', title="9'6 Log", price_cents=65000, location=location)
+    assert listing['title'] == "9'6 Log"
+    assert listing.get('price') == '$650'
+    assert listing.get('date', 'n/a') == 'n/a'
+    assert listing['date'] is None
+    assert listing.get('condition', 'Unknown') == 'Unknown'
+    assert listing.location is Listing(id='cl_2', title='x', location='San Diego').location
+
+    listing['platform'] = 'Craigslist'
+    listing['price'] = '$600'
+    assert listing.platform == 'Craigslist'
+    assert listing.price_cents == 60000
+    assert not hasattr(listing, '__dict__')
+    assert pickle.loads(pickle.dumps(listing)) == listing
+
+
+def test_listing_from_and_to_dict():
+    data = {'id': 'cl_1', 'title': 'Board', 'price': '$300', 'date': '2024-01-15 10:30:00',
+            'location': 'SD', 'url': 'u', 'description': 'd', 'image_url': 'i', 'platform': 'Craigslist'}
+    listing = Listing.from_dict(data)
+    assert listing.price_cents == 30000
+    assert listing.to_dict()['price'] == '$300'
+    assert Listing.from_dict(listing.to_dict()) == listing
+
+
+def test_listing_batch_columns_and_select():
+    rows = [
+        Listing(id='a', title='A', price_cents=10000, posted_at=100),
+        {'id': 'b', 'title': 'B', 'price': 'N/A', 'date': ''},
+        Listing(id='c', title='C', price_cents=30000, posted_at=300),
+    ]
+    batch = ListingBatch.from_listings(rows)
+    assert len(batch) == 3
+    assert batch.price_cents.tolist() == [10000, MISSING_PRICE, 30000]
+    assert batch.posted_at.tolist() == [100, UNKNOWN_TIME, 300]
+    assert batch.titles == ['A', 'B', 'C']
+
+    cheap = batch.select(batch.price_cents < 20000)
+    assert [r['id'] for r in cheap.to_listings()] == ['a', 'b']
+    assert cheap.select(np.array([1])).titles == ['B']
+    assert len(batch.select([])) == 0
+
+
+def test_listing_pickles_as_compact_tuple():
+    import pickle
+    listing = Listing(id='cl_1', title='Log', price_cents=50000, location='San Diego, CA', region='sandiego')
+    restored = pickle.loads(pickle.dumps(listing))
+    assert restored == listing
+    assert len(pickle.dumps(listing)) < len(pickle.dumps(listing.to_dict()))
+
+
+def test_batch_coordinates_columns():
+    rows = [Listing(id='a', title='A', latitude=32.7, longitude=-117.1), Listing(id='b', title='B')]
+    batch = ListingBatch.from_listings(rows)
+    assert batch.latitudes[0] == 32.7 and np.isnan(batch.latitudes[1])
+    assert np.isnan(batch.select([1]).longitudes[0])
+    dict_batch = ListingBatch.from_listings([{'id': 'c', 'latitude': 'bad', 'longitude': 1}])
+    assert np.isnan(dict_batch.latitudes[0])
+    assert pickle.loads(pickle.dumps(rows[0])) == rows[0]